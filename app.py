@@ -1,120 +1,85 @@
+"""
+Full app: the inference routes from inference_app.py plus the training and MongoDB routes.
+
+The training pipeline (mlflow, xgboost, scikit-learn, ...) is imported on the
+first /train call, not at startup, so this app starts as fast as the
+inference-only one.
+"""
 import sys
-import os
-import pandas as pd
-import numpy as np
-import pymongo
-import certifi
-ca = certifi.where()
-from dotenv import load_dotenv
-from fastapi import FastAPI, File, UploadFile, Request
-from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import Response, JSONResponse
-from fastapi.templating import Jinja2Templates
-from starlette.responses import RedirectResponse
+import threading
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
 from uvicorn import run as app_run
-from pydantic import BaseModel
-
-# Load MongoDB URL
-load_dotenv()
-mongo_db_url = os.getenv("MONGO_DB_URL")
 
-# Project Imports
+from inference_app import create_app, lifespan as inference_lifespan
 from crop_yield.exception.exception import CropYieldException
-from crop_yield.logging.logger import logging
-from crop_yield.utils.main_utils.utils import load_object
-from crop_yield.utils.ml_utils.model.estimator import CropYieldModel
-from crop_yield.pipeline.training_pipeline import TrainingPipeline
-from crop_yield.constant.training_pipeline import DATA_INGESTION_DATABASE_NAME, DATA_INGESTION_COLLECTION_NAME
-
-# MongoDB connection
-client = pymongo.MongoClient(mongo_db_url, tlsCAFile=ca)
-database = client[DATA_INGESTION_DATABASE_NAME]
-collection = database[DATA_INGESTION_COLLECTION_NAME]
-
-# FastAPI setup
-app = FastAPI()
-origins = ["*"]
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-templates = Jinja2Templates(directory="./templates")
-
-@app.get("/", tags=["authentication"])
-async def index():
-    return RedirectResponse(url="/docs")
-
-@app.get("/train")
-async def train_route():
-    try:
-        train_pipeline = TrainingPipeline()
-        train_pipeline.run_pipeline()
-        return Response("Training is successful")
-    except Exception as e:
-        raise CropYieldException(e, sys)
+from crop_yield.cloud.mongo_client import get_mongo_client_manager
 
+# MongoDB is only used by training; the shared client is created on first use, never at startup
+mongo_client_manager = get_mongo_client_manager()
 
-# ✅ BATCH PREDICTION ROUTE
-@app.post("/predict-batch", tags=["Prediction"])
-async def predict_batch_route(request: Request, file: UploadFile = File(...)):
-    try:
-        df = pd.read_csv(file.file)
+# Training runs as a background job in its own process; the new model is picked up by the registry
+_training_job_manager = None
+_training_job_manager_lock = threading.Lock()
 
-        area_freq_map = load_object("final_model/area_freq_map.pkl")
-        mean_freq = np.mean(list(area_freq_map.values()))
-        df['Area'] = df['Area'].map(area_freq_map).fillna(mean_freq)
 
-        preprocessor = load_object("final_model/preprocessor.pkl")
-        model = load_object("final_model/model.pkl")
+def get_training_job_manager():
+    """The TrainingJobManager, created (and the training pipeline imported) on first use."""
+    global _training_job_manager
+    if _training_job_manager is None:
+        with _training_job_manager_lock:
+            if _training_job_manager is None:
+                from crop_yield.pipeline.training_job import TrainingJobManager
 
-        crop_yield_model = CropYieldModel(preprocessor=preprocessor, model=model)
-        predictions = crop_yield_model.predict(df)
+                _training_job_manager = TrainingJobManager()
+    return _training_job_manager
 
-        df["Predicted_Yield"] = predictions
-        df.to_csv("prediction_output/output.csv", index=False)
 
-        table_html = df.to_html(classes='table table-striped', index=False)
-        return templates.TemplateResponse("table.html", {"request": request, "table": table_html})
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    async with inference_lifespan(app):
+        yield
+    mongo_client_manager.close()
 
-    except Exception as e:
-        raise CropYieldException(e, sys)
 
+# A separate app: importing this module leaves inference_app.app as it is
+app = create_app(lifespan)
 
-# ✅ SINGLE PREDICTION ROUTE
-class SinglePredictionInput(BaseModel):
-    Area: str
-    Crop: str
-    Season: str
-    Year: int
-    Item: str
-    average_rain_fall_mm_per_year: float
-    pesticides_tonnes: float
-    avg_temp: float
 
-@app.post("/predict", tags=["Prediction"])
-async def predict_single(input_data: SinglePredictionInput):
-    try:
-        data = input_data.dict()
-        df = pd.DataFrame([data])
-
-        area_freq_map = load_object("final_model/area_freq_map.pkl")
-        mean_freq = np.mean(list(area_freq_map.values()))
-        df['Area'] = df['Area'].map(area_freq_map).fillna(mean_freq)
-
-        preprocessor = load_object("final_model/preprocessor.pkl")
-        model = load_object("final_model/model.pkl")
-
-        crop_yield_model = CropYieldModel(preprocessor=preprocessor, model=model)
-        prediction = crop_yield_model.predict(df)[0]
+@app.get("/health/mongo", tags=["health"])
+async def mongo_health():
+    # A bounded ping on a worker thread; predictions do not depend on MongoDB
+    status = await run_in_threadpool(mongo_client_manager.ping)
+    return JSONResponse(content=status, status_code=200 if status["ok"] else 503)
 
-        return JSONResponse(content={"Predicted_Yield": prediction})
+@app.api_route("/train", methods=["GET", "POST"], tags=["Training"])
+async def train_route(request: Request):
+    from crop_yield.pipeline.training_job import TrainingAlreadyRunningError
 
+    try:
+        job = get_training_job_manager().submit()
+        status_url = str(request.url_for("train_status_route", job_id=job["job_id"]))
+        return JSONResponse(
+            status_code=202,
+            content={"job_id": job["job_id"], "state": job["state"], "status_url": status_url},
+            headers={"Location": status_url},
+        )
+    except TrainingAlreadyRunningError as e:
+        return JSONResponse(status_code=409, content={"detail": str(e)})
     except Exception as e:
         raise CropYieldException(e, sys)
 
 
+@app.get("/train/{job_id}", tags=["Training"])
+async def train_status_route(job_id: str):
+    status = get_training_job_manager().get(job_id)
+    if status is None:
+        return JSONResponse(status_code=404, content={"detail": f"Unknown training job {job_id}"})
+    status.pop("traceback", None)
+    return JSONResponse(content=status)
+
+
 if __name__ == "__main__":
     app_run(app, host="0.0.0.0", port=8000)
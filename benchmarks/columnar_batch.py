@@ -0,0 +1,123 @@
+"""
+Throughput of batch prediction over HTTP: the CSV upload route vs. the columnar route.
+
+Posts the same synthetic batch (benchmarks.common.synthetic_dataset) of each
+--rows size to the inference app in-process (FastAPI TestClient, so no
+network) as
+
+    csv            multipart CSV upload to /predict-batch?format=csv, CSV streamed back
+    json columns   {"Area": [...], ...} to /predict-batch/columnar
+    arrow stream   Arrow IPC stream to /predict-batch/columnar
+    npy            structured .npy to /predict-batch/columnar
+
+and reports rows/s end to end, including encoding the request and decoding
+the response on the client. The prediction cache is cleared before every
+request so each one runs the model on every row. Needs a trained model in
+final_model/, like the app.
+
+    python -m benchmarks.columnar_batch --rows 1000 10000 100000 --repeat 3
+"""
+import io
+import sys
+import json
+import argparse
+import statistics
+
+import numpy as np
+import pandas as pd
+import pyarrow
+import pyarrow.ipc
+from fastapi.testclient import TestClient
+
+import inference_app
+from crop_yield.constant.prediction_pipeline import PREDICTION_COLUMN_NAME
+from crop_yield.constant.training_pipeline import TARGET_COLUMN
+from crop_yield.serving.columnar import COLUMNAR_MEDIA_TYPES
+from benchmarks.common import synthetic_dataset, Timer
+
+
+def post_csv(client: TestClient, dataframe: pd.DataFrame) -> np.ndarray:
+    body = dataframe.to_csv(index=False).encode()
+    response = client.post("/predict-batch", params={"format": "csv"}, files={"file": ("batch.csv", body, "text/csv")})
+    response.raise_for_status()
+    return pd.read_csv(io.BytesIO(response.content))[PREDICTION_COLUMN_NAME].to_numpy()
+
+
+def post_columnar(client: TestClient, body: bytes, payload_format: str) -> bytes:
+    response = client.post("/predict-batch/columnar", content=body,
+                           headers={"Content-Type": COLUMNAR_MEDIA_TYPES[payload_format]})
+    response.raise_for_status()
+    return response.content
+
+
+def post_json(client: TestClient, dataframe: pd.DataFrame) -> np.ndarray:
+    body = json.dumps({column: values.tolist() for column, values in dataframe.items()}).encode()
+    return np.asarray(json.loads(post_columnar(client, body, "json"))[PREDICTION_COLUMN_NAME])
+
+
+def post_arrow(client: TestClient, dataframe: pd.DataFrame) -> np.ndarray:
+    table = pyarrow.Table.from_pandas(dataframe, preserve_index=False)
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    content = post_columnar(client, sink.getvalue().to_pybytes(), "arrow-stream")
+    return pyarrow.ipc.open_stream(content).read_all().column(PREDICTION_COLUMN_NAME).to_numpy()
+
+
+def post_npy(client: TestClient, dataframe: pd.DataFrame) -> np.ndarray:
+    fields = [(column, values.to_numpy().dtype if pd.api.types.is_numeric_dtype(values)
+               else f"U{values.astype(str).str.len().max()}") for column, values in dataframe.items()]
+    array = np.empty(len(dataframe), dtype=fields)
+    for column, values in dataframe.items():
+        array[column] = values.to_numpy(dtype=array.dtype[column])
+    buffer = io.BytesIO()
+    np.save(buffer, array, allow_pickle=False)
+    return np.load(io.BytesIO(post_columnar(client, buffer.getvalue(), "npy")), allow_pickle=False)
+
+
+ROUTES = {
+    "csv": post_csv,
+    "json columns": post_json,
+    "arrow stream": post_arrow,
+    "npy": post_npy,
+}
+
+
+def main(args) -> int:
+    with TestClient(inference_app.app) as client:
+        if not inference_app.model_registry.ready:
+            print("No trained model in final_model/; run the training pipeline first")
+            return 1
+        rows = []
+        for n_rows in args.rows:
+            dataframe = synthetic_dataset(n_rows, seed=args.seed).drop(columns=[TARGET_COLUMN])
+            expected = None
+            for name, post in ROUTES.items():
+                timings = []
+                for _ in range(args.repeat):
+                    inference_app.prediction_cache.clear()
+                    with Timer() as timer:
+                        predictions = post(client, dataframe)
+                    timings.append(timer.seconds)
+                # Every route must return the same predictions, or the comparison is meaningless
+                if expected is None:
+                    expected = predictions
+                elif not np.allclose(predictions, expected, rtol=1e-6):
+                    print(f"{name} returned different predictions than csv for {n_rows} rows")
+                    return 1
+                seconds = statistics.median(timings)
+                rows.append({"rows": n_rows, "route": name, "median_ms": seconds * 1000, "rows_per_s": n_rows / seconds})
+
+    results = pd.DataFrame(rows)
+    csv_rate = results[results["route"] == "csv"].set_index("rows")["rows_per_s"]
+    results["vs_csv"] = results["rows_per_s"] / results["rows"].map(csv_rate)
+    print(results.round(2).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    sys.exit(main(parser.parse_args()))
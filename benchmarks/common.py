@@ -0,0 +1,110 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Benchmarks run against the model in final_model/ when one is present and
+otherwise fit a small model on crop_data/crop_yield.csv, so they work on a
+fresh checkout without MongoDB or a training run.
+"""
+import os
+import time
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+
+from crop_yield.components.data_transformation import DataTransformation
+from crop_yield.constant.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN
+from crop_yield.serving.model_registry import ModelRegistry
+from crop_yield.utils.main_utils.utils import read_yaml_file
+from crop_yield.utils.ml_utils.model.estimator import CropYieldModel
+
+CROP_DATA_FILE_PATH = os.path.join("crop_data", "crop_yield.csv")
+# Continuous columns jittered by synthetic_dataset; Area, Item and Year are resampled as they are
+SYNTHETIC_JITTER_COLUMNS = [TARGET_COLUMN, "average_rain_fall_mm_per_year", "pesticides_tonnes", "avg_temp"]
+
+
+def load_crop_data() -> pd.DataFrame:
+    return pd.read_csv(CROP_DATA_FILE_PATH).dropna().reset_index(drop=True)
+
+
+def synthetic_dataset(rows: int, seed: int = 0, jitter: float = 0.05) -> pd.DataFrame:
+    """
+    `rows` rows drawn with replacement from crop_data/crop_yield.csv, with the
+    continuous columns scaled by a random factor within ±jitter. Whole rows are
+    resampled, so the joint distribution of Area, Item and Year (and the
+    climate of each area and year) is the real one at any size.
+    """
+    rng = np.random.default_rng(seed)
+    base = load_crop_data()
+    dataframe = base.iloc[rng.integers(0, len(base), size=rows)].reset_index(drop=True)
+    for column in SYNTHETIC_JITTER_COLUMNS:
+        dataframe[column] = dataframe[column].to_numpy(dtype=np.float64) * rng.uniform(1 - jitter, 1 + jitter, size=rows)
+    return dataframe
+
+
+@contextmanager
+def scratch_workdir(prefix: str):
+    """
+    Run inside a temporary directory holding a copy of data_schema/, so the
+    components' artifacts/ and final_model/ writes never touch the checkout.
+    """
+    schema_dir = os.path.abspath(os.path.dirname(SCHEMA_FILE_PATH))
+    cwd = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix=prefix)
+    try:
+        shutil.copytree(schema_dir, os.path.join(work_dir, os.path.dirname(SCHEMA_FILE_PATH)))
+        os.chdir(work_dir)
+        yield work_dir
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def fit_model(dataframe: pd.DataFrame, estimator=None) -> CropYieldModel:
+    """Fit the training-time preprocessing and an estimator the same way the pipeline does."""
+    features = dataframe.drop(columns=[TARGET_COLUMN])
+    target = dataframe[TARGET_COLUMN]
+    area_freq_map = features["Area"].value_counts().to_dict()
+    crop_yield_model = CropYieldModel(preprocessor=None, model=None, area_freq_map=area_freq_map)
+    features = crop_yield_model.encode_area(features)
+
+    schema_config = read_yaml_file(SCHEMA_FILE_PATH)
+    preprocessor = DataTransformation.get_data_transformer_object(None, schema_config).fit(features)
+    if estimator is None:
+        estimator = RandomForestRegressor(n_estimators=50, max_depth=20, random_state=42, n_jobs=-1)
+    estimator.fit(preprocessor.transform(features), target)
+
+    crop_yield_model.preprocessor = preprocessor
+    crop_yield_model.model = estimator
+    return crop_yield_model
+
+
+def load_model() -> CropYieldModel:
+    registry = ModelRegistry(poll_interval=0)
+    registry.start()
+    if registry.ready:
+        return registry.get().model
+    crop_yield_model = fit_model(load_crop_data())
+    crop_yield_model.enable_fast_path()
+    return crop_yield_model
+
+
+def sample_records(n: int, seed: int = 0) -> list:
+    dataframe = load_crop_data().drop(columns=[TARGET_COLUMN])
+    return dataframe.sample(n=n, replace=True, random_state=seed).to_dict("records")
+
+
+def percentile_ms(latencies: list, q: float) -> float:
+    return float(np.percentile(np.asarray(latencies) * 1000, q)) if latencies else 0.0
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.seconds = time.perf_counter() - self.start
@@ -0,0 +1,99 @@
+"""
+End-to-end data pipeline on a large synthetic dataset, CSV vs Parquet feature store.
+
+Rows are resampled from crop_data/crop_yield.csv with jittered numeric values,
+then pushed through data ingestion (cleaning, split), data validation and data
+transformation exactly as the training pipeline runs them, once per storage
+format. MongoDB and model training are left out: the first has nothing to do
+with the storage backend and the second does not read the feature store.
+
+Each run happens in a scratch directory, since data transformation also writes
+final_model/area_freq_map.pkl and final_model/preprocessor.pkl.
+
+    python -m benchmarks.feature_store --rows 10000000
+"""
+import argparse
+import os
+from datetime import datetime
+
+import pandas as pd
+
+from crop_yield.components.data_ingestion import DataIngestion
+from crop_yield.components.data_transformation import DataTransformation
+from crop_yield.components.data_validation import DataValidation
+from crop_yield.constant.training_pipeline import SCHEMA_FILE_PATH
+from crop_yield.entity.artifact_entity import DataIngestionArtifact
+from crop_yield.entity.config_entity import (
+    TrainingPipelineConfig,
+    DataIngestionConfig,
+    DataValidationConfig,
+    DataTransformationConfig,
+)
+from crop_yield.utils.main_utils.utils import read_yaml_file
+from benchmarks.common import synthetic_dataset, scratch_workdir, Timer
+
+
+def dir_size_mb(path: str) -> float:
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total / 1e6
+
+
+def run_pipeline(dataframe: pd.DataFrame, storage_format: str) -> dict:
+    training_pipeline_config = TrainingPipelineConfig(timestamp=datetime.now(), storage_format=storage_format)
+    timings = {}
+
+    with Timer() as timer:
+        data_ingestion = DataIngestion(DataIngestionConfig(training_pipeline_config))
+        cleaned = data_ingestion.export_data_into_feature_store(dataframe)
+        data_ingestion.split_data_as_train_test(cleaned)
+        config = data_ingestion.data_ingestion_config
+        data_ingestion_artifact = DataIngestionArtifact(
+            feature_store_file_path=config.feature_store_file_path,
+            training_file_path=config.training_file_path,
+            validation_file_path=config.validation_file_path,
+            testing_file_path=config.testing_file_path,
+        )
+    timings["data_ingestion"] = timer.seconds
+    del cleaned
+
+    with Timer() as timer:
+        data_validation = DataValidation(data_ingestion_artifact, DataValidationConfig(training_pipeline_config))
+        data_validation_artifact = data_validation.initiate_data_validation()
+    timings["data_validation"] = timer.seconds
+
+    with Timer() as timer:
+        data_transformation = DataTransformation(data_validation_artifact,
+                                                 DataTransformationConfig(training_pipeline_config))
+        data_transformation.initiate_data_transformation(read_yaml_file(SCHEMA_FILE_PATH))
+    timings["data_transformation"] = timer.seconds
+
+    timings["total"] = sum(timings.values())
+    timings["stage_files_mb"] = (
+        dir_size_mb(os.path.dirname(config.feature_store_file_path))
+        + dir_size_mb(os.path.dirname(config.training_file_path))
+        + dir_size_mb(os.path.dirname(data_validation_artifact.valid_train_file_path))
+    )
+    return timings
+
+
+def main(args):
+    dataframe = synthetic_dataset(args.rows)
+    print(f"Synthetic dataset: {len(dataframe):,} rows")
+
+    results = {}
+    for storage_format in args.formats:
+        with scratch_workdir(f"feature_store_{storage_format}_"):
+            results[storage_format] = run_pipeline(dataframe, storage_format)
+        print(f"{storage_format}: {results[storage_format]['total']:.1f}s")
+
+    print()
+    print(pd.DataFrame(results).round(2).to_string())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--formats", nargs="+", default=["csv", "parquet"], choices=["csv", "parquet"])
+    main(parser.parse_args())
@@ -0,0 +1,81 @@
+"""
+Startup cost of the app entry points, measured with `python -X importtime`.
+
+Each module is imported in a fresh interpreter `--repeat` times and the
+median total is reported, with the top-level packages that cost the most.
+With --max-ms the script exits non-zero when a module is slower, so it can
+gate startup time in CI; --json writes the numbers for tracking over time.
+
+    python -m benchmarks.import_time --modules inference_app app --repeat 5 --max-ms 1500
+"""
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from collections import defaultdict
+
+
+def import_times(module: str) -> dict:
+    """Cumulative import time in microseconds of every module imported by `import <module>`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        # "import time:      self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        name = name.strip()
+        times.setdefault(name, int(cumulative))
+    return times
+
+
+def top_packages(times: dict, module: str, count: int) -> list:
+    """Top-level packages by cumulative time: each package's root entry covers its submodules."""
+    packages = defaultdict(int)
+    for name, cumulative in times.items():
+        if "." not in name and name != module:
+            packages[name] = max(packages[name], cumulative)
+    return sorted(packages.items(), key=lambda item: item[1], reverse=True)[:count]
+
+
+def measure(module: str, repeat: int, top: int) -> dict:
+    runs = [import_times(module) for _ in range(repeat)]
+    totals = [runs_times[module] for runs_times in runs]
+    median_run = runs[totals.index(sorted(totals)[len(totals) // 2])]
+    return {
+        "module": module,
+        "median_ms": statistics.median(totals) / 1000,
+        "min_ms": min(totals) / 1000,
+        "modules_imported": len(median_run),
+        "top_packages_ms": {name: cumulative / 1000 for name, cumulative in top_packages(median_run, module, top)},
+    }
+
+
+def main(args) -> int:
+    results = [measure(module, args.repeat, args.top) for module in args.modules]
+    failed = False
+    for result in results:
+        over = args.max_ms is not None and result["median_ms"] > args.max_ms
+        failed = failed or over
+        print(f"{result['module']}: median {result['median_ms']:.1f} ms, min {result['min_ms']:.1f} ms, "
+              f"{result['modules_imported']} modules{'  OVER LIMIT' if over else ''}")
+        for name, ms in result["top_packages_ms"].items():
+            print(f"    {name:<30} {ms:9.1f} ms")
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"max_ms": args.max_ms, "results": results}, file, indent=2)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--modules", nargs="+", default=["inference_app", "app"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="packages listed per module")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail when a module's median import time exceeds this")
+    parser.add_argument("--json", default=None, help="write the results to this file")
+    sys.exit(main(parser.parse_args()))
@@ -0,0 +1,80 @@
+"""
+Throughput vs. tail latency of /predict-style traffic with and without micro-batching.
+
+Many concurrent clients each send single-record predictions. The baseline runs
+one InferenceExecutor job per record; the batched runs go through MicroBatcher
+with different (max batch size, max wait) settings. HTTP is left out so the
+numbers reflect the serving path itself.
+
+    python -m benchmarks.micro_batching --clients 64 --requests 50
+"""
+import argparse
+import asyncio
+import time
+
+import pandas as pd
+
+from crop_yield.serving.inference_executor import InferenceExecutor
+from crop_yield.serving.micro_batcher import MicroBatcher
+from benchmarks.common import load_model, sample_records, percentile_ms
+
+
+async def run_load(predict_one, records: list, clients: int, requests_per_client: int):
+    latencies = []
+
+    async def client(offset: int):
+        for i in range(requests_per_client):
+            record = records[(offset * requests_per_client + i) % len(records)]
+            started = time.perf_counter()
+            await predict_one(record)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(c) for c in range(clients)))
+    return latencies, time.perf_counter() - started
+
+
+async def main(args):
+    crop_yield_model = load_model()
+    records = sample_records(2000)
+    executor = InferenceExecutor(kind="thread", max_workers=args.workers, max_queue=args.clients * 2)
+    executor.start()
+
+    def predict_batch(batch):
+        return [float(y) for y in crop_yield_model.predict(pd.DataFrame(batch))]
+
+    async def baseline(record):
+        return await executor.run(crop_yield_model.predict_record, record)
+
+    configs = [("no batching", None, None)]
+    configs += [(f"batch<={size}, wait {wait}ms", size, wait) for size in args.sizes for wait in args.waits]
+
+    print(f"{args.clients} clients x {args.requests} requests, {args.workers} workers")
+    print(f"{'config':<26}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'avg batch':>11}")
+    for name, size, wait in configs:
+        batcher = None
+        predict_one = baseline
+        if size is not None:
+            batcher = MicroBatcher(
+                run_batch=lambda batch, _: executor.run(predict_batch, batch), max_batch_size=size, max_wait_ms=wait
+            )
+            batcher.start()
+            predict_one = batcher.submit
+        latencies, elapsed = await run_load(predict_one, records, args.clients, args.requests)
+        avg_batch = 1.0
+        if batcher is not None:
+            avg_batch = batcher.stats()["avg_batch_size"]
+            await batcher.stop()
+        print(f"{name:<26}{len(latencies) / elapsed:>10.0f}{percentile_ms(latencies, 50):>10.2f}"
+              f"{percentile_ms(latencies, 99):>10.2f}{avg_batch:>11.1f}")
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--waits", type=float, nargs="+", default=[1, 5])
+    asyncio.run(main(parser.parse_args()))
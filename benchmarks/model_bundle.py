@@ -0,0 +1,91 @@
+"""
+Load time and on-disk size of the model bundle vs. the three separate pickles.
+
+Fits RandomForest and XGBoost models on crop_data/crop_yield.csv, writes each
+both ways and times loading in a fresh interpreter state (objects dropped
+between repeats). Bundles are timed with and without checksum verification,
+and XGBoost also with its native UBJ format inside the bundle. Larger
+--n-estimators make the zero-copy arrays matter more.
+
+    python -m benchmarks.model_bundle --n-estimators 200 --repeat 5
+"""
+import os
+import gc
+import shutil
+import argparse
+import tempfile
+import statistics
+
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from xgboost import XGBRegressor
+
+from crop_yield.constant.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN
+from crop_yield.utils.main_utils.utils import save_object, load_object, read_yaml_file
+from crop_yield.utils.ml_utils.model.bundle import save_model_bundle, load_model_bundle
+from benchmarks.common import load_crop_data, fit_model, Timer
+
+
+def median_seconds(load, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        with Timer() as timer:
+            loaded = load()
+        timings.append(timer.seconds)
+        del loaded
+    return statistics.median(timings)
+
+
+def measure(name: str, crop_yield_model, work_dir: str, repeat: int) -> list:
+    schema_columns = read_yaml_file(SCHEMA_FILE_PATH)["columns"]
+    pickle_paths = [os.path.join(work_dir, f"{name}_{part}.pkl") for part in ("preprocessor", "model", "area_freq_map")]
+    for file_path, obj in zip(pickle_paths, (crop_yield_model.preprocessor, crop_yield_model.model,
+                                             crop_yield_model.area_freq_map)):
+        save_object(file_path, obj)
+
+    rows = [{
+        "model": name,
+        "format": "3 pickles",
+        "size_mb": sum(os.path.getsize(file_path) for file_path in pickle_paths) / 1e6,
+        "load_ms": median_seconds(lambda: [load_object(file_path) for file_path in pickle_paths], repeat) * 1000,
+    }]
+
+    native_formats = [None, "ubj"] if isinstance(crop_yield_model.model, XGBRegressor) else [None]
+    for native_model_format in native_formats:
+        bundle_path = os.path.join(work_dir, f"{name}_{native_model_format or 'pickle'}.bundle")
+        save_model_bundle(bundle_path, crop_yield_model.preprocessor, crop_yield_model.model,
+                          crop_yield_model.area_freq_map, schema_columns, TARGET_COLUMN,
+                          native_model_format=native_model_format)
+        label = f"bundle ({native_model_format})" if native_model_format else "bundle"
+        for verify in (True, False):
+            rows.append({
+                "model": name,
+                "format": f"{label}{'' if verify else ', no checksum'}",
+                "size_mb": os.path.getsize(bundle_path) / 1e6,
+                "load_ms": median_seconds(lambda: load_model_bundle(bundle_path, verify=verify), repeat) * 1000,
+            })
+    return rows
+
+
+def main(args):
+    dataframe = load_crop_data()
+    estimators = {
+        "RandomForest": RandomForestRegressor(n_estimators=args.n_estimators, max_depth=20, random_state=42, n_jobs=-1),
+        "XGBoost": XGBRegressor(n_estimators=args.n_estimators, max_depth=6, learning_rate=0.1),
+    }
+    work_dir = tempfile.mkdtemp(prefix="model_bundle_")
+    rows = []
+    try:
+        for name, estimator in estimators.items():
+            rows.extend(measure(name, fit_model(dataframe, estimator), work_dir, args.repeat))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print(pd.DataFrame(rows).round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n-estimators", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,243 @@
+"""
+Timings of the main pipeline steps at multiples of the production data size, checked against a baseline.
+
+For each --scales factor a synthetic dataset of factor x the rows of
+crop_data/crop_yield.csv is generated (benchmarks.common.synthetic_dataset,
+which keeps the real Area / Item / Year mix and climate), and these steps are
+timed on it, reading from files instead of MongoDB:
+
+    export_data_into_feature_store   clean + write the feature store
+    detect_dataset_drift             test split vs. the training profile
+    initiate_data_transformation     fit the preprocessor, transform all splits
+    evaluate_models                  the model search, on a small fixed grid
+    predict                          CropYieldModel.predict on the test split
+
+Each step runs --repeat times and its median is kept. Results are written as
+JSON to --output; when --baseline exists, every (scale, step) is compared
+with it and the script exits with status 1 if any step got slower by more
+than --threshold (and by more than --min-seconds, to ignore noise on the
+fast ones). Baselines are only comparable on the same machine: create one
+with --save-baseline before a change, then rerun after it.
+
+    python -m benchmarks.pipeline_scaling --scales 1 10 --save-baseline
+    python -m benchmarks.pipeline_scaling --scales 1 10 --threshold 0.2
+"""
+import os
+import sys
+import json
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import sklearn
+import xgboost
+from sklearn.linear_model import LinearRegression
+from sklearn.tree import DecisionTreeRegressor
+from sklearn.ensemble import RandomForestRegressor
+from xgboost import XGBRegressor
+
+from crop_yield.components.data_ingestion import DataIngestion
+from crop_yield.components.data_transformation import DataTransformation
+from crop_yield.components.data_validation import DataValidation
+from crop_yield.constant.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN
+from crop_yield.entity.artifact_entity import DataIngestionArtifact
+from crop_yield.entity.config_entity import (
+    TrainingPipelineConfig,
+    DataIngestionConfig,
+    DataValidationConfig,
+    DataTransformationConfig,
+)
+from crop_yield.utils.main_utils.feature_store import read_dataframe
+from crop_yield.utils.main_utils.utils import read_yaml_file, load_object, load_transformed_data, evaluate_models
+from crop_yield.utils.ml_utils.drift import ReferenceProfile
+from crop_yield.utils.ml_utils.model.estimator import CropYieldModel
+from benchmarks.common import load_crop_data, synthetic_dataset, scratch_workdir, Timer
+
+STEPS = ["export_data_into_feature_store", "detect_dataset_drift", "initiate_data_transformation",
+         "evaluate_models", "predict"]
+
+
+def benchmark_models() -> tuple:
+    """The trainer's four model families with one small setting each, so the search cost scales with rows only."""
+    models = {
+        "LinearRegression": LinearRegression(),
+        "DecisionTree": DecisionTreeRegressor(random_state=42),
+        "RandomForest": RandomForestRegressor(random_state=42, n_jobs=-1),
+        "XGBoost": XGBRegressor(missing=0.0),
+    }
+    param = {
+        "LinearRegression": {},
+        "DecisionTree": {"max_depth": [10]},
+        "RandomForest": {"n_estimators": [20], "max_depth": [10]},
+        "XGBoost": {"n_estimators": [50], "max_depth": [6]},
+    }
+    return models, param
+
+
+def median_seconds(step, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        with Timer() as timer:
+            step()
+        timings.append(timer.seconds)
+    return statistics.median(timings)
+
+
+def run_scale(dataframe: pd.DataFrame, repeat: int) -> dict:
+    """Median seconds per step on one dataset; run inside a scratch directory."""
+    training_pipeline_config = TrainingPipelineConfig(timestamp=datetime.now())
+    timings = {}
+
+    # Each step keeps its last output in `outputs` for the steps after it
+    outputs = {}
+
+    data_ingestion = DataIngestion(DataIngestionConfig(training_pipeline_config))
+    timings["export_data_into_feature_store"] = median_seconds(
+        lambda: outputs.update(cleaned=data_ingestion.export_data_into_feature_store(dataframe)), repeat)
+    data_ingestion.split_data_as_train_test(outputs.pop("cleaned"))
+    config = data_ingestion.data_ingestion_config
+    data_ingestion_artifact = DataIngestionArtifact(
+        feature_store_file_path=config.feature_store_file_path,
+        training_file_path=config.training_file_path,
+        validation_file_path=config.validation_file_path,
+        testing_file_path=config.testing_file_path,
+    )
+
+    data_validation = DataValidation(data_ingestion_artifact, DataValidationConfig(training_pipeline_config))
+    data_validation_artifact = data_validation.initiate_data_validation()
+    reference = ReferenceProfile.load(data_validation_artifact.reference_profile_file_path)
+    test_df = read_dataframe(data_validation_artifact.valid_test_file_path)
+    timings["detect_dataset_drift"] = median_seconds(
+        lambda: data_validation.detect_dataset_drift(reference, test_df), repeat)
+
+    data_transformation = DataTransformation(data_validation_artifact, DataTransformationConfig(training_pipeline_config))
+    schema_config = read_yaml_file(SCHEMA_FILE_PATH)
+    timings["initiate_data_transformation"] = median_seconds(
+        lambda: outputs.update(transformation=data_transformation.initiate_data_transformation(schema_config)), repeat)
+    data_transformation_artifact = outputs["transformation"]
+
+    X_train, y_train = load_transformed_data(data_transformation_artifact.transformed_train_dir)
+    X_val, y_val = load_transformed_data(data_transformation_artifact.transformed_val_dir)
+
+    def search():
+        models, param = benchmark_models()
+        scores = evaluate_models(X_train, y_train, X_val, y_val, models, param)
+        outputs["model"] = models[max(scores, key=scores.get)]
+
+    timings["evaluate_models"] = median_seconds(search, repeat)
+
+    crop_yield_model = CropYieldModel(
+        preprocessor=load_object(data_transformation_artifact.transformed_object_file_path),
+        model=outputs["model"],
+        area_freq_map=load_object(data_transformation_artifact.area_freq_map_file_path),
+    )
+    features = test_df.drop(columns=[TARGET_COLUMN])
+    timings["predict"] = median_seconds(lambda: crop_yield_model.predict(features), repeat)
+    return timings
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": commit,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "sklearn": sklearn.__version__,
+        "xgboost": xgboost.__version__,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_seconds: float) -> pd.DataFrame:
+    rows = []
+    for scale, timings in results["results"].items():
+        for step, seconds in timings.items():
+            baseline_seconds = baseline["results"].get(scale, {}).get(step)
+            if baseline_seconds is None:
+                continue
+            ratio = seconds / baseline_seconds if baseline_seconds > 0 else float("inf")
+            regressed = ratio > 1 + threshold and seconds - baseline_seconds > min_seconds
+            rows.append({"scale": scale, "step": step, "baseline_s": baseline_seconds, "current_s": seconds,
+                         "ratio": ratio, "status": "REGRESSION" if regressed else "ok"})
+    return pd.DataFrame(rows)
+
+
+def write_json(file_path: str, content: dict):
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    with open(file_path, "w") as file:
+        json.dump(content, file, indent=2)
+
+
+def main(args) -> int:
+    # Resolve output paths before the scratch directories change the working directory
+    output_path = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline)
+    base_rows = len(load_crop_data())
+    results = {"environment": environment(), "repeat": args.repeat, "rows": {}, "results": {}}
+    for scale in args.scales:
+        rows = int(round(base_rows * scale))
+        dataframe = synthetic_dataset(rows, seed=args.seed)
+        with scratch_workdir(f"pipeline_scaling_{scale}x_"):
+            timings = run_scale(dataframe, args.repeat)
+        del dataframe
+        results["rows"][f"{scale:g}x"] = rows
+        results["results"][f"{scale:g}x"] = timings
+        print(f"{scale:g}x ({rows:,} rows): " + ", ".join(f"{step} {seconds:.3f}s" for step, seconds in timings.items()))
+
+    write_json(output_path, results)
+    print(f"\nResults written to {output_path}")
+    print(pd.DataFrame(results["results"]).reindex(STEPS).round(3).to_string())
+
+    if args.save_baseline:
+        write_json(baseline_path, results)
+        print(f"Baseline saved to {baseline_path}")
+        return 0
+    if not os.path.exists(baseline_path):
+        print(f"No baseline at {baseline_path}; rerun with --save-baseline to create one")
+        return 0
+
+    with open(baseline_path) as file:
+        baseline = json.load(file)
+    for key in ("machine", "cpu_count", "python"):
+        if baseline["environment"].get(key) != results["environment"][key]:
+            print(f"Warning: baseline was recorded with {key}={baseline['environment'].get(key)}, "
+                  f"this run has {results['environment'][key]}; timings may not be comparable")
+    comparison = compare(results, baseline, args.threshold, args.min_seconds)
+    if comparison.empty:
+        print("Baseline has no scales in common with this run")
+        return 0
+    print(f"\nAgainst baseline {baseline_path} (threshold +{args.threshold:.0%}):")
+    print(comparison.round(3).to_string(index=False))
+    regressions = int((comparison["status"] == "REGRESSION").sum())
+    if regressions:
+        print(f"{regressions} step(s) regressed")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--scales", type=float, nargs="+", default=[1, 10],
+                        help="Dataset sizes as multiples of crop_data/crop_yield.csv")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join("benchmarks", "results", "pipeline_scaling.json"))
+    parser.add_argument("--baseline", default=os.path.join("benchmarks", "results", "pipeline_scaling_baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Allowed slowdown per step as a fraction of the baseline time")
+    parser.add_argument("--min-seconds", type=float, default=0.05,
+                        help="Slowdowns smaller than this many seconds are never regressions")
+    sys.exit(main(parser.parse_args()))
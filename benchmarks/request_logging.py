@@ -0,0 +1,117 @@
+"""
+Cost of logging on the request path: the old synchronous file handler vs. the queue handler.
+
+Times --requests calls of a request's access log line as the calling thread
+sees them (what /predict pays), for:
+
+    FileHandler (before)    logging.basicConfig's handler, formatting and writing in the caller
+    queue, text / json      AsyncQueueHandler: the caller only enqueues, a thread formats and writes
+    queue, sampled          the app's access log: sample_request_log() first, at --sample-rate
+
+each once on a plain file and once on a file whose writes stall for
+--stall-ms every --stall-every records (a busy or network disk), plus how
+long the writer thread then needs to drain the queue. On one core the queue
+only moves the formatting to another thread; what it removes from the
+request path are the stalls.
+
+    python -m benchmarks.request_logging --requests 50000 --sample-rate 0.01
+"""
+import os
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from crop_yield.logging.logger import AsyncQueueHandler, build_file_handler, sample_request_log
+from benchmarks.common import Timer
+
+
+class StallingHandler(logging.Handler):
+    """Wraps a handler and sleeps for stall_ms after every stall_every records, like a slow disk."""
+
+    def __init__(self, handler: logging.Handler, stall_every: int, stall_ms: float):
+        super().__init__()
+        self.handler = handler
+        self.stall_every = stall_every
+        self.stall_ms = stall_ms
+        self.count = 0
+
+    def emit(self, record):
+        self.handler.emit(record)
+        self.count += 1
+        if self.stall_every and self.count % self.stall_every == 0:
+            time.sleep(self.stall_ms / 1000)
+
+    def close(self):
+        self.handler.close()
+        super().close()
+
+
+def run(handler: logging.Handler, requests: int, sample_rate: float = None) -> dict:
+    logger = logging.getLogger(f"benchmarks.request_logging.{id(handler)}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    latencies = np.empty(requests)
+    for i in range(requests):
+        duration_ms = i % 97 * 0.1
+        with Timer() as timer:
+            if sample_rate is None or sample_request_log(sample_rate):
+                logger.info(f"POST /predict 200 {duration_ms:.1f}ms",
+                            extra={"method": "POST", "route": "/predict", "status": 200, "duration_ms": duration_ms})
+        latencies[i] = timer.seconds
+    with Timer() as drain:
+        if isinstance(handler, AsyncQueueHandler):
+            handler.stop()
+        else:
+            handler.close()
+    logger.removeHandler(handler)
+    return {
+        "mean_us": latencies.mean() * 1e6,
+        "p99_us": np.percentile(latencies, 99) * 1e6,
+        "max_ms": latencies.max() * 1000,
+        "total_ms": latencies.sum() * 1000,
+        "drain_ms": drain.seconds * 1000,
+    }
+
+
+def main(args):
+    work_dir = tempfile.mkdtemp(prefix="request_logging_")
+    rows = []
+    try:
+        for stalls in (False, True):
+            def file_handler(name: str, log_format: str = "text") -> logging.Handler:
+                handler = build_file_handler(os.path.join(work_dir, f"{name}_{stalls}.log"), log_format)
+                return StallingHandler(handler, args.stall_every, args.stall_ms) if stalls else handler
+
+            def queue_handler(name: str, log_format: str = "text") -> AsyncQueueHandler:
+                # Large enough that no record is dropped, so every configuration writes the same lines
+                handler = AsyncQueueHandler(queue_size=10 * args.requests, target=file_handler(name, log_format))
+                handler.start()
+                return handler
+
+            configurations = {
+                "FileHandler (before)": lambda: run(file_handler("sync"), args.requests),
+                "queue, text": lambda: run(queue_handler("text"), args.requests),
+                "queue, json": lambda: run(queue_handler("json", "json"), args.requests),
+                f"queue, sampled {args.sample_rate:g}": lambda: run(queue_handler("sampled"), args.requests,
+                                                                     args.sample_rate),
+            }
+            for name, measure in configurations.items():
+                rows.append({"disk": "stalling" if stalls else "plain", "handler": name, **measure()})
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    print(pd.DataFrame(rows).round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=50_000)
+    parser.add_argument("--sample-rate", type=float, default=0.01)
+    parser.add_argument("--stall-every", type=int, default=500)
+    parser.add_argument("--stall-ms", type=float, default=20)
+    main(parser.parse_args())
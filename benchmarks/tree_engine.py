@@ -0,0 +1,74 @@
+"""
+Latency of the flat NumPy tree engine vs. the library's predict, by batch size.
+
+Fits RandomForest and XGBoost models on crop_data/crop_yield.csv, compiles
+each into a TreeEnsemble and times predict on already transformed features
+(median of --repeat calls), reporting the largest difference from the
+library's output. The crossover calibrate_max_rows would pick is shown too.
+
+    python -m benchmarks.tree_engine --batch-sizes 1 64 10000 --n-estimators 100
+"""
+import argparse
+import statistics
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestRegressor
+from xgboost import XGBRegressor
+
+from crop_yield.constant.training_pipeline import TARGET_COLUMN
+from crop_yield.utils.ml_utils.model.tree_engine import compile_tree_ensemble, calibrate_max_rows
+from benchmarks.common import load_crop_data, fit_model, Timer
+
+
+def median_ms(predict, batch, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        with Timer() as timer:
+            predict(batch)
+        timings.append(timer.seconds)
+    return statistics.median(timings) * 1000
+
+
+def main(args):
+    dataframe = load_crop_data()
+    estimators = {
+        "RandomForest": RandomForestRegressor(n_estimators=args.n_estimators, max_depth=20, random_state=42, n_jobs=-1),
+        "XGBoost": XGBRegressor(n_estimators=args.n_estimators, max_depth=6, learning_rate=0.1),
+    }
+    rows = []
+    for name, estimator in estimators.items():
+        crop_yield_model = fit_model(dataframe, estimator)
+        features = crop_yield_model.preprocessor.transform(
+            crop_yield_model.encode_area(dataframe.drop(columns=[TARGET_COLUMN])))
+        features = np.asarray(features.toarray() if hasattr(features, "toarray") else features)
+        engine = compile_tree_ensemble(crop_yield_model.model)
+        crossover = calibrate_max_rows(engine, crop_yield_model.model, features)
+        print(f"{name}: {engine.n_trees} trees, {engine.n_nodes} nodes, depth {engine.max_depth}, "
+              f"engine used up to {crossover} rows")
+
+        for batch_size in args.batch_sizes:
+            batch = features[np.arange(batch_size) % len(features)]
+            expected = crop_yield_model.model.predict(batch)
+            difference = np.abs(engine.predict(batch) - expected)
+            library_ms = median_ms(crop_yield_model.model.predict, batch, args.repeat)
+            engine_ms = median_ms(engine.predict, batch, args.repeat)
+            rows.append({
+                "model": name,
+                "batch": batch_size,
+                "library_ms": library_ms,
+                "engine_ms": engine_ms,
+                "speedup": library_ms / engine_ms,
+                "max_abs_diff": difference.max(),
+                "max_rel_diff": (difference / np.maximum(np.abs(expected), 1e-12)).max(),
+            })
+    print()
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda value: f"{value:.4g}"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 64, 10_000])
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    main(parser.parse_args())
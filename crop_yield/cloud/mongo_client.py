@@ -0,0 +1,147 @@
+"""
+The one MongoDB client of a process, shared by the app, the training pipeline and push_data.py.
+
+Nothing touches the network at import time: the client is created on the first
+get_client() call. pymongo pools connections per client, so sharing it means
+every caller reuses the same warm sockets instead of paying DNS, TCP and TLS
+setup again.
+"""
+import os
+import sys
+import time
+import threading
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from crop_yield.constant.training_pipeline import (
+    MONGO_CONNECT_TIMEOUT_MS,
+    MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    MONGO_SOCKET_TIMEOUT_MS,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_HEALTH_CHECK_TIMEOUT_MS,
+)
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.logging.logger import logging
+
+load_dotenv()
+
+# URL scheme that selects the in-memory stand-in instead of a server
+MONGOMOCK_SCHEME = "mongomock://"
+
+
+class MongoClientManager:
+    """
+    Lazily creates one pooled MongoClient and hands it out.
+
+    The client is built with connect=False and bounded timeouts, so even its
+    creation does not wait for a server. A client made before a fork is not
+    reused in the child process; the child gets its own. `use()` installs
+    another client (e.g. mongomock's) for tests.
+    """
+
+    def __init__(self, url: Optional[str] = None, connect_timeout_ms: int = MONGO_CONNECT_TIMEOUT_MS,
+                 server_selection_timeout_ms: int = MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                 socket_timeout_ms: int = MONGO_SOCKET_TIMEOUT_MS, max_pool_size: int = MONGO_MAX_POOL_SIZE):
+        try:
+            self.url = url
+            self.connect_timeout_ms = connect_timeout_ms
+            self.server_selection_timeout_ms = server_selection_timeout_ms
+            self.socket_timeout_ms = socket_timeout_ms
+            self.max_pool_size = max_pool_size
+            self._client = None
+            self._pid = None
+            self._lock = threading.Lock()
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def _resolve_url(self) -> str:
+        url = self.url or os.getenv("MONGO_DB_URL")
+        if not url:
+            raise ValueError("MONGO_DB_URL is not set")
+        return url
+
+    def _create_client(self, url: str):
+        if url.startswith(MONGOMOCK_SCHEME):
+            import mongomock
+
+            return mongomock.MongoClient()
+
+        import pymongo
+
+        options = dict(
+            connect=False,
+            connectTimeoutMS=self.connect_timeout_ms,
+            serverSelectionTimeoutMS=self.server_selection_timeout_ms,
+            socketTimeoutMS=self.socket_timeout_ms,
+            maxPoolSize=self.max_pool_size,
+        )
+        # Atlas (SRV) and explicit TLS URLs verify the server against certifi's CA bundle
+        if url.startswith("mongodb+srv://") or "tls=true" in url.lower() or "ssl=true" in url.lower():
+            import certifi
+
+            options["tlsCAFile"] = certifi.where()
+        return pymongo.MongoClient(url, **options)
+
+    def get_client(self):
+        try:
+            client = self._client
+            if client is not None and self._pid == os.getpid():
+                return client
+            with self._lock:
+                if self._client is None or self._pid != os.getpid():
+                    self._client = self._create_client(self._resolve_url())
+                    self._pid = os.getpid()
+                    logging.info("Created the shared MongoDB client")
+                return self._client
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def get_collection(self, database: str, collection: str):
+        return self.get_client()[database][collection]
+
+    def use(self, client) -> None:
+        """Install a ready-made client, such as mongomock.MongoClient(), for every caller in this process."""
+        with self._lock:
+            self._client = client
+            self._pid = os.getpid()
+
+    @property
+    def connected(self) -> bool:
+        return self._client is not None
+
+    def ping(self, timeout_ms: int = MONGO_HEALTH_CHECK_TIMEOUT_MS) -> dict:
+        """Health check: round trip of a ping command, bounded by `timeout_ms`. Never raises."""
+        started = time.perf_counter()
+        try:
+            import pymongo
+
+            client = self.get_client()
+            # Bounds this check independently of the client's own timeouts (mongomock ignores it)
+            with pymongo.timeout(timeout_ms / 1000):
+                client.admin.command("ping")
+            return {"ok": True, "latency_ms": round((time.perf_counter() - started) * 1000, 3), "error": None}
+        except Exception as e:
+            return {"ok": False, "latency_ms": round((time.perf_counter() - started) * 1000, 3), "error": str(e)}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._client is not None and self._pid == os.getpid():
+                self._client.close()
+            self._client = None
+            self._pid = None
+
+
+_mongo_client_manager: Optional[MongoClientManager] = None
+
+
+def get_mongo_client_manager() -> MongoClientManager:
+    global _mongo_client_manager
+    if _mongo_client_manager is None:
+        _mongo_client_manager = MongoClientManager()
+    return _mongo_client_manager
+
+
+def get_mongo_client():
+    """The process-wide pooled client, created on first use."""
+    return get_mongo_client_manager().get_client()
@@ -3,23 +3,80 @@ import sys
 import numpy as np
 import pandas as pd
 import pymongo
-from typing import List
-from dotenv import load_dotenv
+from bson import ObjectId
+from typing import Callable, Iterator, List, Optional
 from sklearn.model_selection import train_test_split
 
+from crop_yield.constant.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN
 from crop_yield.entity.config_entity import DataIngestionConfig
 from crop_yield.exception.exception import CropYieldException
 from crop_yield.logging.logger import logging
 from crop_yield.entity.artifact_entity import DataIngestionArtifact
-
-load_dotenv()
-MONGO_DB_URL = os.getenv("MONGO_DB_URL")
+from crop_yield.utils.main_utils.utils import read_yaml_file, read_json_file, write_json_file
+from crop_yield.utils.main_utils.feature_store import read_dataframe, write_dataframe, storage_file_name
+from crop_yield.utils.main_utils.data_cleaning import DataCleaner
+from crop_yield.cloud.mongo_client import get_mongo_client
 
 
 class DataIngestion:
-    def __init__(self, data_ingestion_config: DataIngestionConfig):
+    def __init__(self, data_ingestion_config: DataIngestionConfig, mongo_client=None):
         try:
             self.data_ingestion_config = data_ingestion_config
+            # A client may be injected (e.g. mongomock in tests); otherwise the shared pooled client is used
+            self.mongo_client = mongo_client
+            self.schema_config = read_yaml_file(SCHEMA_FILE_PATH)
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def get_collection(self):
+        if self.mongo_client is None:
+            self.mongo_client = get_mongo_client()
+        database_name = self.data_ingestion_config.database_name
+        collection_name = self.data_ingestion_config.collection_name
+        return self.mongo_client[database_name][collection_name]
+
+    def no_documents_error(self) -> ValueError:
+        database_name = self.data_ingestion_config.database_name
+        collection_name = self.data_ingestion_config.collection_name
+        return ValueError(f"MongoDB collection {database_name}.{collection_name} has no documents; "
+                          "load the data with push_data.py before training")
+
+    def get_projection(self) -> dict:
+        """
+        Only the schema columns (and _id, used as the watermark) are sent over the wire.
+        """
+        projection = {column: 1 for column in self.schema_config["columns"]}
+        projection[self.data_ingestion_config.watermark_field] = 1
+        return projection
+
+    def iter_cursor_frames(self, cursor) -> Iterator[pd.DataFrame]:
+        """
+        Yield a batched cursor as DataFrame blocks of batch_size documents, indexed
+        by their position in the cursor.
+        """
+        batch_size = self.data_ingestion_config.batch_size
+        columns = list(dict.fromkeys(["_id", *self.get_projection()]))
+        batch = []
+        offset = 0
+        for document in cursor.batch_size(batch_size):
+            batch.append(document)
+            if len(batch) >= batch_size:
+                yield pd.DataFrame.from_records(batch, columns=columns, index=pd.RangeIndex(offset, offset + len(batch)))
+                offset += len(batch)
+                batch = []
+        if batch:
+            yield pd.DataFrame.from_records(batch, columns=columns, index=pd.RangeIndex(offset, offset + len(batch)))
+
+    def read_cursor(self, cursor) -> pd.DataFrame:
+        """
+        Build a DataFrame from a batched cursor one block of batch_size documents at a
+        time, instead of materialising the whole collection as a list of dicts first.
+        """
+        try:
+            frames = list(self.iter_cursor_frames(cursor))
+            if not frames:
+                return pd.DataFrame(columns=list(dict.fromkeys(["_id", *self.get_projection()])))
+            return pd.concat(frames, ignore_index=True)
         except Exception as e:
             raise CropYieldException(e, sys)
 
@@ -28,58 +85,188 @@ class DataIngestion:
         Read the data from MongoDB and convert it to a Pandas DataFrame.
         """
         try:
-            database_name = self.data_ingestion_config.database_name
-            collection_name = self.data_ingestion_config.collection_name
-            self.mongo_client = pymongo.MongoClient(MONGO_DB_URL)
-            collection = self.mongo_client[database_name][collection_name]
+            if self.data_ingestion_config.ingestion_mode == "incremental":
+                return self.export_collection_incrementally()
 
-            df = pd.DataFrame(list(collection.find()))
+            collection = self.get_collection()
+            df = self.read_cursor(collection.find({}, self.get_projection()))
             if "_id" in df.columns:
-                df.drop(columns=["_id"], axis=1, inplace=True)
+                df.drop(columns=["_id"], inplace=True)
 
             df.replace({"na": np.nan}, inplace=True)
             return df
         except Exception as e:
             raise CropYieldException(e, sys)
 
+    @staticmethod
+    def encode_watermark(value) -> dict:
+        if isinstance(value, ObjectId):
+            return {"value": str(value), "value_type": "objectid"}
+        if isinstance(value, np.generic):
+            value = value.item()
+        return {"value": value, "value_type": type(value).__name__}
+
+    @staticmethod
+    def decode_watermark(watermark: dict):
+        if watermark["value_type"] == "objectid":
+            return ObjectId(watermark["value"])
+        return watermark["value"]
+
+    def read_watermark(self) -> Optional[dict]:
+        """
+        The stored watermark, or None when there is none or it cannot be trusted
+        (unreadable, incomplete, or listing a part file that is gone), in which
+        case the snapshot is rebuilt from a full pull.
+        """
+        watermark_file_path = self.data_ingestion_config.watermark_file_path
+        try:
+            watermark = read_json_file(watermark_file_path)
+            if watermark is None:
+                return None
+            missing_keys = {"field", "value", "value_type", "parts", "rows"} - set(watermark)
+            if missing_keys:
+                raise ValueError(f"missing {sorted(missing_keys)}")
+            self.decode_watermark(watermark)
+            snapshot_dir = self.data_ingestion_config.snapshot_dir
+            missing_parts = [part for part in watermark["parts"] if not os.path.exists(os.path.join(snapshot_dir, part))]
+            if missing_parts:
+                raise ValueError(f"part files {missing_parts} are missing")
+            return watermark
+        except Exception as e:
+            logging.warning(f"Ignoring snapshot watermark {watermark_file_path} ({e}); rebuilding the snapshot")
+            return None
+
+    def read_snapshot(self, parts: List[str]) -> pd.DataFrame:
+        snapshot_dir = self.data_ingestion_config.snapshot_dir
+        # Parts written before the parquet backend existed are CSV; read_dataframe handles both
+        frames = [read_dataframe(os.path.join(snapshot_dir, part)) for part in parts]
+        if not frames:
+            return pd.DataFrame(columns=list(self.schema_config["columns"]))
+        return pd.concat(frames, ignore_index=True)
+
+    def sync_snapshot(self) -> List[str]:
+        """
+        Pull only documents past the stored watermark into the local snapshot and
+        return the snapshot's part files.
+
+        New documents are written as a new part file and the watermark (which
+        lists the parts) is replaced atomically afterwards, so an interrupted
+        run leaves the snapshot as it was and simply re-pulls the same documents.
+        A missing or corrupt watermark starts the snapshot over from part 0.
+        With a non-unique watermark field such as Year, documents added later
+        for an already ingested value are not picked up.
+        """
+        try:
+            field = self.data_ingestion_config.watermark_field
+            watermark_file_path = self.data_ingestion_config.watermark_file_path
+            watermark = self.read_watermark()
+            if watermark is not None and watermark["field"] != field:
+                raise ValueError(f"Snapshot watermark is on '{watermark['field']}', not '{field}'; clear "
+                                 f"{self.data_ingestion_config.snapshot_dir} to rebuild it")
+
+            query = {} if watermark is None else {field: {"$gt": self.decode_watermark(watermark)}}
+            cursor = self.get_collection().find(query, self.get_projection()).sort(field, pymongo.ASCENDING)
+            new_df = self.read_cursor(cursor)
+
+            parts = list(watermark["parts"]) if watermark else []
+            rows = watermark["rows"] if watermark else 0
+            if not new_df.empty:
+                high_water_mark = new_df[field].iloc[-1]
+                part = storage_file_name(f"part-{len(parts):05d}", self.data_ingestion_config.storage_format)
+                new_part_df = new_df.drop(columns=["_id"]).replace({"na": np.nan})
+                write_dataframe(new_part_df, os.path.join(self.data_ingestion_config.snapshot_dir, part))
+                parts.append(part)
+                rows += len(new_df)
+                write_json_file(watermark_file_path, {
+                    "field": field,
+                    **self.encode_watermark(high_water_mark),
+                    "parts": parts,
+                    "rows": rows,
+                })
+            logging.info(f"Incremental ingestion pulled {len(new_df)} new documents; snapshot has {rows} rows")
+            return parts
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def export_collection_incrementally(self) -> pd.DataFrame:
+        """
+        Bring the local snapshot up to date and return all of it.
+        """
+        try:
+            df = self.read_snapshot(self.sync_snapshot())
+            df.replace({"na": np.nan}, inplace=True)
+            return df
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def get_chunk_factory(self) -> Callable[[], Iterator[pd.DataFrame]]:
+        """
+        Source of the raw collection as a re-iterable stream of DataFrame chunks:
+        snapshot part files in incremental mode, cursor batches otherwise. Each
+        chunk is indexed by its row position in the whole collection.
+        """
+        if self.data_ingestion_config.ingestion_mode == "incremental":
+            snapshot_dir = self.data_ingestion_config.snapshot_dir
+            parts = self.sync_snapshot()
+
+            def iter_chunks():
+                offset = 0
+                for part in parts:
+                    chunk = read_dataframe(os.path.join(snapshot_dir, part))
+                    chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+                    offset += len(chunk)
+                    yield chunk.replace({"na": np.nan})
+        else:
+            def iter_chunks():
+                cursor = self.get_collection().find({}, self.get_projection())
+                for chunk in self.iter_cursor_frames(cursor):
+                    yield chunk.drop(columns=["_id"]).replace({"na": np.nan})
+        return iter_chunks
+
+    def get_data_cleaner(self) -> DataCleaner:
+        return DataCleaner(
+            target_column=TARGET_COLUMN,
+            impute_columns=self.data_ingestion_config.impute_columns,
+            outlier_columns=self.data_ingestion_config.outlier_columns,
+            iqr_multiplier=self.data_ingestion_config.iqr_multiplier,
+            sketch_capacity=self.data_ingestion_config.sketch_capacity,
+        )
+
     def export_data_into_feature_store(self, dataframe: pd.DataFrame) -> pd.DataFrame:
         """
-        Clean, preprocess, and save the DataFrame into the feature store as a CSV file.
+        Clean, preprocess, and save the DataFrame into the feature store.
         """
         try:
-            # Drop rows with missing target
-            dataframe = dataframe.dropna(subset=['hg/ha_yield'])
-
-            # Median imputation
-            for col in ['average_rain_fall_mm_per_year', 'pesticides_tonnes', 'avg_temp']:
-                median_val = dataframe[col].median()
-                dataframe[col].fillna(median_val, inplace=True)
-
-            # IQR outlier removal
-            def remove_outliers_iqr(df, cols):
-                for col in cols:
-                    Q1 = df[col].quantile(0.25)
-                    Q3 = df[col].quantile(0.75)
-                    IQR = Q3 - Q1
-                    lower = Q1 - 1.5 * IQR
-                    upper = Q3 + 1.5 * IQR
-                    df = df[(df[col] >= lower) & (df[col] <= upper)]
-                return df
-
-            dataframe = remove_outliers_iqr(dataframe, ['hg/ha_yield', 'pesticides_tonnes', 'avg_temp'])
+            # Drop rows with missing target, median imputation, IQR outlier removal
+            dataframe = self.get_data_cleaner().clean(dataframe)
 
             # Save cleaned data to feature store
-            feature_store_file_path = self.data_ingestion_config.feature_store_file_path
-            os.makedirs(os.path.dirname(feature_store_file_path), exist_ok=True)
-            dataframe.to_csv(feature_store_file_path, index=False, header=True)
+            write_dataframe(dataframe, self.data_ingestion_config.feature_store_file_path)
 
             return dataframe
         except Exception as e:
             raise CropYieldException(e, sys)
 
+    def export_chunks_into_feature_store(self) -> pd.DataFrame:
+        """
+        Same as export_data_into_feature_store, but the raw collection is only
+        ever held one chunk at a time; cleaning statistics come from quantile sketches.
+        """
+        try:
+            chunk_factory = self.get_chunk_factory()
+            if next(iter(chunk_factory()), None) is None:
+                raise self.no_documents_error()
+            cleaned_chunks = list(self.get_data_cleaner().clean_chunks(chunk_factory))
+            dataframe = pd.concat(cleaned_chunks) if cleaned_chunks else pd.DataFrame(
+                columns=list(self.schema_config["columns"]))
+            write_dataframe(dataframe, self.data_ingestion_config.feature_store_file_path)
+            return dataframe
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
     def split_data_as_train_test(self, dataframe: pd.DataFrame):
         """
-        Split the data into train, validation, and test sets, and save them as CSV files.
+        Split the data into train, validation, and test sets, and save them to the feature store.
         """
         try:
             train_ratio = self.data_ingestion_config.train_ratio
@@ -97,12 +284,9 @@ class DataIngestion:
 
             logging.info("Performed train-validation-test split on the DataFrame.")
 
-            dir_path = os.path.dirname(self.data_ingestion_config.training_file_path)
-            os.makedirs(dir_path, exist_ok=True)
-
-            train_set.to_csv(self.data_ingestion_config.training_file_path, index=False, header=True)
-            val_set.to_csv(self.data_ingestion_config.validation_file_path, index=False, header=True)
-            test_set.to_csv(self.data_ingestion_config.testing_file_path, index=False, header=True)
+            write_dataframe(train_set, self.data_ingestion_config.training_file_path)
+            write_dataframe(val_set, self.data_ingestion_config.validation_file_path)
+            write_dataframe(test_set, self.data_ingestion_config.testing_file_path)
 
             logging.info("Exported train, validation, and test file paths.")
         except Exception as e:
@@ -113,8 +297,13 @@ class DataIngestion:
         Orchestrates the data ingestion process.
         """
         try:
-            dataframe = self.export_collection_as_dataframe()
-            dataframe = self.export_data_into_feature_store(dataframe)
+            if self.data_ingestion_config.cleaning_mode == "chunked":
+                dataframe = self.export_chunks_into_feature_store()
+            else:
+                dataframe = self.export_collection_as_dataframe()
+                if dataframe.empty:
+                    raise self.no_documents_error()
+                dataframe = self.export_data_into_feature_store(dataframe)
             self.split_data_as_train_test(dataframe)
 
             data_ingestion_artifact = DataIngestionArtifact(
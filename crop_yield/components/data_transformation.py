@@ -2,6 +2,7 @@ import sys
 import os
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
@@ -11,7 +12,8 @@ from crop_yield.entity.artifact_entity import DataTransformationArtifact, DataVa
 from crop_yield.entity.config_entity import DataTransformationConfig
 from crop_yield.exception.exception import CropYieldException
 from crop_yield.logging.logger import logging
-from crop_yield.utils.main_utils.utils import save_numpy_array_data, save_object
+from crop_yield.utils.main_utils.utils import save_transformed_data, save_object, link_file
+from crop_yield.utils.main_utils.feature_store import read_dataframe
 
 
 class DataTransformation:
@@ -26,7 +28,7 @@ class DataTransformation:
     @staticmethod
     def read_data(file_path) -> pd.DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return read_dataframe(file_path)
         except Exception as e:
             raise CropYieldException(e, sys)
 
@@ -55,6 +57,27 @@ class DataTransformation:
         except Exception as e:
             raise CropYieldException(e, sys)
 
+    def transform_features(self, preprocessor_object: ColumnTransformer, dataframe: pd.DataFrame):
+        """
+        Apply the fitted preprocessor. For the "csr" output format each block is
+        transformed on its own and stacked as CSR, so the one-hot block (already
+        sparse from OneHotEncoder) is never densified; the values are the same
+        as preprocessor_object.transform(dataframe).
+        """
+        try:
+            if self.data_transformation_config.output_format != "csr":
+                return preprocessor_object.transform(dataframe)
+
+            blocks = []
+            for _, transformer, columns in preprocessor_object.transformers_:
+                if isinstance(transformer, str):
+                    # "drop" (or an empty remainder): contributes no output columns
+                    continue
+                blocks.append(sparse.csr_matrix(transformer.transform(dataframe[columns])))
+            return sparse.hstack(blocks, format="csr")
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
     def initiate_data_transformation(self, schema_config: dict) -> DataTransformationArtifact:
         try:
             logging.info("Reading validated datasets")
@@ -63,13 +86,13 @@ class DataTransformation:
             test_df = self.read_data(self.data_validation_artifact.valid_test_file_path)
 
             logging.info("Splitting features and target")
-            input_feature_train_df = train_df.drop(columns=[TARGET_COLUMN], axis=1)
+            input_feature_train_df = train_df.drop(columns=[TARGET_COLUMN])
             target_feature_train_df = train_df[TARGET_COLUMN]
 
-            input_feature_val_df = val_df.drop(columns=[TARGET_COLUMN], axis=1)
+            input_feature_val_df = val_df.drop(columns=[TARGET_COLUMN])
             target_feature_val_df = val_df[TARGET_COLUMN]
 
-            input_feature_test_df = test_df.drop(columns=[TARGET_COLUMN], axis=1)
+            input_feature_test_df = test_df.drop(columns=[TARGET_COLUMN])
             target_feature_test_df = test_df[TARGET_COLUMN]
 
             # ✅ Frequency encode 'Area' and save area_freq_map
@@ -80,36 +103,39 @@ class DataTransformation:
                 df['Area'] = df['Area'].map(area_freq_map).fillna(mean_freq)
 
             # ✅ Save the area_freq_map for use during inference
-            save_object("final_model/area_freq_map.pkl", area_freq_map)
+            save_object(self.data_transformation_config.area_freq_map_file_path, area_freq_map)
+            link_file(self.data_transformation_config.area_freq_map_file_path,
+                      self.data_transformation_config.final_area_freq_map_file_path)
 
             preprocessor = self.get_data_transformer_object(schema_config)
 
             logging.info("Fitting and transforming train data")
             preprocessor_object = preprocessor.fit(input_feature_train_df)
-            transformed_input_train_feature = preprocessor_object.transform(input_feature_train_df)
-            transformed_input_val_feature = preprocessor_object.transform(input_feature_val_df)
-            transformed_input_test_feature = preprocessor_object.transform(input_feature_test_df)
-
-            logging.info("Combining features with target")
-            train_arr = np.c_[transformed_input_train_feature, np.array(target_feature_train_df)]
-            val_arr = np.c_[transformed_input_val_feature, np.array(target_feature_val_df)]
-            test_arr = np.c_[transformed_input_test_feature, np.array(target_feature_test_df)]
+            transformed_input_train_feature = self.transform_features(preprocessor_object, input_feature_train_df)
+            transformed_input_val_feature = self.transform_features(preprocessor_object, input_feature_val_df)
+            transformed_input_test_feature = self.transform_features(preprocessor_object, input_feature_test_df)
 
+            # Features and target are saved separately: the trainer memory-maps both without slicing
             logging.info("Saving transformed datasets")
-            save_numpy_array_data(self.data_transformation_config.transformed_train_file_path, array=train_arr)
-            save_numpy_array_data(self.data_transformation_config.transformed_val_file_path, array=val_arr)
-            save_numpy_array_data(self.data_transformation_config.transformed_test_file_path, array=test_arr)
+            save_transformed_data(self.data_transformation_config.transformed_train_dir,
+                                  transformed_input_train_feature, target_feature_train_df.to_numpy())
+            save_transformed_data(self.data_transformation_config.transformed_val_dir,
+                                  transformed_input_val_feature, target_feature_val_df.to_numpy())
+            save_transformed_data(self.data_transformation_config.transformed_test_dir,
+                                  transformed_input_test_feature, target_feature_test_df.to_numpy())
 
             logging.info("Saving preprocessing object")
             save_object(self.data_transformation_config.transformed_object_file_path, preprocessor_object)
-            save_object("final_model/preprocessor.pkl", preprocessor_object)
+            link_file(self.data_transformation_config.transformed_object_file_path,
+                      self.data_transformation_config.final_preprocessor_file_path)
 
             logging.info("Creating transformation artifact")
             return DataTransformationArtifact(
                 transformed_object_file_path=self.data_transformation_config.transformed_object_file_path,
-                transformed_train_file_path=self.data_transformation_config.transformed_train_file_path,
-                transformed_val_file_path=self.data_transformation_config.transformed_val_file_path,
-                transformed_test_file_path=self.data_transformation_config.transformed_test_file_path
+                transformed_train_dir=self.data_transformation_config.transformed_train_dir,
+                transformed_val_dir=self.data_transformation_config.transformed_val_dir,
+                transformed_test_dir=self.data_transformation_config.transformed_test_dir,
+                area_freq_map_file_path=self.data_transformation_config.area_freq_map_file_path,
             )
 
         except Exception as e:
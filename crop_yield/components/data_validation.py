@@ -1,14 +1,15 @@
 import os
 import sys
 import pandas as pd
-from scipy.stats import ks_2samp
 import logging
 
 from crop_yield.entity.artifact_entity import DataIngestionArtifact, DataValidationArtifact
 from crop_yield.entity.config_entity import DataValidationConfig
 from crop_yield.exception.exception import CropYieldException
 from crop_yield.constant.training_pipeline import SCHEMA_FILE_PATH
-from crop_yield.utils.main_utils.utils import read_yaml_file, write_yaml_file
+from crop_yield.utils.main_utils.utils import read_yaml_file, write_yaml_file, link_file
+from crop_yield.utils.main_utils.feature_store import read_dataframe, read_column_names
+from crop_yield.utils.ml_utils.drift import DriftDetector, ReferenceProfile, column_kinds, schema_hash
 
 class DataValidation:
     def __init__(self, data_ingestion_artifact: DataIngestionArtifact, data_validation_config: DataValidationConfig):
@@ -22,33 +23,42 @@ class DataValidation:
     @staticmethod
     def read_data(file_path) -> pd.DataFrame:
         try:
-            return pd.read_csv(file_path)
+            return read_dataframe(file_path)
         except Exception as e:
             raise CropYieldException(e, sys)
 
-    def validate_number_of_columns(self, dataframe: pd.DataFrame) -> bool:
+    def validate_number_of_columns(self, columns) -> bool:
         try:
             required_columns = self.schema_config["columns"]
-            return len(dataframe.columns) == len(required_columns)
+            return len(columns) == len(required_columns)
         except Exception as e:
             raise CropYieldException(e, sys)
 
-    def detect_dataset_drift(self, base_df: pd.DataFrame, current_df: pd.DataFrame, threshold=0.05) -> bool:
+    def get_drift_detector(self, threshold: float = None) -> DriftDetector:
+        return DriftDetector(
+            column_kinds(self.schema_config["columns"]),
+            threshold=self.data_validation_config.drift_threshold if threshold is None else threshold,
+            sample_size=self.data_validation_config.sample_size,
+            max_workers=self.data_validation_config.max_workers,
+        )
+
+    def build_reference_profile(self, base_df: pd.DataFrame) -> ReferenceProfile:
+        """Profile the training split once and store it next to the drift report."""
         try:
-            status = True
-            report = {}
-            for column in base_df.columns:
-                if column in current_df.columns:
-                    d1 = base_df[column]
-                    d2 = current_df[column]
-                    ks_result = ks_2samp(d1, d2)
-                    drift_status = ks_result.pvalue < threshold
-                    if drift_status:
-                        status = False
-                    report[column] = {
-                        "p_value": float(ks_result.pvalue),
-                        "drift_detected": drift_status
-                    }
+            profile = self.get_drift_detector().build_reference(
+                base_df, schema_hash=schema_hash(self.schema_config["columns"])
+            )
+            profile.save(self.data_validation_config.reference_profile_file_path)
+            return profile
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def detect_dataset_drift(self, reference: ReferenceProfile, current_df: pd.DataFrame, threshold=None) -> bool:
+        try:
+            # KS on numeric columns, chi-square on categorical ones such as Area and Item (both with PSI)
+            drift_detector = self.get_drift_detector(threshold)
+            report = drift_detector.compare(reference, current_df)
+            status = not any(result["drift_detected"] for result in report.values())
 
             drift_report_path = self.data_validation_config.drift_report_file_path
             os.makedirs(os.path.dirname(drift_report_path), exist_ok=True)
@@ -60,24 +70,29 @@ class DataValidation:
 
     def initiate_data_validation(self) -> DataValidationArtifact:
         try:
-            # Read data from ingestion artifact paths
-            train_df = self.read_data(self.data_ingestion_artifact.training_file_path)
-            val_df = self.read_data(self.data_ingestion_artifact.validation_file_path)
-            test_df = self.read_data(self.data_ingestion_artifact.testing_file_path)
-
-            # Validate number of columns in all three sets
-            for df, name in zip([train_df, val_df, test_df], ['Train', 'Validation', 'Test']):
-                if not self.validate_number_of_columns(df):
+            ingested = {
+                self.data_ingestion_artifact.training_file_path: self.data_validation_config.valid_train_file_path,
+                self.data_ingestion_artifact.validation_file_path: self.data_validation_config.valid_val_file_path,
+                self.data_ingestion_artifact.testing_file_path: self.data_validation_config.valid_test_file_path,
+            }
+
+            # Validate number of columns in all three sets (header / parquet footer only)
+            for file_path, name in zip(ingested, ['Train', 'Validation', 'Test']):
+                if not self.validate_number_of_columns(read_column_names(file_path)):
                     raise ValueError(f"{name} dataset does not match schema column count.")
 
-            # Drift detection between train and test (could also do val later)
-            drift_status = self.detect_dataset_drift(train_df, test_df)
+            # Profile the training split once; test (and later, served data) is compared against the profile
+            reference = self.build_reference_profile(self.read_data(self.data_ingestion_artifact.training_file_path))
+            link_file(self.data_validation_config.reference_profile_file_path,
+                      self.data_validation_config.final_reference_profile_file_path)
+
+            drift_status = self.detect_dataset_drift(
+                reference, self.read_data(self.data_ingestion_artifact.testing_file_path)
+            )
 
-            # Save valid datasets
-            os.makedirs(os.path.dirname(self.data_validation_config.valid_train_file_path), exist_ok=True)
-            train_df.to_csv(self.data_validation_config.valid_train_file_path, index=False)
-            val_df.to_csv(self.data_validation_config.valid_val_file_path, index=False)
-            test_df.to_csv(self.data_validation_config.valid_test_file_path, index=False)
+            # The splits pass validation unchanged, so validated/ links to the ingested files instead of copying them
+            for ingested_file_path, valid_file_path in ingested.items():
+                link_file(ingested_file_path, valid_file_path)
 
             # Return artifact
             return DataValidationArtifact(
@@ -88,7 +103,8 @@ class DataValidation:
                 invalid_train_file_path=None,
                 invalid_val_file_path=None,
                 invalid_test_file_path=None,
-                drift_report_file_path=self.data_validation_config.drift_report_file_path
+                drift_report_file_path=self.data_validation_config.drift_report_file_path,
+                reference_profile_file_path=self.data_validation_config.reference_profile_file_path,
             )
 
         except Exception as e:
@@ -1,6 +1,7 @@
 import os
 import sys
 import numpy as np
+from scipy import sparse
 import mlflow
 import mlflow.sklearn
 
@@ -14,8 +15,11 @@ from crop_yield.entity.artifact_entity import DataTransformationArtifact, ModelT
 from crop_yield.exception.exception import CropYieldException
 from crop_yield.logging.logger import logging
 from crop_yield.entity.config_entity import ModelTrainerConfig
-from crop_yield.utils.main_utils.utils import save_object, load_object, load_numpy_array_data, evaluate_models
+from crop_yield.constant.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN
+from crop_yield.utils.main_utils.utils import save_object, load_object, load_transformed_data, write_yaml_file, read_yaml_file, link_file
 from crop_yield.utils.ml_utils.model.estimator import CropYieldModel
+from crop_yield.utils.ml_utils.model.bundle import save_model_bundle, export_native_model
+from crop_yield.utils.ml_utils.model.model_selection import ModelSelector
 #import dagshub
 
 # Initialize DagsHub + MLflow
@@ -67,6 +71,33 @@ class ModelTrainer:
         except Exception as e:
             raise CropYieldException(e, sys)
 
+    def save_bundle(self, preprocessor, best_model, train_metric: RegressionMetricArtifact,
+                    test_metric: RegressionMetricArtifact):
+        """Write the single-file model bundle the app serves, and the native XGBoost file if configured."""
+        try:
+            native_model_format = self.model_trainer_config.native_model_format
+            save_model_bundle(
+                self.model_trainer_config.model_bundle_file_path,
+                preprocessor=preprocessor,
+                model=best_model,
+                area_freq_map=load_object(self.data_transformation_artifact.area_freq_map_file_path),
+                schema_columns=read_yaml_file(SCHEMA_FILE_PATH)["columns"],
+                target_column=TARGET_COLUMN,
+                metadata={
+                    "model_name": type(best_model).__name__,
+                    "train_metric": vars(train_metric),
+                    "test_metric": vars(test_metric),
+                },
+                native_model_format=native_model_format,
+            )
+            if native_model_format:
+                native_model_path = os.path.splitext(self.model_trainer_config.best_model_file_path)[0]
+                export_native_model(best_model, f"{native_model_path}.{native_model_format}")
+            link_file(self.model_trainer_config.model_bundle_file_path,
+                      self.model_trainer_config.final_model_bundle_file_path)
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
     def train_model(self, X_train, y_train, X_val, y_val, X_test, y_test):
         try:
             models = {
@@ -93,10 +124,25 @@ class ModelTrainer:
                 "LinearRegression": {}  # No hyperparameter tuning
             }
 
-            model_report = evaluate_models(X_train, y_train, X_val, y_val, models, param)
-            best_model_name = max(model_report, key=model_report.get)
-            best_model = models[best_model_name]
-            best_model.fit(X_train, y_train)
+            if sparse.issparse(X_train):
+                # XGBoost reads entries missing from a CSR matrix as "missing", not 0. With
+                # missing=0.0 it treats explicit zeros the same way, so the model predicts
+                # dense rows at serving time exactly as it saw the sparse rows in training.
+                models["XGBoost"].set_params(missing=0.0)
+
+            model_selector = ModelSelector(
+                strategy=self.model_trainer_config.search_strategy,
+                budget_seconds=self.model_trainer_config.search_budget_seconds,
+                n_iter=self.model_trainer_config.search_n_iter,
+                cv=self.model_trainer_config.search_cv_folds,
+                n_jobs=self.model_trainer_config.n_jobs,
+            )
+            selection_results = model_selector.select(models, param, X_train, y_train, X_val, y_val)
+            write_yaml_file(self.model_trainer_config.model_selection_report_file_path,
+                            ModelSelector.report(selection_results))
+
+            # Already fitted on X_train by the selector; no refit needed
+            best_model = ModelSelector.best(selection_results).estimator
 
             train_metric, test_metric = self.evaluate_regression_model(best_model, X_train, y_train, X_test, y_test)
 
@@ -107,14 +153,18 @@ class ModelTrainer:
 
             final_model = CropYieldModel(preprocessor=preprocessor, model=best_model)
             save_object(self.model_trainer_config.trained_model_file_path, final_model)
-            save_object("final_model/model.pkl", best_model)
-            print(" Model saved to final_model/model.pkl")
+            save_object(self.model_trainer_config.best_model_file_path, best_model)
+            link_file(self.model_trainer_config.best_model_file_path, self.model_trainer_config.final_model_file_path)
+            self.save_bundle(preprocessor, best_model, train_metric, test_metric)
+            logging.info(f"Model saved to {self.model_trainer_config.final_model_file_path}")
 
             # Track with MLflow
             self.track_mlflow(best_model, train_metric, test_metric)
 
             return ModelTrainerArtifact(
                 trained_model_file_path=self.model_trainer_config.trained_model_file_path,
+                best_model_file_path=self.model_trainer_config.best_model_file_path,
+                model_bundle_file_path=self.model_trainer_config.model_bundle_file_path,
                 train_metric_artifact=train_metric,
                 test_metric_artifact=test_metric
             )
@@ -124,13 +174,10 @@ class ModelTrainer:
 
     def initiate_model_trainer(self) -> ModelTrainerArtifact:
         try:
-            train_arr = load_numpy_array_data(self.data_transformation_artifact.transformed_train_file_path)
-            val_arr = load_numpy_array_data(self.data_transformation_artifact.transformed_val_file_path)
-            test_arr = load_numpy_array_data(self.data_transformation_artifact.transformed_test_file_path)
-
-            X_train, y_train = train_arr[:, :-1], train_arr[:, -1]
-            X_val, y_val = val_arr[:, :-1], val_arr[:, -1]
-            X_test, y_test = test_arr[:, :-1], test_arr[:, -1]
+            mmap_mode = self.model_trainer_config.mmap_mode
+            X_train, y_train = load_transformed_data(self.data_transformation_artifact.transformed_train_dir, mmap_mode)
+            X_val, y_val = load_transformed_data(self.data_transformation_artifact.transformed_val_dir, mmap_mode)
+            X_test, y_test = load_transformed_data(self.data_transformation_artifact.transformed_test_dir, mmap_mode)
 
             return self.train_model(X_train, y_train, X_val, y_val, X_test, y_test)
 
@@ -0,0 +1,115 @@
+import os
+
+
+
+"""defining common constant variables for the prediction (serving) pipeline"""
+
+
+"""
+Model registry related constants start with MODEL_REGISTRY_ var names
+"""
+
+# Files the app serves from; every training run links its model, reference profile and metrics here.
+# The training pipeline constants import these names, so the trainer and the registry cannot disagree.
+FINAL_MODEL_DIR: str = "final_model"
+AREA_FREQ_MAP_FILE_NAME: str = "area_freq_map.pkl"
+PREPROCESSOR_FILE_NAME: str = "preprocessor.pkl"
+FINAL_MODEL_FILE_NAME: str = "model.pkl"
+# Preprocessor, model and area_freq_map in one checksummed file (see utils/ml_utils/model/bundle.py),
+# served in preference to the three pickles above when present
+MODEL_BUNDLE_FILE_NAME: str = "model.bundle"
+REFERENCE_PROFILE_FILE_NAME: str = "reference_profile.npz"
+PIPELINE_METRICS_FILE_NAME: str = "pipeline_metrics.json"
+
+# How often (seconds) the registry checks final_model/ for a newer model
+MODEL_REGISTRY_POLL_INTERVAL: float = float(os.getenv("MODEL_REGISTRY_POLL_INTERVAL", 5))
+# Check the bundle's sha256 on every (re)load
+MODEL_BUNDLE_VERIFY_CHECKSUM: bool = os.getenv("MODEL_BUNDLE_VERIFY_CHECKSUM", "true").lower() in ("1", "true", "yes")
+
+
+"""
+Tree engine related constants start with TREE_ENGINE_ var names
+"""
+
+# Predict small batches of RandomForest/DecisionTree/XGBoost models with the flat NumPy tree walk
+TREE_ENGINE_ENABLED: bool = os.getenv("TREE_ENGINE_ENABLED", "false").lower() in ("1", "true", "yes")
+# Largest batch sent to the engine; 0 measures the crossover with the library when the model loads
+TREE_ENGINE_MAX_ROWS: int = int(os.getenv("TREE_ENGINE_MAX_ROWS", 0))
+
+
+"""
+Batch prediction related constants start with BATCH_PREDICTION_ var names
+"""
+
+PREDICTION_OUTPUT_DIR: str = "prediction_output"
+PREDICTION_OUTPUT_FILE_NAME: str = "output.csv"
+PREDICTION_COLUMN_NAME: str = "Predicted_Yield"
+
+# Rows read from an upload per chunk; bounds memory for streamed batch predictions
+BATCH_PREDICTION_CHUNK_SIZE: int = int(os.getenv("BATCH_PREDICTION_CHUNK_SIZE", 50_000))
+# Rows rendered in the HTML table; the full result is only written to disk
+BATCH_PREDICTION_PREVIEW_ROWS: int = int(os.getenv("BATCH_PREDICTION_PREVIEW_ROWS", 100))
+
+
+"""
+Inference executor related constants start with INFERENCE_ var names
+"""
+
+# "thread" or "process": where CPU-bound prediction runs, off the asyncio event loop
+INFERENCE_EXECUTOR_KIND: str = os.getenv("INFERENCE_EXECUTOR_KIND", "thread")
+INFERENCE_MAX_WORKERS: int = int(os.getenv("INFERENCE_MAX_WORKERS", os.cpu_count() or 1))
+# Jobs allowed to wait for a worker; beyond this requests are rejected with 503
+INFERENCE_MAX_QUEUE: int = int(os.getenv("INFERENCE_MAX_QUEUE", 64))
+
+
+"""
+Micro-batching related constants start with MICRO_BATCH_ var names
+"""
+
+# Coalesce concurrent /predict calls into one vectorized model call (off by default)
+MICRO_BATCH_ENABLED: bool = os.getenv("MICRO_BATCH_ENABLED", "false").lower() in ("1", "true", "yes")
+MICRO_BATCH_MAX_SIZE: int = int(os.getenv("MICRO_BATCH_MAX_SIZE", 32))
+MICRO_BATCH_MAX_WAIT_MS: float = float(os.getenv("MICRO_BATCH_MAX_WAIT_MS", 5))
+
+
+"""
+Prediction cache related constants start with PREDICTION_CACHE_ var names
+"""
+
+# Predictions for repeated inputs are served from memory; the cache is emptied when the model changes
+PREDICTION_CACHE_ENABLED: bool = os.getenv("PREDICTION_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+PREDICTION_CACHE_MAX_SIZE: int = int(os.getenv("PREDICTION_CACHE_MAX_SIZE", 100_000))
+# Seconds an entry is served after it was stored; 0 keeps it until evicted
+PREDICTION_CACHE_TTL_SECONDS: float = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS", 3600))
+
+
+"""
+Drift monitor related constants start with DRIFT_MONITOR_ var names
+"""
+
+# Most recent served rows compared against the training reference profile by GET /drift
+DRIFT_MONITOR_WINDOW_SIZE: int = int(os.getenv("DRIFT_MONITOR_WINDOW_SIZE", 10_000))
+# Below this many rows in the window no test is run
+DRIFT_MONITOR_MIN_ROWS: int = int(os.getenv("DRIFT_MONITOR_MIN_ROWS", 100))
+DRIFT_MONITOR_THRESHOLD: float = float(os.getenv("DRIFT_MONITOR_THRESHOLD", 0.05))
+
+
+"""
+Metrics related constants start with METRICS_ var names
+"""
+
+# Upper bounds (seconds) of the latency histogram buckets exposed on GET /metrics
+METRICS_LATENCY_BUCKETS: tuple = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+"""
+Request profiling related constants start with REQUEST_PROFILING_ var names
+"""
+
+# Paths profiled on every request, comma separated (e.g. "/predict-batch"); empty profiles none
+REQUEST_PROFILING_ROUTES: list = [route.strip() for route in os.getenv("REQUEST_PROFILING_ROUTES", "").split(",") if route.strip()]
+# Let any request ask for a profile with ?profile=true; off by default, as profiling slows the server down
+REQUEST_PROFILING_QUERY_FLAG: bool = os.getenv("REQUEST_PROFILING_QUERY_FLAG", "false").lower() in ("1", "true", "yes")
+# Sampling sees the executor threads doing the work; cProfile would only see the event loop
+REQUEST_PROFILING_MODE: str = os.getenv("REQUEST_PROFILING_MODE", "sampling").lower()
+REQUEST_PROFILING_DIR: str = os.path.join(PREDICTION_OUTPUT_DIR, "profiles")
@@ -3,6 +3,16 @@ import sys
 import numpy as np
 import pandas as pd
 
+# Names of the files in final_model/ are defined once, next to the serving code that reads them
+from crop_yield.constant.prediction_pipeline import (
+    FINAL_MODEL_DIR,
+    AREA_FREQ_MAP_FILE_NAME as FINAL_AREA_FREQ_MAP_FILE_NAME,
+    PREPROCESSOR_FILE_NAME as FINAL_PREPROCESSOR_FILE_NAME,
+    FINAL_MODEL_FILE_NAME,
+    MODEL_BUNDLE_FILE_NAME as FINAL_MODEL_BUNDLE_FILE_NAME,
+    REFERENCE_PROFILE_FILE_NAME,
+    PIPELINE_METRICS_FILE_NAME,
+)
 
 
 """defining common contant variables for training pipeline"""
@@ -19,6 +29,17 @@ TEST_FILE_NAME: str = "test.csv"
 
 SCHEMA_FILE_PATH: str = os.path.join("data_schema", "schema.yaml")
 
+TRAINING_PIPELINE_STAGES: list = ["data_ingestion", "data_validation", "data_transformation", "model_trainer"]
+
+"""
+Feature store related constants start with FEATURE_STORE_ var names
+"""
+
+# "parquet" (typed, columnar) or "csv": format of the DataFrames handed between stages
+FEATURE_STORE_FORMAT: str = os.getenv("FEATURE_STORE_FORMAT", "parquet")
+# Low-cardinality string columns stored dictionary-encoded in parquet
+FEATURE_STORE_DICTIONARY_COLUMNS: list = ["Area", "Item"]
+
 SAVED_MODEL_DIR: str = os.path.join("saved_models")
 MODEL_FILE_NAME = "model.pkl"
 
@@ -28,11 +49,47 @@ MODEL_FILE_NAME = "model.pkl"
 DATA_INGESTION_COLLECTION_NAME: str = "crop_yield_data"
 DATA_INGESTION_DATABASE_NAME: str = "crop_yield"
 
+# Shared client (crop_yield/cloud/mongo_client.py), created on first use. Timeouts in ms;
+# MONGO_DB_URL=mongomock:// selects an in-memory stand-in (needs the mongomock package)
+MONGO_CONNECT_TIMEOUT_MS: int = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", 5_000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", 10_000))
+MONGO_SOCKET_TIMEOUT_MS: int = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", 60_000))
+MONGO_MAX_POOL_SIZE: int = int(os.getenv("MONGO_MAX_POOL_SIZE", 20))
+MONGO_HEALTH_CHECK_TIMEOUT_MS: int = int(os.getenv("MONGO_HEALTH_CHECK_TIMEOUT_MS", 2_000))
+
 # Directory settings
 DATA_INGESTION_DIR_NAME: str = "data_ingestion"
 DATA_INGESTION_FEATURE_STORE_DIR: str = "feature_store"
 DATA_INGESTION_INGESTED_DIR: str = "ingested"
 
+# Incremental ingestion: "full" re-reads the whole collection, "incremental" only pulls
+# documents past the stored watermark into a local snapshot shared by all runs
+DATA_INGESTION_MODE: str = os.getenv("DATA_INGESTION_MODE", "full")
+DATA_INGESTION_SNAPSHOT_DIR: str = os.path.join(ARTIFACT_DIR, "mongo_snapshot")
+DATA_INGESTION_WATERMARK_FILE_NAME: str = "watermark.json"
+# Monotonic field used as the high-water mark ("_id" for ObjectIds, or e.g. "Year")
+DATA_INGESTION_WATERMARK_FIELD: str = os.getenv("DATA_INGESTION_WATERMARK_FIELD", "_id")
+# Documents per cursor batch / DataFrame block when reading from MongoDB
+DATA_INGESTION_BATCH_SIZE: int = 10_000
+
+# push_data.py bulk loader: CSV rows read per chunk, documents per insert_many, parallel inserts
+DATA_INGESTION_LOADER_CHUNK_SIZE: int = int(os.getenv("DATA_INGESTION_LOADER_CHUNK_SIZE", 50_000))
+DATA_INGESTION_LOADER_BATCH_SIZE: int = int(os.getenv("DATA_INGESTION_LOADER_BATCH_SIZE", 5_000))
+DATA_INGESTION_LOADER_MAX_WORKERS: int = int(os.getenv("DATA_INGESTION_LOADER_MAX_WORKERS", 4))
+# Unique per source row; re-running the loader skips rows whose key is already stored
+DATA_INGESTION_LOADER_KEY_FIELD: str = "_key"
+# Chunks already loaded, per source file, so an interrupted load resumes where it stopped
+DATA_INGESTION_LOADER_CHECKPOINT_DIR: str = os.path.join(ARTIFACT_DIR, "mongo_load")
+
+# Cleaning before the feature store: median imputation, then IQR outlier removal
+DATA_INGESTION_IMPUTE_COLUMNS: list = ["average_rain_fall_mm_per_year", "pesticides_tonnes", "avg_temp"]
+DATA_INGESTION_OUTLIER_COLUMNS: list = ["hg/ha_yield", "pesticides_tonnes", "avg_temp"]
+DATA_INGESTION_IQR_MULTIPLIER: float = 1.5
+# "memory" cleans the whole collection at once (exact); "chunked" streams it in batch_size
+# blocks and estimates medians/quartiles with quantile sketches of DATA_INGESTION_SKETCH_CAPACITY
+DATA_INGESTION_CLEANING_MODE: str = os.getenv("DATA_INGESTION_CLEANING_MODE", "memory")
+DATA_INGESTION_SKETCH_CAPACITY: int = int(os.getenv("DATA_INGESTION_SKETCH_CAPACITY", 200_000))
+
 # Split ratios 
 DATA_INGESTION_TRAIN_RATIO: float = 0.6
 DATA_INGESTION_VALIDATION_RATIO: float = 0.2
@@ -48,6 +105,15 @@ DATA_VALIDATION_VALID_DIR: str = "validated"
 DATA_VALIDATION_INVALID_DIR: str = "invalid"
 DATA_VALIDATION_DRIFT_REPORT_DIR: str = "drift_report"
 DATA_VALIDATION_DRIFT_REPORT_FILE_NAME: str = "report.yaml"
+# Reference profile of the training split, built once per run and stored next to report.yaml
+DATA_VALIDATION_REFERENCE_PROFILE_FILE_NAME: str = REFERENCE_PROFILE_FILE_NAME
+# Linked into the served model directory for the online drift check in app.py
+DATA_VALIDATION_FINAL_REFERENCE_PROFILE_FILE_PATH: str = os.path.join(FINAL_MODEL_DIR, DATA_VALIDATION_REFERENCE_PROFILE_FILE_NAME)
+# p-value below which a column (KS for numeric, chi-square for categorical) is flagged as drifted
+DATA_VALIDATION_DRIFT_THRESHOLD: float = 0.05
+# Numeric columns are compared on reservoir samples of at most this many values
+DATA_VALIDATION_SAMPLE_SIZE: int = int(os.getenv("DATA_VALIDATION_SAMPLE_SIZE", 100_000))
+DATA_VALIDATION_MAX_WORKERS: int = int(os.getenv("DATA_VALIDATION_MAX_WORKERS", os.cpu_count() or 1))
 #PREPROCESSING_OBJECT_FILE_NAME:str = "preprocessing.pkl"
 
  
@@ -55,6 +121,9 @@ DATA_TRANSFORMATION_DIR_NAME = "data_transformation"
 DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR = "transformed"
 DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR = "preprocessing"
 PREPROCESSING_OBJECT_FILE_NAME = "preprocessing.pkl"
+AREA_FREQ_MAP_FILE_NAME = "area_freq_map.pkl"
+# "csr" stores the transformed features sparse (the one-hot block is mostly zeros), "dense" as one array
+DATA_TRANSFORMATION_OUTPUT_FORMAT: str = os.getenv("DATA_TRANSFORMATION_OUTPUT_FORMAT", "csr")
 
 
 """
@@ -64,8 +133,69 @@ Model Trainer related constants start with MODEL_TRAINER_
 MODEL_TRAINER_DIR_NAME: str = "model_trainer"
 MODEL_TRAINER_TRAINED_MODEL_DIR: str = "trained_model"
 MODEL_TRAINER_TRAINED_MODEL_NAME: str = "model.pkl"
+# The bare best estimator, as served from final_model/model.pkl
+MODEL_TRAINER_BEST_MODEL_NAME: str = "best_model.pkl"
+MODEL_TRAINER_MODEL_BUNDLE_NAME: str = "model.bundle"
+# "json" or "ubj": store an XGBoost winner in its native format in the bundle and next to it; empty keeps pickle
+MODEL_TRAINER_NATIVE_MODEL_FORMAT: str = os.getenv("MODEL_TRAINER_NATIVE_MODEL_FORMAT", "") or None
 MODEL_TRAINER_EXPECTED_SCORE: float = 0.6
 MODEL_TRAINER_OVER_FITTING_UNDER_FITTING_THRESHOLD: float = 0.05
+MODEL_TRAINER_MODEL_SELECTION_REPORT_FILE_NAME: str = "model_selection_report.yaml"
+# "grid" (every combination), "random" (MODEL_TRAINER_SEARCH_N_ITER sampled combinations)
+# or "halving" (successive halving over the grid)
+MODEL_TRAINER_SEARCH_STRATEGY: str = os.getenv("MODEL_TRAINER_SEARCH_STRATEGY", "grid")
+MODEL_TRAINER_SEARCH_N_ITER: int = int(os.getenv("MODEL_TRAINER_SEARCH_N_ITER", 10))
+# Wall-clock seconds for tuning all candidates together (every strategy); 0 means no limit
+MODEL_TRAINER_SEARCH_BUDGET_SECONDS: float = float(os.getenv("MODEL_TRAINER_SEARCH_BUDGET_SECONDS", 0))
+MODEL_TRAINER_SEARCH_CV_FOLDS: int = 3
+# Candidate models tuned in parallel worker processes
+MODEL_TRAINER_N_JOBS: int = int(os.getenv("MODEL_TRAINER_N_JOBS", os.cpu_count() or 1))
+# Transformed datasets are memory-mapped read-only ("r"); None reads them into RAM
+MODEL_TRAINER_MMAP_MODE: str = os.getenv("MODEL_TRAINER_MMAP_MODE", "r") or None
+
+
+"""
+Training job related constants start with TRAINING_JOB_
+"""
+
+# Status files of background training runs started from the API
+TRAINING_JOB_DIR: str = os.path.join(ARTIFACT_DIR, "training_jobs")
+# Held while a run may write to final_model/, so two runs never overlap
+TRAINING_JOB_LOCK_FILE_PATH: str = os.path.join(FINAL_MODEL_DIR, ".training.lock")
 
 
+"""
+Stage cache related constants start with STAGE_CACHE_
+"""
+
+# Skip validation, transformation and training when their inputs, schema, config and code are unchanged
+STAGE_CACHE_ENABLED: bool = os.getenv("STAGE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+STAGE_CACHE_DIR: str = os.path.join(ARTIFACT_DIR, "stage_cache")
+# Timestamped run directories kept under artifacts/ (least recently used are removed first); 0 keeps all
+STAGE_CACHE_MAX_RUNS: int = int(os.getenv("STAGE_CACHE_MAX_RUNS", 10))
+# Upper bound on the total size of those run directories in MB; 0 means no limit
+STAGE_CACHE_MAX_SIZE_MB: float = float(os.getenv("STAGE_CACHE_MAX_SIZE_MB", 0))
+
+
+"""
+Pipeline metrics related constants start with PIPELINE_METRICS_
+"""
+
+# Per-stage duration, row count and state of a run go into PIPELINE_METRICS_FILE_NAME in its artifact dir;
+# the last run's copy is read by the app's GET /metrics
+PIPELINE_METRICS_FINAL_FILE_PATH: str = os.path.join(FINAL_MODEL_DIR, PIPELINE_METRICS_FILE_NAME)
+
+
+"""
+Profiling related constants start with PROFILING_
+"""
 
+# Profile every TrainingPipeline stage into artifacts/<timestamp>/profiles/
+PROFILING_ENABLED: bool = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+# "cprofile" (deterministic, <name>.prof) or "sampling" (stack samples of all threads, <name>.collapsed)
+PROFILING_MODE: str = os.getenv("PROFILING_MODE", "cprofile").lower()
+PROFILING_SAMPLE_INTERVAL_MS: float = float(os.getenv("PROFILING_SAMPLE_INTERVAL_MS", 5))
+# Also trace allocations with tracemalloc (<name>.memory.txt); slows the profiled code down noticeably
+PROFILING_TRACEMALLOC: bool = os.getenv("PROFILING_TRACEMALLOC", "true").lower() in ("1", "true", "yes")
+PROFILING_TRACEMALLOC_TOP: int = int(os.getenv("PROFILING_TRACEMALLOC_TOP", 30))
+PROFILING_DIR_NAME: str = "profiles"
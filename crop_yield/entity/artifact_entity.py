@@ -18,14 +18,16 @@ class DataValidationArtifact:
     invalid_val_file_path: str
     invalid_test_file_path: str
     drift_report_file_path: str
+    reference_profile_file_path: str
 
 
 @dataclass
 class DataTransformationArtifact:
     transformed_object_file_path: str
-    transformed_train_file_path: str
-    transformed_val_file_path: str
-    transformed_test_file_path: str
+    transformed_train_dir: str
+    transformed_val_dir: str
+    transformed_test_dir: str
+    area_freq_map_file_path: str
     
 @dataclass
 class RegressionMetricArtifact:
@@ -36,5 +38,7 @@ class RegressionMetricArtifact:
 @dataclass
 class ModelTrainerArtifact:
     trained_model_file_path: str
+    best_model_file_path: str
+    model_bundle_file_path: str
     train_metric_artifact: RegressionMetricArtifact
     test_metric_artifact: RegressionMetricArtifact
\ No newline at end of file
@@ -1,14 +1,17 @@
 from datetime import datetime
 import os
 from crop_yield.constant import training_pipeline
+from crop_yield.utils.main_utils.feature_store import resolve_storage_format, storage_file_name
 
 class TrainingPipelineConfig:
-    def __init__(self, timestamp=datetime.now()):
+    def __init__(self, timestamp=datetime.now(), storage_format: str = training_pipeline.FEATURE_STORE_FORMAT):
         timestamp = timestamp.strftime("%m_%d_%Y_%H_%M_%S")
         self.pipeline_name = training_pipeline.TRAINING_PIPELINE_NAME
         self.artifact_name = training_pipeline.ARTIFACT_DIR
         self.artifact_dir = os.path.join(self.artifact_name, timestamp)
         self.timestamp: str = timestamp
+        # File format of every DataFrame handed from one stage to the next
+        self.storage_format: str = resolve_storage_format(storage_format)
 
 
 class DataIngestionConfig:
@@ -21,25 +24,25 @@ class DataIngestionConfig:
         self.feature_store_file_path: str = os.path.join(
             self.data_ingestion_dir,
             training_pipeline.DATA_INGESTION_FEATURE_STORE_DIR,
-            training_pipeline.FILE_NAME
+            storage_file_name(training_pipeline.FILE_NAME, training_pipeline_config.storage_format)
         )
 
         self.training_file_path: str = os.path.join(
             self.data_ingestion_dir,
             training_pipeline.DATA_INGESTION_INGESTED_DIR,
-            training_pipeline.TRAIN_FILE_NAME
+            storage_file_name(training_pipeline.TRAIN_FILE_NAME, training_pipeline_config.storage_format)
         )
 
         self.validation_file_path: str = os.path.join(
             self.data_ingestion_dir,
             training_pipeline.DATA_INGESTION_INGESTED_DIR,
-            training_pipeline.VALIDATION_FILE_NAME
+            storage_file_name(training_pipeline.VALIDATION_FILE_NAME, training_pipeline_config.storage_format)
         )
 
         self.testing_file_path: str = os.path.join(
             self.data_ingestion_dir,
             training_pipeline.DATA_INGESTION_INGESTED_DIR,
-            training_pipeline.TEST_FILE_NAME
+            storage_file_name(training_pipeline.TEST_FILE_NAME, training_pipeline_config.storage_format)
         )
 
         self.train_ratio: float = training_pipeline.DATA_INGESTION_TRAIN_RATIO
@@ -49,6 +52,23 @@ class DataIngestionConfig:
         self.collection_name: str = training_pipeline.DATA_INGESTION_COLLECTION_NAME
         self.database_name: str = training_pipeline.DATA_INGESTION_DATABASE_NAME
 
+        self.ingestion_mode: str = training_pipeline.DATA_INGESTION_MODE
+        self.batch_size: int = training_pipeline.DATA_INGESTION_BATCH_SIZE
+        self.watermark_field: str = training_pipeline.DATA_INGESTION_WATERMARK_FIELD
+        self.storage_format: str = training_pipeline_config.storage_format
+
+        self.impute_columns: list = training_pipeline.DATA_INGESTION_IMPUTE_COLUMNS
+        self.outlier_columns: list = training_pipeline.DATA_INGESTION_OUTLIER_COLUMNS
+        self.iqr_multiplier: float = training_pipeline.DATA_INGESTION_IQR_MULTIPLIER
+        self.cleaning_mode: str = training_pipeline.DATA_INGESTION_CLEANING_MODE
+        self.sketch_capacity: int = training_pipeline.DATA_INGESTION_SKETCH_CAPACITY
+        # Not under the timestamped run dir: the snapshot and its watermark persist across runs
+        self.snapshot_dir: str = training_pipeline.DATA_INGESTION_SNAPSHOT_DIR
+        self.watermark_file_path: str = os.path.join(
+            self.snapshot_dir,
+            training_pipeline.DATA_INGESTION_WATERMARK_FILE_NAME
+        )
+
 
 class DataValidationConfig:
     def __init__(self, training_pipeline_config: TrainingPipelineConfig):
@@ -67,30 +87,31 @@ class DataValidationConfig:
             training_pipeline.DATA_VALIDATION_INVALID_DIR
         )
 
+        storage_format = training_pipeline_config.storage_format
         self.valid_train_file_path: str = os.path.join(
             self.valid_data_dir,
-            training_pipeline.TRAIN_FILE_NAME
+            storage_file_name(training_pipeline.TRAIN_FILE_NAME, storage_format)
         )
         self.valid_val_file_path: str = os.path.join(
             self.valid_data_dir,
-            training_pipeline.VALIDATION_FILE_NAME
+            storage_file_name(training_pipeline.VALIDATION_FILE_NAME, storage_format)
         )
         self.valid_test_file_path: str = os.path.join(
             self.valid_data_dir,
-            training_pipeline.TEST_FILE_NAME
+            storage_file_name(training_pipeline.TEST_FILE_NAME, storage_format)
         )
 
         self.invalid_train_file_path: str = os.path.join(
             self.invalid_data_dir,
-            training_pipeline.TRAIN_FILE_NAME
+            storage_file_name(training_pipeline.TRAIN_FILE_NAME, storage_format)
         )
         self.invalid_val_file_path: str = os.path.join(
             self.invalid_data_dir,
-            training_pipeline.VALIDATION_FILE_NAME
+            storage_file_name(training_pipeline.VALIDATION_FILE_NAME, storage_format)
         )
         self.invalid_test_file_path: str = os.path.join(
             self.invalid_data_dir,
-            training_pipeline.TEST_FILE_NAME
+            storage_file_name(training_pipeline.TEST_FILE_NAME, storage_format)
         )
 
         self.drift_report_file_path: str = os.path.join(
@@ -98,6 +119,15 @@ class DataValidationConfig:
             training_pipeline.DATA_VALIDATION_DRIFT_REPORT_DIR,
             training_pipeline.DATA_VALIDATION_DRIFT_REPORT_FILE_NAME
         )
+        self.reference_profile_file_path: str = os.path.join(
+            os.path.dirname(self.drift_report_file_path),
+            training_pipeline.DATA_VALIDATION_REFERENCE_PROFILE_FILE_NAME
+        )
+        self.final_reference_profile_file_path: str = training_pipeline.DATA_VALIDATION_FINAL_REFERENCE_PROFILE_FILE_PATH
+
+        self.drift_threshold: float = training_pipeline.DATA_VALIDATION_DRIFT_THRESHOLD
+        self.sample_size: int = training_pipeline.DATA_VALIDATION_SAMPLE_SIZE
+        self.max_workers: int = training_pipeline.DATA_VALIDATION_MAX_WORKERS
         
         
         
@@ -108,29 +138,45 @@ class DataTransformationConfig:
             training_pipeline.DATA_TRANSFORMATION_DIR_NAME
         )
 
-        self.transformed_train_file_path: str = os.path.join(
+        # One directory per split holding X and y as separate .npy files
+        self.transformed_train_dir: str = os.path.join(
             self.data_transformation_dir,
             training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
-            training_pipeline.TRAIN_FILE_NAME.replace("csv", "npy")
+            os.path.splitext(training_pipeline.TRAIN_FILE_NAME)[0]
         )
 
-        self.transformed_val_file_path: str = os.path.join(
+        self.transformed_val_dir: str = os.path.join(
             self.data_transformation_dir,
             training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
-            training_pipeline.VALIDATION_FILE_NAME.replace("csv", "npy")
+            os.path.splitext(training_pipeline.VALIDATION_FILE_NAME)[0]
         )
 
-        self.transformed_test_file_path: str = os.path.join(
+        self.transformed_test_dir: str = os.path.join(
             self.data_transformation_dir,
             training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR,
-            training_pipeline.TEST_FILE_NAME.replace("csv", "npy")
+            os.path.splitext(training_pipeline.TEST_FILE_NAME)[0]
         )
 
+        self.output_format: str = training_pipeline.DATA_TRANSFORMATION_OUTPUT_FORMAT
+
         self.transformed_object_file_path: str = os.path.join(
             self.data_transformation_dir,
             training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,
             training_pipeline.PREPROCESSING_OBJECT_FILE_NAME
         )
+
+        self.area_freq_map_file_path: str = os.path.join(
+            self.data_transformation_dir,
+            training_pipeline.DATA_TRANSFORMATION_TRANSFORMED_OBJECT_DIR,
+            training_pipeline.AREA_FREQ_MAP_FILE_NAME
+        )
+
+        self.final_preprocessor_file_path: str = os.path.join(
+            training_pipeline.FINAL_MODEL_DIR, training_pipeline.FINAL_PREPROCESSOR_FILE_NAME
+        )
+        self.final_area_freq_map_file_path: str = os.path.join(
+            training_pipeline.FINAL_MODEL_DIR, training_pipeline.FINAL_AREA_FREQ_MAP_FILE_NAME
+        )
         
         
 class ModelTrainerConfig:
@@ -146,5 +192,34 @@ class ModelTrainerConfig:
             training_pipeline.MODEL_TRAINER_TRAINED_MODEL_NAME
         )
 
+        self.best_model_file_path: str = os.path.join(
+            self.model_trainer_dir,
+            training_pipeline.MODEL_TRAINER_TRAINED_MODEL_DIR,
+            training_pipeline.MODEL_TRAINER_BEST_MODEL_NAME
+        )
+        self.final_model_file_path: str = os.path.join(
+            training_pipeline.FINAL_MODEL_DIR, training_pipeline.FINAL_MODEL_FILE_NAME
+        )
+        self.model_bundle_file_path: str = os.path.join(
+            self.model_trainer_dir,
+            training_pipeline.MODEL_TRAINER_TRAINED_MODEL_DIR,
+            training_pipeline.MODEL_TRAINER_MODEL_BUNDLE_NAME
+        )
+        self.final_model_bundle_file_path: str = os.path.join(
+            training_pipeline.FINAL_MODEL_DIR, training_pipeline.FINAL_MODEL_BUNDLE_FILE_NAME
+        )
+        self.native_model_format: str = training_pipeline.MODEL_TRAINER_NATIVE_MODEL_FORMAT
+
         self.expected_score: float = training_pipeline.MODEL_TRAINER_EXPECTED_SCORE
         self.overfitting_underfitting_threshold: float = training_pipeline.MODEL_TRAINER_OVER_FITTING_UNDER_FITTING_THRESHOLD
+        self.mmap_mode: str = training_pipeline.MODEL_TRAINER_MMAP_MODE
+
+        self.model_selection_report_file_path: str = os.path.join(
+            self.model_trainer_dir,
+            training_pipeline.MODEL_TRAINER_MODEL_SELECTION_REPORT_FILE_NAME
+        )
+        self.search_strategy: str = training_pipeline.MODEL_TRAINER_SEARCH_STRATEGY
+        self.search_n_iter: int = training_pipeline.MODEL_TRAINER_SEARCH_N_ITER
+        self.search_budget_seconds: float = training_pipeline.MODEL_TRAINER_SEARCH_BUDGET_SECONDS
+        self.search_cv_folds: int = training_pipeline.MODEL_TRAINER_SEARCH_CV_FOLDS
+        self.n_jobs: int = training_pipeline.MODEL_TRAINER_N_JOBS
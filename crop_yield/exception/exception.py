@@ -1,6 +1,5 @@
 import sys
 from crop_yield.logging import logger
-print("Running exception.py...")
 
 class CropYieldException(Exception):
     """Base class for exceptions in the crop yield prediction module."""
@@ -1,20 +1,174 @@
-import logging
+"""
+Process-wide logging setup.
+
+Every record goes through a QueueHandler on the root logger, so the calling
+thread (a request handler, a pipeline stage) only puts it on a queue; a
+QueueListener thread formats and writes it to logs/crop_yield.log, rotated by
+size. Nothing touches the disk at import: the listener, the logs/ directory
+and the file are set up when the first record is emitted.
+
+    LOG_FORMAT=json               one JSON object per line instead of text
+    LOG_REQUEST_SAMPLE_RATE=0.01  fraction of per-request log lines kept
+"""
 import os
-from datetime import datetime
+import json
+import queue
+import atexit
+import random
+import logging
+import threading
+import multiprocessing
+import multiprocessing.util
+import logging.handlers
+from datetime import datetime, timezone
+
+LOG_DIR: str = os.path.abspath(os.getenv("LOG_DIR", "logs"))
+LOG_FILE_NAME: str = "crop_yield.log"
+LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO").upper()
+# "text" or "json" (JSON lines)
+LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text").lower()
+# The file is rotated at LOG_MAX_BYTES, keeping LOG_BACKUP_COUNT old files
+LOG_MAX_BYTES: int = int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024))
+LOG_BACKUP_COUNT: int = int(os.getenv("LOG_BACKUP_COUNT", 5))
+# Records waiting for the writer thread; beyond this they are dropped rather than blocking the caller
+LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", 10_000))
+# Fraction of successful requests logged by the app; failed ones are always logged
+LOG_REQUEST_SAMPLE_RATE: float = float(os.getenv("LOG_REQUEST_SAMPLE_RATE", 0.01))
+
+TEXT_LOG_FORMAT = "[ %(asctime)s] %(lineno)d %(name)s - %(levelname)s - %(message)s"
+
+# Attributes every LogRecord has; anything else was passed with extra= and goes into the JSON line
+_RECORD_ATTRIBUTES = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "lineno": record.lineno,
+            "process": record.process,
+            "message": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def build_file_handler(file_path: str, log_format: str = LOG_FORMAT) -> logging.Handler:
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    handler = logging.handlers.RotatingFileHandler(
+        file_path, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+    handler.setFormatter(JsonFormatter() if log_format == "json" else logging.Formatter(TEXT_LOG_FORMAT))
+    return handler
+
+
+def log_file_path() -> str:
+    # Rotation is not safe across processes, so worker processes (the inference
+    # process pool) write their own file
+    if multiprocessing.parent_process() is not None:
+        return os.path.join(LOG_DIR, f"{os.path.splitext(LOG_FILE_NAME)[0]}.{os.getpid()}.log")
+    return os.path.join(LOG_DIR, LOG_FILE_NAME)
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that starts its QueueListener on the first record of each
+    process (again after a fork, which does not copy the writer thread) and
+    drops records instead of blocking once `queue_size` are waiting.
+    """
+
+    def __init__(self, queue_size: int = LOG_QUEUE_SIZE, target: logging.Handler = None):
+        # SimpleQueue: a lock-free C put, several times cheaper than queue.Queue's
+        super().__init__(queue.SimpleQueue())
+        self.queue_size = queue_size
+        # Where the writer thread sends records; by default the rotating log file of this process
+        self.target = target
+        self.listener = None
+        self.dropped = 0
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+    def start(self):
+        with self._start_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Forked child: the inherited queue may hold the parent's records, and no thread drains it
+                self.queue = queue.SimpleQueue()
+            target = self.target or build_file_handler(log_file_path())
+            self.listener = logging.handlers.QueueListener(self.queue, target)
+            self.listener.start()
+            self._pid = os.getpid()
+            if multiprocessing.parent_process() is not None:
+                # multiprocessing children exit without running atexit handlers
+                multiprocessing.util.Finalize(self, self.stop, exitpriority=10)
+
+    def stop(self):
+        """Write out the queued records and stop the writer thread."""
+        with self._start_lock:
+            if self._pid != os.getpid() or self.listener is None:
+                return
+            self.listener.stop()
+            for handler in self.listener.handlers:
+                handler.close()
+            self.listener = None
+            self._pid = None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Like QueueHandler.prepare, resolve what cannot cross to the writer thread (args, the
+        # traceback object), but keep the traceback in exc_text so the formatter places it.
+        # The shallow copy (other handlers still see the original) skips copy.copy's pickling protocol.
+        prepared = logging.LogRecord.__new__(logging.LogRecord)
+        prepared.__dict__.update(record.__dict__)
+        record = prepared
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self._pid != os.getpid():
+            self.start()
+        if self.queue.qsize() >= self.queue_size:
+            self.dropped += 1
+            return
+        self.queue.put_nowait(record)
+
+
+def get_queue_handler() -> AsyncQueueHandler:
+    for handler in logging.root.handlers:
+        if isinstance(handler, AsyncQueueHandler):
+            return handler
+    handler = AsyncQueueHandler()
+    logging.root.addHandler(handler)
+    atexit.register(handler.stop)
+    return handler
+
+
+def configure_logging():
+    """Start the writer now instead of on the first record, e.g. to surface an unwritable LOG_DIR at startup."""
+    get_queue_handler().start()
+
+
+def shutdown_logging():
+    get_queue_handler().stop()
+
 
-# Create log file name with timestamp
-LOG_FILE = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
+def sample_request_log(rate: float = LOG_REQUEST_SAMPLE_RATE) -> bool:
+    """Whether to log this request; checked before building the message, so skipped ones cost one random()."""
+    return rate >= 1 or (rate > 0 and random.random() < rate)
 
-# Folder to store logs
-logs_dir = os.path.join(os.getcwd(), "logs")
-os.makedirs(logs_dir, exist_ok=True)
 
-# Full path for log file
-LOG_FILE_PATH = os.path.join(logs_dir, LOG_FILE)
+# Per-request lines (access log), written only for sampled requests
+request_logger = logging.getLogger("crop_yield.request")
 
-# Setup basic logging config
-logging.basicConfig(
-    filename=LOG_FILE_PATH,
-    format="[ %(asctime)s] %(lineno)d %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO,
-)
+logging.root.setLevel(LOG_LEVEL)
+get_queue_handler()
@@ -0,0 +1,115 @@
+import os
+import sys
+import time
+import asyncio
+from typing import IO, AsyncIterator, Awaitable, Callable, Iterator, Tuple
+
+import pandas as pd
+
+from crop_yield.constant.prediction_pipeline import BATCH_PREDICTION_CHUNK_SIZE
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.logging.logger import logging
+from crop_yield.utils.main_utils.metrics import (
+    INFERENCE_STAGE_SECONDS,
+    BATCH_PREDICTION_ROWS,
+    BATCH_PREDICTION_SECONDS,
+    BATCH_PREDICTION_ROWS_PER_SECOND,
+)
+
+
+STREAM_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class BatchPrediction:
+    """
+    Chunked batch prediction over a CSV source.
+
+    The input is read `chunk_size` rows at a time and every chunk is predicted
+    and encoded before the next one is read, so memory stays bounded by the
+    chunk size rather than the size of the upload. `predict_chunk` is an async
+    callable returning the chunk with the prediction column added, typically
+    a job on the InferenceExecutor; file reads and encoding run in a thread so
+    the event loop is never blocked.
+    """
+
+    def __init__(self, predict_chunk: Callable[[pd.DataFrame], Awaitable[pd.DataFrame]],
+                 chunk_size: int = BATCH_PREDICTION_CHUNK_SIZE):
+        try:
+            self.predict_chunk = predict_chunk
+            self.chunk_size = chunk_size
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def read_chunks(self, file: IO) -> Iterator[pd.DataFrame]:
+        try:
+            return pd.read_csv(file, chunksize=self.chunk_size)
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    @staticmethod
+    def next_chunk(reader: Iterator[pd.DataFrame]):
+        with INFERENCE_STAGE_SECONDS.time(stage="decode"):
+            return next(reader, None)
+
+    @staticmethod
+    def record_throughput(total_rows: int, started: float):
+        seconds = time.perf_counter() - started
+        BATCH_PREDICTION_ROWS.inc(total_rows)
+        BATCH_PREDICTION_SECONDS.observe(seconds)
+        if seconds > 0:
+            BATCH_PREDICTION_ROWS_PER_SECOND.set(total_rows / seconds)
+
+    async def predict_chunks(self, file: IO) -> AsyncIterator[pd.DataFrame]:
+        reader = await asyncio.to_thread(self.read_chunks, file)
+        while True:
+            chunk = await asyncio.to_thread(self.next_chunk, reader)
+            if chunk is None:
+                break
+            yield await self.predict_chunk(chunk)
+
+    @staticmethod
+    def encode_chunk(dataframe: pd.DataFrame, output_format: str, header: bool) -> bytes:
+        try:
+            if output_format == "csv":
+                return dataframe.to_csv(index=False, header=header).encode()
+            if output_format == "ndjson":
+                text = dataframe.to_json(orient="records", lines=True)
+                return (text if text.endswith("\n") else text + "\n").encode()
+            raise ValueError(f"Unsupported output format: {output_format}")
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    async def stream(self, file: IO, output_format: str) -> AsyncIterator[bytes]:
+        """Yield encoded predictions chunk by chunk (CSV with a single header, or NDJSON)."""
+        total_rows = 0
+        started = time.perf_counter()
+        async for chunk in self.predict_chunks(file):
+            yield await asyncio.to_thread(self.encode_chunk, chunk, output_format, total_rows == 0)
+            total_rows += len(chunk)
+        self.record_throughput(total_rows, started)
+        logging.info(f"Streamed {total_rows} batch predictions as {output_format}")
+
+    async def predict_to_file(self, file: IO, output_file_path: str, preview_rows: int) -> Tuple[pd.DataFrame, int]:
+        """
+        Write all predictions to output_file_path and return (first preview_rows rows, total rows).
+        """
+        try:
+            os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
+            previews = []
+            total_rows = 0
+            started = time.perf_counter()
+            with open(output_file_path, "w", newline="") as output_file:
+                async for chunk in self.predict_chunks(file):
+                    await asyncio.to_thread(chunk.to_csv, output_file, index=False, header=total_rows == 0)
+                    if total_rows < preview_rows:
+                        previews.append(chunk.head(preview_rows - total_rows))
+                    total_rows += len(chunk)
+            self.record_throughput(total_rows, started)
+            preview = pd.concat(previews, ignore_index=True) if previews else pd.DataFrame()
+            logging.info(f"Wrote {total_rows} batch predictions to {output_file_path}")
+            return preview, total_rows
+        except Exception as e:
+            raise CropYieldException(e, sys)
@@ -0,0 +1,97 @@
+"""
+Per-stage durations and row counts of a training run.
+
+TrainingPipeline records every stage into <artifact_dir>/pipeline_metrics.json
+as it finishes, so a failed run still leaves a report of what it got through;
+the finished report is linked to final_model/pipeline_metrics.json, where
+the app reads it for /metrics.
+"""
+import os
+import sys
+import time
+from typing import Optional
+
+from crop_yield.constant.training_pipeline import PIPELINE_METRICS_FILE_NAME, PIPELINE_METRICS_FINAL_FILE_PATH
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.logging.logger import logging
+from crop_yield.utils.main_utils.utils import read_json_file, write_json_file, link_file
+from crop_yield.utils.main_utils.feature_store import count_rows
+
+
+def count_file_rows(*file_paths: str) -> Optional[int]:
+    """Total rows of the stage outputs that exist, None if there are none."""
+    counts = [count_rows(file_path) for file_path in file_paths if file_path and os.path.exists(file_path)]
+    return sum(counts) if counts else None
+
+
+def count_transformed_rows(*dir_paths: str) -> Optional[int]:
+    """Total rows of save_transformed_dataset directories, from their dataset.json."""
+    counts = []
+    for dir_path in dir_paths:
+        meta = read_json_file(os.path.join(dir_path, "dataset.json")) if dir_path else None
+        if meta is not None:
+            counts.append(int(meta["X_shape"][0]))
+    return sum(counts) if counts else None
+
+
+class PipelineMetricsRecorder:
+    def __init__(self, artifact_dir: str, final_file_path: str = PIPELINE_METRICS_FINAL_FILE_PATH):
+        self.file_path = os.path.join(artifact_dir, PIPELINE_METRICS_FILE_NAME)
+        self.final_file_path = final_file_path
+        self.report = {
+            "run_dir": artifact_dir,
+            "status": "running",
+            "started_at": time.time(),
+            "finished_at": None,
+            "duration_seconds": None,
+            "stages": {},
+        }
+
+    def record_stage(self, stage: str, state: str, duration_seconds: float, rows: Optional[int] = None):
+        try:
+            self.report["stages"][stage] = {
+                "state": state,
+                "duration_seconds": round(duration_seconds, 6),
+                "rows": rows,
+            }
+            write_json_file(self.file_path, self.report)
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def finish(self, status: str):
+        """Close the report as "completed" or "failed" and publish it to final_model/."""
+        try:
+            finished_at = time.time()
+            self.report.update(status=status, finished_at=finished_at,
+                               duration_seconds=round(finished_at - self.report["started_at"], 6))
+            write_json_file(self.file_path, self.report)
+            link_file(self.file_path, self.final_file_path)
+            logging.info(f"Pipeline metrics written to {self.file_path}")
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+
+def export_pipeline_metrics(file_path: str = PIPELINE_METRICS_FINAL_FILE_PATH) -> Optional[dict]:
+    """Set the pipeline gauges of the metrics registry from the last run's report, if there is one."""
+    from crop_yield.utils.main_utils import metrics
+
+    try:
+        report = read_json_file(file_path)
+        for gauge in (metrics.PIPELINE_STAGE_DURATION_SECONDS, metrics.PIPELINE_STAGE_ROWS,
+                      metrics.PIPELINE_STAGE_CACHED, metrics.PIPELINE_LAST_RUN_TIMESTAMP_SECONDS,
+                      metrics.PIPELINE_LAST_RUN_DURATION_SECONDS, metrics.PIPELINE_LAST_RUN_SUCCESS):
+            gauge.clear()
+        if report is None:
+            return None
+        for stage, entry in report["stages"].items():
+            metrics.PIPELINE_STAGE_DURATION_SECONDS.set(entry["duration_seconds"], stage=stage)
+            metrics.PIPELINE_STAGE_CACHED.set(entry["state"] == "cached", stage=stage)
+            if entry["rows"] is not None:
+                metrics.PIPELINE_STAGE_ROWS.set(entry["rows"], stage=stage)
+        if report["finished_at"] is not None:
+            metrics.PIPELINE_LAST_RUN_TIMESTAMP_SECONDS.set(report["finished_at"])
+            metrics.PIPELINE_LAST_RUN_DURATION_SECONDS.set(report["duration_seconds"])
+            metrics.PIPELINE_LAST_RUN_SUCCESS.set(report["status"] == "completed")
+        return report
+    except Exception as e:
+        raise CropYieldException(e, sys)
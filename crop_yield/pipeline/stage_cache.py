@@ -0,0 +1,317 @@
+"""
+Content-addressed cache of pipeline stage artifacts.
+
+A stage's key is a hash of everything its output depends on: the key (or
+file contents) of its inputs, data_schema/schema.yaml, the settings on its
+config object and the source of its component's module and of every
+crop_yield module that module imports, directly or not. When a later run computes
+the same key, the stage is skipped and the artifact dataclass saved by the
+earlier run is reused, with its files left where that run wrote them.
+"""
+import os
+import re
+import ast
+import sys
+import json
+import time
+import shutil
+import hashlib
+import dataclasses
+import importlib.util
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+from crop_yield.constant.training_pipeline import (
+    ARTIFACT_DIR,
+    SCHEMA_FILE_PATH,
+    STAGE_CACHE_DIR,
+    STAGE_CACHE_ENABLED,
+    STAGE_CACHE_MAX_RUNS,
+    STAGE_CACHE_MAX_SIZE_MB,
+)
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.logging.logger import logging
+from crop_yield.utils.main_utils.utils import read_json_file, write_json_file, link_file
+
+# Run directories are named by TrainingPipelineConfig's timestamp
+RUN_DIR_PATTERN = re.compile(r"^\d{2}_\d{2}_\d{4}_\d{2}_\d{2}_\d{2}$")
+RUN_DIR_TIMESTAMP_FORMAT = "%m_%d_%Y_%H_%M_%S"
+
+
+def hash_file(file_path: str, block_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for block in iter(lambda: file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _imported_module_names(file_path: str, module_name: str) -> set:
+    """Every module named by an import statement in the file, including imports inside functions."""
+    with open(file_path, "rb") as file:
+        tree = ast.parse(file.read(), filename=file_path)
+    is_package = os.path.basename(file_path) == "__init__.py"
+    package = module_name if is_package else module_name.rpartition(".")[0]
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = importlib.util.resolve_name("." * node.level + (node.module or ""), package) if node.level \
+                else node.module
+            names.add(base)
+            # `from package import submodule` names a module too; other names are simply not found
+            names.update(f"{base}.{alias.name}" for alias in node.names)
+    return names
+
+
+def _module_file(module_name: str) -> Optional[str]:
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except (ImportError, ValueError, AttributeError):
+        return None
+    if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+        return None
+    return spec.origin
+
+
+@lru_cache(maxsize=None)
+def source_dependencies(module_name: str, package: str = "crop_yield") -> Tuple[str, ...]:
+    """Source files of `module_name` and of every module of `package` it imports, transitively."""
+    files = {}
+    pending = [module_name]
+    while pending:
+        name = pending.pop()
+        if name in files:
+            continue
+        file_path = _module_file(name)
+        files[name] = file_path
+        if file_path is None:
+            continue
+        for imported in _imported_module_names(file_path, name):
+            if (imported == package or imported.startswith(package + ".")) and imported not in files:
+                pending.append(imported)
+    return tuple(sorted(file_path for file_path in files.values() if file_path is not None))
+
+
+@dataclasses.dataclass
+class CachedStage:
+    artifact: object
+    run_dir: str
+    published: Dict[str, str]
+
+
+def artifact_to_dict(artifact) -> dict:
+    return dataclasses.asdict(artifact)
+
+
+def artifact_from_dict(artifact_cls, data: dict):
+    """Inverse of artifact_to_dict, rebuilding nested artifacts such as RegressionMetricArtifact."""
+    values = {}
+    for artifact_field in dataclasses.fields(artifact_cls):
+        value = data[artifact_field.name]
+        if dataclasses.is_dataclass(artifact_field.type) and isinstance(value, dict):
+            value = artifact_from_dict(artifact_field.type, value)
+        values[artifact_field.name] = value
+    return artifact_cls(**values)
+
+
+def artifact_paths(artifact) -> list:
+    """Every file or directory an artifact points to (fields named *_path or *_dir)."""
+    paths = []
+    for artifact_field in dataclasses.fields(artifact):
+        value = getattr(artifact, artifact_field.name)
+        if dataclasses.is_dataclass(value):
+            paths.extend(artifact_paths(value))
+        elif isinstance(value, str) and artifact_field.name.endswith(("_path", "_dir")):
+            paths.append(value)
+    return paths
+
+
+class StageCache:
+    """
+    Looks up and stores stage artifacts under artifacts/stage_cache/<stage>/<key>.json,
+    and evicts old run directories from artifacts/.
+
+    An entry records the artifact, the run directory it lives in and the
+    files the stage published into final_model/, so a hit can link those
+    again. Entries whose files are gone are treated as misses. Run
+    directories with entries are ranked by last use (a hit touches the run it
+    reuses), and evict() removes the least recently used beyond `max_runs` or
+    `max_size_mb`, never those the current run still needs nor run
+    directories the cache did not record.
+    """
+
+    def __init__(self, cache_dir: str = STAGE_CACHE_DIR, artifact_root: str = ARTIFACT_DIR,
+                 enabled: bool = STAGE_CACHE_ENABLED, max_runs: int = STAGE_CACHE_MAX_RUNS,
+                 max_size_mb: float = STAGE_CACHE_MAX_SIZE_MB, schema_file_path: str = SCHEMA_FILE_PATH):
+        try:
+            self.cache_dir = cache_dir
+            self.artifact_root = artifact_root
+            self.enabled = enabled
+            self.max_runs = max_runs
+            self.max_size_mb = max_size_mb
+            self.schema_hash = hash_file(schema_file_path)
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def files_key(self, file_paths: Iterable[str]) -> str:
+        """Key of a set of files by content, e.g. the splits written by ingestion."""
+        try:
+            return self._hash([hash_file(file_path) for file_path in file_paths])
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def stage_key(self, stage: str, input_keys: list, config, artifact_dir: str, component) -> str:
+        """
+        Hash of the stage name, its input keys, the schema, the config settings and the
+        source of the component's module and the crop_yield modules it imports (model
+        selection, cleaning, drift, utils, ...). Paths in the config are taken relative
+        to the run directory, so the timestamp does not change the key.
+        """
+        try:
+            settings = {
+                name: value.replace(artifact_dir, "<run>") if isinstance(value, str) else value
+                for name, value in vars(config).items()
+            }
+            return self._hash([stage, input_keys, self.schema_hash, settings, self.code_hash(component)])
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    @staticmethod
+    def code_hash(component) -> str:
+        """Hash of the source files the component depends on, by path relative to the package and content."""
+        digest = hashlib.sha256()
+        for file_path in source_dependencies(component.__module__):
+            digest.update(os.path.relpath(file_path, os.path.dirname(os.path.dirname(__file__))).encode())
+            digest.update(hash_file(file_path).encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _hash(content) -> str:
+        return hashlib.sha256(json.dumps(content, sort_keys=True, default=str).encode()).hexdigest()
+
+    def _entry_path(self, stage: str, key: str) -> str:
+        return os.path.join(self.cache_dir, stage, f"{key}.json")
+
+    def get(self, stage: str, key: str, artifact_cls) -> Optional[CachedStage]:
+        """The cached artifact for `key` if all its files still exist, else None."""
+        try:
+            if not self.enabled:
+                return None
+            entry = read_json_file(self._entry_path(stage, key))
+            if entry is None:
+                return None
+            artifact = artifact_from_dict(artifact_cls, entry["artifact"])
+            published = entry.get("published", {})
+            missing = [path for path in artifact_paths(artifact) + list(published.values()) if not os.path.exists(path)]
+            if missing:
+                logging.info(f"Stage cache entry {stage}/{key[:12]} is stale, missing {missing[:3]}")
+                os.remove(self._entry_path(stage, key))
+                return None
+            if os.path.isdir(entry["run_dir"]):
+                os.utime(entry["run_dir"])
+            return CachedStage(artifact=artifact, run_dir=entry["run_dir"], published=published)
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def put(self, stage: str, key: str, artifact, run_dir: str, published: Dict[str, str]) -> None:
+        try:
+            if not self.enabled:
+                return
+            write_json_file(self._entry_path(stage, key), {
+                "stage": stage,
+                "key": key,
+                "run_dir": run_dir,
+                "created_at": time.time(),
+                "artifact": artifact_to_dict(artifact),
+                "published": published,
+            })
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    @staticmethod
+    def publish(published: Dict[str, str]) -> None:
+        """Link a cached stage's outputs into final_model/ again, as the stage itself would have."""
+        for final_path, artifact_path in published.items():
+            link_file(artifact_path, final_path)
+
+    def _entries(self) -> Iterable[Tuple[str, dict]]:
+        if not os.path.isdir(self.cache_dir):
+            return
+        for stage in os.listdir(self.cache_dir):
+            stage_dir = os.path.join(self.cache_dir, stage)
+            for name in os.listdir(stage_dir):
+                entry_path = os.path.join(stage_dir, name)
+                entry = read_json_file(entry_path)
+                if entry is not None:
+                    yield entry_path, entry
+
+    def cached_run_dirs(self) -> set:
+        """Absolute paths of the run directories that stage cache entries point to."""
+        return {os.path.abspath(entry["run_dir"]) for _, entry in self._entries()}
+
+    def run_dirs(self) -> list:
+        """
+        Timestamped run directories under artifacts/ that the cache has entries for,
+        least recently used first. Runs it knows nothing about, such as a checked-in
+        baseline run or one from before the cache existed, are never candidates.
+        """
+        if not os.path.isdir(self.artifact_root):
+            return []
+        cached_run_dirs = self.cached_run_dirs()
+        run_dirs = [
+            os.path.join(self.artifact_root, name)
+            for name in os.listdir(self.artifact_root)
+            if RUN_DIR_PATTERN.match(name) and os.path.isdir(os.path.join(self.artifact_root, name))
+            and os.path.abspath(os.path.join(self.artifact_root, name)) in cached_run_dirs
+        ]
+
+        def last_used(run_dir):
+            created = datetime.strptime(os.path.basename(run_dir), RUN_DIR_TIMESTAMP_FORMAT).timestamp()
+            return max(os.path.getmtime(run_dir), created)
+
+        return sorted(run_dirs, key=last_used)
+
+    @staticmethod
+    def _dir_size_mb(dir_path: str) -> float:
+        total = 0
+        for root, _, files in os.walk(dir_path):
+            total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+        return total / 1e6
+
+    def evict(self, keep: Iterable[str] = ()) -> list:
+        """
+        Remove least recently used cached run directories (see run_dirs) beyond
+        max_runs / max_size_mb (0 disables a limit), except those in `keep`.
+        Returns the removed directories.
+        """
+        try:
+            keep = {os.path.abspath(path) for path in keep}
+            run_dirs = self.run_dirs()
+            sizes = {run_dir: self._dir_size_mb(run_dir) for run_dir in run_dirs} if self.max_size_mb else {}
+            total_mb = sum(sizes.values())
+            removed = []
+            for run_dir in run_dirs:
+                over_count = self.max_runs and len(run_dirs) - len(removed) > self.max_runs
+                over_size = self.max_size_mb and total_mb > self.max_size_mb
+                if not (over_count or over_size):
+                    break
+                if os.path.abspath(run_dir) in keep:
+                    continue
+                shutil.rmtree(run_dir, ignore_errors=True)
+                total_mb -= sizes.get(run_dir, 0)
+                removed.append(run_dir)
+            if removed:
+                logging.info(f"Evicted {len(removed)} artifact run(s): {removed}")
+                self._drop_entries(removed)
+            return removed
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def _drop_entries(self, removed_run_dirs: list) -> None:
+        removed = {os.path.abspath(path) for path in removed_run_dirs}
+        for entry_path, entry in list(self._entries()):
+            if os.path.abspath(entry["run_dir"]) in removed:
+                os.remove(entry_path)
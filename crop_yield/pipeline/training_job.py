@@ -0,0 +1,211 @@
+import os
+import sys
+import json
+import time
+import uuid
+import traceback
+import multiprocessing
+from typing import Dict, Optional
+
+from crop_yield.constant.training_pipeline import (
+    TRAINING_PIPELINE_STAGES,
+    TRAINING_JOB_DIR,
+    TRAINING_JOB_LOCK_FILE_PATH,
+)
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.logging.logger import logging
+from crop_yield.utils.main_utils.utils import write_json_file
+
+
+class TrainingAlreadyRunningError(Exception):
+    """Raised when a training run is requested while another one holds the final_model/ lock."""
+
+
+def _read_json(file_path: str) -> Optional[dict]:
+    # Tolerant read: the lock may vanish between exists() and open()
+    try:
+        with open(file_path) as file:
+            return json.load(file)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name != "posix":
+        # os.kill(pid, 0) is not a liveness probe on Windows; assume the holder is alive
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class TrainingLock:
+    """
+    Cross-process lock on final_model/, held for the whole training run.
+
+    Created with O_EXCL so only one process can take it; a lock whose owner
+    process is gone is treated as stale and taken over.
+    """
+
+    def __init__(self, lock_file_path: str = TRAINING_JOB_LOCK_FILE_PATH):
+        self.lock_file_path = lock_file_path
+
+    def holder(self) -> Optional[dict]:
+        return _read_json(self.lock_file_path)
+
+    def acquire(self, job_id: str):
+        os.makedirs(os.path.dirname(self.lock_file_path) or ".", exist_ok=True)
+        for _ in range(2):
+            try:
+                fd = os.open(self.lock_file_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                holder = self.holder()
+                if holder is not None and _pid_alive(holder.get("pid", -1)):
+                    raise TrainingAlreadyRunningError(f"Training job {holder.get('job_id')} is already running")
+                logging.warning(f"Removing stale training lock: {holder}")
+                try:
+                    os.remove(self.lock_file_path)
+                except FileNotFoundError:
+                    pass
+                continue
+            with os.fdopen(fd, "w") as file:
+                json.dump({"job_id": job_id, "pid": os.getpid(), "acquired_at": time.time()}, file)
+            return
+        raise TrainingAlreadyRunningError("Could not acquire the training lock")
+
+    def transfer(self, job_id: str, pid: int):
+        """Record the worker process as the lock owner so stale detection follows it."""
+        holder = self.holder()
+        if holder is None or holder.get("job_id") != job_id:
+            # The worker already finished and released the lock
+            return
+        write_json_file(self.lock_file_path, {"job_id": job_id, "pid": pid, "acquired_at": time.time()})
+
+    def release(self, job_id: str):
+        holder = self.holder()
+        if holder is not None and holder.get("job_id") == job_id:
+            try:
+                os.remove(self.lock_file_path)
+            except FileNotFoundError:
+                pass
+
+
+class TrainingJobStatus:
+    """Status file of one training job, written by the worker and read by the API."""
+
+    def __init__(self, job_id: str, job_dir: str = TRAINING_JOB_DIR):
+        self.job_id = job_id
+        self.file_path = os.path.join(job_dir, f"{job_id}.json")
+
+    def create(self) -> dict:
+        status = {
+            "job_id": self.job_id,
+            "state": "queued",
+            "current_stage": None,
+            "stages": {stage: {"state": "pending"} for stage in TRAINING_PIPELINE_STAGES},
+            "created_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+            "artifact_dir": None,
+            "error": None,
+        }
+        write_json_file(self.file_path, status)
+        return status
+
+    def read(self) -> Optional[dict]:
+        return _read_json(self.file_path)
+
+    def update(self, **fields) -> dict:
+        status = self.read() or self.create()
+        status.update(fields)
+        write_json_file(self.file_path, status)
+        return status
+
+    def stage_callback(self, stage: str, state: str):
+        status = self.read()
+        stage_status = status["stages"].setdefault(stage, {})
+        stage_status["state"] = state
+        stage_status["started_at" if state == "running" else "finished_at"] = time.time()
+        status["current_stage"] = stage
+        write_json_file(self.file_path, status)
+
+
+def run_training_job(job_id: str, job_dir: str, lock_file_path: str):
+    """Entry point of the worker process: run the pipeline and record progress per stage."""
+    status = TrainingJobStatus(job_id, job_dir)
+    lock = TrainingLock(lock_file_path)
+    try:
+        # Imported here so only the worker pays for the training stack (mlflow, xgboost, ...)
+        from crop_yield.pipeline.training_pipeline import TrainingPipeline
+
+        training_pipeline = TrainingPipeline(stage_callback=status.stage_callback)
+        status.update(state="running", started_at=time.time(), pid=os.getpid(),
+                      artifact_dir=training_pipeline.training_pipeline_config.artifact_dir)
+        model_trainer_artifact = training_pipeline.run_pipeline()
+        status.update(state="succeeded", finished_at=time.time(), current_stage=None,
+                      trained_model_file_path=model_trainer_artifact.trained_model_file_path)
+        logging.info(f"Training job {job_id} succeeded")
+    except Exception as e:
+        status.update(state="failed", finished_at=time.time(), error=str(e), traceback=traceback.format_exc())
+        logging.error(f"Training job {job_id} failed: {e}")
+    finally:
+        lock.release(job_id)
+
+
+class TrainingJobManager:
+    """
+    Starts TrainingPipeline runs in a separate process and reports their status.
+
+    Only one run may write to final_model/ at a time; submit() raises
+    TrainingAlreadyRunningError while the lock is held, by this or any other
+    API worker.
+    """
+
+    def __init__(self, job_dir: str = TRAINING_JOB_DIR, lock_file_path: str = TRAINING_JOB_LOCK_FILE_PATH):
+        try:
+            self.job_dir = job_dir
+            self.lock = TrainingLock(lock_file_path)
+            self._processes: Dict[str, multiprocessing.Process] = {}
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def submit(self) -> dict:
+        job_id = uuid.uuid4().hex
+        self.lock.acquire(job_id)
+        try:
+            status = TrainingJobStatus(job_id, self.job_dir).create()
+            # spawn: the worker starts clean instead of forking the API's threads and event loop
+            process = multiprocessing.get_context("spawn").Process(
+                target=run_training_job,
+                args=(job_id, self.job_dir, self.lock.lock_file_path),
+                name=f"training-{job_id}",
+                daemon=False,
+            )
+            process.start()
+        except Exception as e:
+            self.lock.release(job_id)
+            raise CropYieldException(e, sys)
+        self.lock.transfer(job_id, process.pid)
+        self._processes[job_id] = process
+        logging.info(f"Started training job {job_id} in process {process.pid}")
+        return status
+
+    def get(self, job_id: str) -> Optional[dict]:
+        status = TrainingJobStatus(job_id, self.job_dir)
+        current = status.read()
+        if current is None:
+            return None
+        process = self._processes.get(job_id)
+        if process is not None and not process.is_alive():
+            process.join()
+            del self._processes[job_id]
+            if current["state"] in ("queued", "running"):
+                # The worker died without recording an outcome (killed, OOM, ...)
+                current = status.update(state="failed", finished_at=time.time(),
+                                        error=f"Training process exited with code {process.exitcode}")
+                self.lock.release(job_id)
+        return current
@@ -1,6 +1,8 @@
 import os
 import sys
+import time
 import numpy as np
+from typing import Callable, Optional
 
 from crop_yield.exception.exception import CropYieldException
 from crop_yield.logging.logger import logging
@@ -9,9 +11,12 @@ from crop_yield.components.data_ingestion import DataIngestion
 from crop_yield.components.data_validation import DataValidation
 from crop_yield.components.data_transformation import DataTransformation
 from crop_yield.components.model_trainer import ModelTrainer
+from crop_yield.pipeline.stage_cache import StageCache
+from crop_yield.pipeline.pipeline_metrics import PipelineMetricsRecorder, count_file_rows, count_transformed_rows
 
-from crop_yield.constant.training_pipeline import SCHEMA_FILE_PATH
+from crop_yield.constant.training_pipeline import SCHEMA_FILE_PATH, PROFILING_DIR_NAME
 from crop_yield.utils.main_utils.utils import read_yaml_file
+from crop_yield.utils.main_utils.profiling import profile_section
 from crop_yield.entity.config_entity import TrainingPipelineConfig, DataIngestionConfig, DataValidationConfig, DataTransformationConfig, ModelTrainerConfig
 
 
@@ -24,8 +29,80 @@ from crop_yield.entity.artifact_entity import (
 )
 
 class TrainingPipeline:
-    def __init__(self):
+    def __init__(self, stage_callback: Optional[Callable[[str, str], None]] = None):
+        # stage_callback(stage, state) is told when each of TRAINING_PIPELINE_STAGES is "running",
+        # "completed", "cached" (skipped, an earlier run's artifact reused) or "failed"
         self.training_pipeline_config = TrainingPipelineConfig()
+        self.stage_callback = stage_callback
+        self.stage_cache = StageCache()
+        # Run directories whose artifacts this run uses; never evicted at the end of the run
+        self.used_run_dirs = {self.training_pipeline_config.artifact_dir}
+        self.metrics = PipelineMetricsRecorder(self.training_pipeline_config.artifact_dir)
+
+    def _notify(self, stage: str, state: str):
+        if self.stage_callback is not None:
+            self.stage_callback(stage, state)
+
+    @staticmethod
+    def _stage_rows(stage: str, artifact, kwargs: dict):
+        """Rows a stage produced; for the trainer, the rows it was trained on."""
+        if stage == "data_ingestion":
+            return count_file_rows(artifact.training_file_path, artifact.validation_file_path, artifact.testing_file_path)
+        if stage == "data_validation":
+            return count_file_rows(artifact.valid_train_file_path, artifact.valid_val_file_path, artifact.valid_test_file_path)
+        if stage == "data_transformation":
+            return count_transformed_rows(artifact.transformed_train_dir, artifact.transformed_val_dir, artifact.transformed_test_dir)
+        if stage == "model_trainer":
+            return count_transformed_rows(kwargs["data_transformation_artifact"].transformed_train_dir)
+        return None
+
+    def _record(self, stage: str, state: str, started: float, artifact=None, kwargs: Optional[dict] = None):
+        rows = None
+        if artifact is not None:
+            try:
+                rows = self._stage_rows(stage, artifact, kwargs or {})
+            except Exception as e:
+                # Row counts are informational; a missing or unreadable output must not fail the run
+                logging.warning(f"Could not count rows for stage {stage}: {e}")
+        self.metrics.record_stage(stage, state, time.perf_counter() - started, rows)
+
+    def _run_stage(self, stage: str, stage_fn: Callable, **kwargs):
+        self._notify(stage, "running")
+        started = time.perf_counter()
+        try:
+            # A no-op unless PROFILING_ENABLED; profiles go to artifacts/<timestamp>/profiles/<stage>.*
+            with profile_section(stage, os.path.join(self.training_pipeline_config.artifact_dir, PROFILING_DIR_NAME)):
+                artifact = stage_fn(**kwargs)
+        except Exception:
+            self._record(stage, "failed", started)
+            self._notify(stage, "failed")
+            raise
+        self._record(stage, "completed", started, artifact, kwargs)
+        self._notify(stage, "completed")
+        return artifact
+
+    def _run_cached_stage(self, stage: str, key: str, artifact_cls, published: Callable, stage_fn: Callable, **kwargs):
+        """
+        Run a stage unless the cache has an artifact for `key`. `published(artifact)`
+        maps the files the stage links into final_model/ to their artifact paths.
+        """
+        cached = self.stage_cache.get(stage, key, artifact_cls)
+        if cached is not None:
+            self._notify(stage, "running")
+            started = time.perf_counter()
+            self.stage_cache.publish(cached.published)
+            self.used_run_dirs.add(cached.run_dir)
+            logging.info(f"Stage {stage} unchanged (key {key[:12]}); reusing {cached.artifact}")
+            self._record(stage, "cached", started, cached.artifact, kwargs)
+            self._notify(stage, "cached")
+            return cached.artifact
+
+        artifact = self._run_stage(stage, stage_fn, **kwargs)
+        self.stage_cache.put(stage, key, artifact, self.training_pipeline_config.artifact_dir, published(artifact))
+        return artifact
+
+    def _stage_key(self, stage: str, input_key: str, config, component) -> str:
+        return self.stage_cache.stage_key(stage, [input_key], config, self.training_pipeline_config.artifact_dir, component)
         
     def start_data_ingestion(self):
         try:
@@ -85,13 +162,52 @@ class TrainingPipeline:
             raise CropYieldException(e, sys)
         
     def run_pipeline(self):
+        status = "failed"
         try:
-            data_ingestion_artifact=self.start_data_ingestion()
-            data_validation_artifact=self.start_data_validation(data_ingestion_artifact=data_ingestion_artifact)
-            data_transformation_artifact=self.start_data_transformation(data_validation_artifact=data_validation_artifact)
-            model_trainer_artifact=self.start_model_trainer(data_transformation_artifact=data_transformation_artifact)
-            
-            
+            # Ingestion always runs: its input is the live collection. Later stages are keyed by
+            # the content of the ingested splits, chained through each stage's key.
+            data_ingestion_artifact=self._run_stage("data_ingestion", self.start_data_ingestion)
+            ingested_key = self.stage_cache.files_key([
+                data_ingestion_artifact.training_file_path,
+                data_ingestion_artifact.validation_file_path,
+                data_ingestion_artifact.testing_file_path,
+            ])
+
+            data_validation_config = DataValidationConfig(training_pipeline_config=self.training_pipeline_config)
+            validation_key = self._stage_key("data_validation", ingested_key, data_validation_config, DataValidation)
+            data_validation_artifact=self._run_cached_stage(
+                "data_validation", validation_key, DataValidationArtifact,
+                lambda artifact: {data_validation_config.final_reference_profile_file_path: artifact.reference_profile_file_path},
+                self.start_data_validation, data_ingestion_artifact=data_ingestion_artifact)
+
+            data_transformation_config = DataTransformationConfig(training_pipeline_config=self.training_pipeline_config)
+            transformation_key = self._stage_key("data_transformation", validation_key, data_transformation_config, DataTransformation)
+            data_transformation_artifact=self._run_cached_stage(
+                "data_transformation", transformation_key, DataTransformationArtifact,
+                lambda artifact: {
+                    data_transformation_config.final_preprocessor_file_path: artifact.transformed_object_file_path,
+                    data_transformation_config.final_area_freq_map_file_path: artifact.area_freq_map_file_path,
+                },
+                self.start_data_transformation, data_validation_artifact=data_validation_artifact)
+
+            model_trainer_config = ModelTrainerConfig(training_pipeline_config=self.training_pipeline_config)
+            trainer_key = self._stage_key("model_trainer", transformation_key, model_trainer_config, ModelTrainer)
+            model_trainer_artifact=self._run_cached_stage(
+                "model_trainer", trainer_key, ModelTrainerArtifact,
+                lambda artifact: {
+                    model_trainer_config.final_model_file_path: artifact.best_model_file_path,
+                    model_trainer_config.final_model_bundle_file_path: artifact.model_bundle_file_path,
+                },
+                self.start_model_trainer, data_transformation_artifact=data_transformation_artifact)
+
+            self.stage_cache.evict(keep=self.used_run_dirs)
+            status = "completed"
             return model_trainer_artifact
         except Exception as e:
-            raise CropYieldException(e,sys)
\ No newline at end of file
+            raise CropYieldException(e,sys)
+        finally:
+            try:
+                self.metrics.finish(status)
+            except Exception as e:
+                # Never mask the run's own error with a reporting one
+                logging.warning(f"Could not write pipeline metrics: {e}")
\ No newline at end of file
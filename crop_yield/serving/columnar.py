@@ -0,0 +1,159 @@
+"""
+Column-oriented batch payloads for POST /predict-batch/columnar.
+
+A request body is one of
+
+    application/json                      {"Area": [...], "Item": [...], "Year": [...], ...}
+    application/vnd.apache.arrow.stream   Arrow IPC stream (or .file) of a table with those columns
+    application/x-npy                     NumPy .npy of a structured array with those fields
+
+and is decoded column by column straight into a DataFrame, never into
+per-row objects; numeric columns must hold numbers or nulls. Predictions are
+returned in the same format: a JSON object with one list (null where the
+model gives no finite number), a one-column Arrow table, or a float64 .npy
+array.
+application/octet-stream bodies are recognised by their magic bytes.
+"""
+import io
+import sys
+import json
+from typing import Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from crop_yield.constant.prediction_pipeline import PREDICTION_COLUMN_NAME
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.utils.main_utils.metrics import INFERENCE_STAGE_SECONDS
+
+COLUMNAR_MEDIA_TYPES = {
+    "json": "application/json",
+    "arrow-stream": "application/vnd.apache.arrow.stream",
+    "arrow-file": "application/vnd.apache.arrow.file",
+    "npy": "application/x-npy",
+}
+_FORMATS_BY_MEDIA_TYPE = {media_type: payload_format for payload_format, media_type in COLUMNAR_MEDIA_TYPES.items()}
+
+NPY_MAGIC = b"\x93NUMPY"
+ARROW_FILE_MAGIC = b"ARROW1"
+# IPC streams start with a message whose length is prefixed by the 0xFFFFFFFF continuation marker
+ARROW_STREAM_MAGIC = b"\xff\xff\xff\xff"
+
+
+class ColumnarPayloadError(ValueError):
+    """A body that cannot be decoded (400) or is in an unsupported format (415)."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def payload_format(content_type: str, body: bytes) -> str:
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type in _FORMATS_BY_MEDIA_TYPE:
+        return _FORMATS_BY_MEDIA_TYPE[media_type]
+    if media_type in ("application/octet-stream", ""):
+        if body.startswith(NPY_MAGIC):
+            return "npy"
+        if body.startswith(ARROW_FILE_MAGIC):
+            return "arrow-file"
+        if body.startswith(ARROW_STREAM_MAGIC):
+            return "arrow-stream"
+    raise ColumnarPayloadError(
+        f"Unsupported content type '{content_type}'; send one of {sorted(_FORMATS_BY_MEDIA_TYPE)}", status_code=415)
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        return pyarrow
+    except ImportError:
+        raise ColumnarPayloadError("Arrow payloads need pyarrow, which is not installed", status_code=415)
+
+
+def _decode_json(body: bytes) -> dict:
+    columns = json.loads(body)
+    if not isinstance(columns, dict) or not all(isinstance(values, list) for values in columns.values()):
+        raise ColumnarPayloadError("Expected a JSON object mapping each column name to a list of values")
+    return columns
+
+
+def _decode_arrow(body: bytes, payload_format: str) -> pd.DataFrame:
+    pyarrow = _import_pyarrow()
+    reader = pyarrow.ipc.open_file(body) if payload_format == "arrow-file" else pyarrow.ipc.open_stream(body)
+    return reader.read_all().to_pandas()
+
+
+def _decode_npy(body: bytes) -> dict:
+    array = np.load(io.BytesIO(body), allow_pickle=False)
+    if array.dtype.names is None or array.ndim != 1:
+        raise ColumnarPayloadError("Expected a 1-D structured .npy array with one field per column")
+    return {name: array[name] for name in array.dtype.names}
+
+
+def _to_numeric(dataframe: pd.DataFrame, numeric_columns: Iterable[str]) -> pd.DataFrame:
+    for column in numeric_columns:
+        try:
+            dataframe[column] = pd.to_numeric(dataframe[column], errors="raise")
+        except (ValueError, TypeError) as e:
+            raise ColumnarPayloadError(f"Column {column} must hold numbers or nulls: {e}")
+    return dataframe
+
+
+def decode_columns(body: bytes, content_type: str, columns: List[str],
+                   numeric_columns: Iterable[str] = ()) -> Tuple[pd.DataFrame, str]:
+    """(DataFrame with `columns`, payload format) for a request body; extra columns are ignored."""
+    try:
+        with INFERENCE_STAGE_SECONDS.time(stage="decode"):
+            fmt = payload_format(content_type, body)
+            if fmt == "json":
+                data = _decode_json(body)
+            elif fmt == "npy":
+                data = _decode_npy(body)
+            else:
+                data = _decode_arrow(body, fmt)
+            missing = [column for column in columns if column not in data]
+            if missing:
+                raise ColumnarPayloadError(f"Missing columns: {missing}")
+            lengths = {len(data[column]) for column in columns}
+            if len(lengths) > 1:
+                raise ColumnarPayloadError(f"Columns have different lengths: {sorted(lengths)}")
+            if isinstance(data, pd.DataFrame):
+                dataframe = data[columns].copy()
+            else:
+                dataframe = pd.DataFrame({column: data[column] for column in columns})
+            return _to_numeric(dataframe, numeric_columns), fmt
+    except ColumnarPayloadError:
+        raise
+    except (ValueError, TypeError, OSError) as e:
+        # Malformed JSON, a truncated .npy or Arrow buffer (pyarrow's errors derive from these)
+        raise ColumnarPayloadError(f"Could not decode {content_type or 'request'} body: {e}")
+    except Exception as e:
+        raise CropYieldException(e, sys)
+
+
+def encode_predictions(predictions: np.ndarray, payload_format: str) -> Tuple[bytes, str]:
+    """(body, media type) of the predictions in the request's format."""
+    try:
+        predictions = np.asarray(predictions, dtype=np.float64)
+        if payload_format == "json":
+            # NaN and Infinity are not JSON
+            values = predictions.astype(object)
+            values[~np.isfinite(predictions)] = None
+            body = json.dumps({PREDICTION_COLUMN_NAME: values.tolist()}, allow_nan=False).encode()
+        elif payload_format == "npy":
+            buffer = io.BytesIO()
+            np.save(buffer, predictions, allow_pickle=False)
+            body = buffer.getvalue()
+        else:
+            pyarrow = _import_pyarrow()
+            table = pyarrow.table({PREDICTION_COLUMN_NAME: predictions})
+            sink = pyarrow.BufferOutputStream()
+            new_writer = pyarrow.ipc.new_file if payload_format == "arrow-file" else pyarrow.ipc.new_stream
+            with new_writer(sink, table.schema) as writer:
+                writer.write_table(table)
+            body = sink.getvalue().to_pybytes()
+        return body, COLUMNAR_MEDIA_TYPES[payload_format]
+    except Exception as e:
+        raise CropYieldException(e, sys)
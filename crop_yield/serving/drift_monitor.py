@@ -0,0 +1,109 @@
+import os
+import sys
+import threading
+from collections import deque
+from typing import Optional
+
+import pandas as pd
+
+from crop_yield.constant.prediction_pipeline import (
+    FINAL_MODEL_DIR,
+    REFERENCE_PROFILE_FILE_NAME,
+    DRIFT_MONITOR_WINDOW_SIZE,
+    DRIFT_MONITOR_MIN_ROWS,
+    DRIFT_MONITOR_THRESHOLD,
+)
+from crop_yield.constant.training_pipeline import SCHEMA_FILE_PATH
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.logging.logger import logging
+from crop_yield.utils.main_utils.utils import read_yaml_file
+from crop_yield.utils.ml_utils.drift import DriftDetector, ReferenceProfile, column_kinds, schema_hash
+
+
+class DriftMonitor:
+    """
+    Online drift check of the rows the app is asked to predict.
+
+    The most recent `window_size` inputs are kept in memory and compared, on
+    request, with the reference profile the last training run linked into
+    final_model/. A check costs O(profile + window) whatever the size of the
+    training data. The profile is reloaded when its file changes, and is
+    ignored if it was built for a different schema.
+    """
+
+    def __init__(self, model_dir: str = FINAL_MODEL_DIR, window_size: int = DRIFT_MONITOR_WINDOW_SIZE,
+                 min_rows: int = DRIFT_MONITOR_MIN_ROWS, threshold: float = DRIFT_MONITOR_THRESHOLD):
+        try:
+            schema_columns = read_yaml_file(SCHEMA_FILE_PATH)["columns"]
+            self.profile_path = os.path.join(model_dir, REFERENCE_PROFILE_FILE_NAME)
+            self.window_size = window_size
+            self.min_rows = min_rows
+            self.schema_hash = schema_hash(schema_columns)
+            self.columns = list(schema_columns)
+            self.detector = DriftDetector(column_kinds(schema_columns), threshold=threshold,
+                                          sample_size=window_size, max_workers=1)
+            self._records = deque(maxlen=window_size)
+            self._frames = deque()
+            self._frame_rows = 0
+            self._lock = threading.Lock()
+            self._profile: Optional[ReferenceProfile] = None
+            self._profile_stat = None
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def observe_records(self, records: list):
+        """Single-row inputs (/predict); appending to the bounded deque is O(1) per record."""
+        self._records.extend(records)
+
+    def observe_frame(self, dataframe: pd.DataFrame):
+        """A chunk of a batch upload; only its last `window_size` rows of the schema columns are kept."""
+        columns = [column for column in self.columns if column in dataframe.columns]
+        frame = dataframe[columns].tail(self.window_size)
+        with self._lock:
+            self._frames.append(frame)
+            self._frame_rows += len(frame)
+            while self._frames and self._frame_rows - len(self._frames[0]) >= self.window_size:
+                self._frame_rows -= len(self._frames.popleft())
+
+    def window(self) -> pd.DataFrame:
+        with self._lock:
+            frames = list(self._frames)
+        records = list(self._records)
+        if records:
+            frames.append(pd.DataFrame.from_records(records))
+        if not frames:
+            return pd.DataFrame(columns=self.columns)
+        return pd.concat(frames, ignore_index=True).tail(self.window_size)
+
+    def _load_profile(self) -> Optional[ReferenceProfile]:
+        try:
+            stat = os.stat(self.profile_path)
+        except FileNotFoundError:
+            self._profile, self._profile_stat = None, None
+            return None
+        if (stat.st_mtime_ns, stat.st_size) != self._profile_stat:
+            profile = ReferenceProfile.load(self.profile_path)
+            if profile.schema_hash != self.schema_hash:
+                logging.warning(f"Reference profile {self.profile_path} was built for another schema; ignoring it")
+                profile = None
+            self._profile, self._profile_stat = profile, (stat.st_mtime_ns, stat.st_size)
+        return self._profile
+
+    def report(self) -> dict:
+        try:
+            profile = self._load_profile()
+            window = self.window()
+            report = {
+                "profile_available": profile is not None,
+                "window_rows": len(window),
+                "drift_detected": False,
+                "columns": {},
+            }
+            if profile is None or len(window) < self.min_rows:
+                return report
+            report["reference_rows"] = profile.n_rows
+            report["columns"] = self.detector.compare(profile, window)
+            report["drift_detected"] = any(result["drift_detected"] for result in report["columns"].values())
+            return report
+        except Exception as e:
+            raise CropYieldException(e, sys)
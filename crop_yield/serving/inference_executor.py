@@ -0,0 +1,174 @@
+import sys
+import time
+import asyncio
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Tuple
+
+from crop_yield.constant.prediction_pipeline import (
+    INFERENCE_EXECUTOR_KIND,
+    INFERENCE_MAX_WORKERS,
+    INFERENCE_MAX_QUEUE,
+)
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.logging.logger import logging
+from crop_yield.serving.inference_tasks import init_worker
+from crop_yield.utils.main_utils.metrics import INFERENCE_QUEUE_WAIT_SECONDS, INFERENCE_STAGE_SECONDS
+
+
+class InferenceQueueFullError(Exception):
+    """Raised when the inference queue is at capacity; the API answers 503."""
+
+
+@dataclass
+class InferenceTiming:
+    queue_wait_ms: float
+    compute_ms: float
+    # (stage, seconds) observed by the job: decode / preprocess / predict
+    stage_seconds: List[Tuple[str, float]] = field(default_factory=list)
+
+
+def _timed_call(fn: Callable, args: tuple) -> Tuple[Any, float, float, list]:
+    # perf_counter is a system-wide monotonic clock, so start/finish taken in a
+    # worker process are comparable with the submit time taken in the app
+    started = time.perf_counter()
+    # Stage timings are sent back with the result: observed in a pool process they
+    # would only reach that process's copy of the histogram, never the app's /metrics
+    with INFERENCE_STAGE_SECONDS.capture() as observations:
+        result = fn(*args)
+    return result, started, time.perf_counter(), [(labels["stage"], value) for labels, value in observations]
+
+
+def _worker_ready() -> bool:
+    return True
+
+
+class InferenceExecutor:
+    """
+    Runs CPU-bound prediction off the asyncio event loop on a thread or process pool.
+
+    At most max_workers jobs run and max_queue more may wait; any request beyond
+    that raises InferenceQueueFullError immediately instead of queueing without
+    bound. Every job reports how long it waited for a worker, how long it ran
+    and the inference stage timings it observed, which are recorded here in
+    the app process whichever kind of pool ran it.
+    """
+
+    def __init__(self, kind: str = INFERENCE_EXECUTOR_KIND, max_workers: int = INFERENCE_MAX_WORKERS,
+                 max_queue: int = INFERENCE_MAX_QUEUE):
+        try:
+            if kind not in ("thread", "process"):
+                raise ValueError(f"Unknown inference executor kind: {kind}")
+            self.kind = kind
+            self.max_workers = max_workers
+            self.max_queue = max_queue
+            self.capacity = max_workers + max_queue
+            self._pool: Executor = None
+            self._lock = threading.Lock()
+            self._in_flight = 0
+            self._completed = 0
+            self._rejected = 0
+            self._total_queue_wait_ms = 0.0
+            self._total_compute_ms = 0.0
+            self._max_queue_wait_ms = 0.0
+            self._max_compute_ms = 0.0
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def start(self):
+        if self._pool is not None:
+            return
+        if self.kind == "process":
+            # spawn: workers must not inherit the app's threads (registry watcher, uvicorn)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+            )
+            # Spawn and warm every worker now rather than on the first requests
+            wait([self._pool.submit(_worker_ready) for _ in range(self.max_workers)])
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="inference")
+        logging.info(f"Started {self.kind} inference executor: {self.max_workers} workers, queue {self.max_queue}")
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def _acquire(self):
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise InferenceQueueFullError(
+                    f"Inference queue is full ({self._in_flight} jobs in flight, capacity {self.capacity})"
+                )
+            self._in_flight += 1
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def _record(self, timing: InferenceTiming):
+        INFERENCE_QUEUE_WAIT_SECONDS.observe(timing.queue_wait_ms / 1000)
+        for stage, seconds in timing.stage_seconds:
+            INFERENCE_STAGE_SECONDS.observe(seconds, stage=stage)
+        with self._lock:
+            self._completed += 1
+            self._total_queue_wait_ms += timing.queue_wait_ms
+            self._total_compute_ms += timing.compute_ms
+            self._max_queue_wait_ms = max(self._max_queue_wait_ms, timing.queue_wait_ms)
+            self._max_compute_ms = max(self._max_compute_ms, timing.compute_ms)
+
+    @contextmanager
+    def reserve(self):
+        """
+        Hold one queue slot for a multi-job request (a chunked batch), so it is
+        admitted or rejected once up front instead of failing half way through.
+        Jobs run inside the reservation are submitted with reserved=True.
+        """
+        self._acquire()
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def run(self, fn: Callable, *args, reserved: bool = False) -> Tuple[Any, InferenceTiming]:
+        """Run fn(*args) on the pool and return (result, timing)."""
+        if self._pool is None:
+            self.start()
+        if not reserved:
+            self._acquire()
+        try:
+            submitted = time.perf_counter()
+            future = self._pool.submit(_timed_call, fn, args)
+            result, started, finished, stage_seconds = await asyncio.wrap_future(future)
+        finally:
+            if not reserved:
+                self._release()
+        timing = InferenceTiming(
+            queue_wait_ms=max(started - submitted, 0.0) * 1000,
+            compute_ms=(finished - started) * 1000,
+            stage_seconds=stage_seconds,
+        )
+        self._record(timing)
+        return result, timing
+
+    def stats(self) -> dict:
+        with self._lock:
+            completed = self._completed
+            return {
+                "kind": self.kind,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self._in_flight,
+                "completed": completed,
+                "rejected": self._rejected,
+                "avg_queue_wait_ms": self._total_queue_wait_ms / completed if completed else 0.0,
+                "max_queue_wait_ms": self._max_queue_wait_ms,
+                "avg_compute_ms": self._total_compute_ms / completed if completed else 0.0,
+                "max_compute_ms": self._max_compute_ms,
+            }
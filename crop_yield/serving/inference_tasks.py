@@ -0,0 +1,58 @@
+"""
+Prediction tasks submitted to the InferenceExecutor.
+
+They are module-level functions that look the model up in the process-wide
+registry, so they can run in a thread of the app process or be pickled by
+reference into a process-pool worker that holds its own warm copy.
+
+Each process-pool worker watches final_model/ on its own, so right after a
+retrain a worker can still hold the previous model (or already the next
+one). Tasks are given the model version the app keyed its prediction cache
+by and refuse to answer with any other.
+"""
+from typing import Optional
+
+import pandas as pd
+
+from crop_yield.constant.prediction_pipeline import PREDICTION_COLUMN_NAME
+from crop_yield.serving.model_registry import get_model_registry, ModelVersionMismatchError
+from crop_yield.utils.main_utils.metrics import INFERENCE_STAGE_SECONDS
+from crop_yield.utils.ml_utils.model.estimator import CropYieldModel
+
+
+def init_worker():
+    """Process-pool initializer: load the model once per worker process."""
+    get_model_registry().start()
+
+
+def get_model(expected_version: Optional[str] = None) -> CropYieldModel:
+    """This process's model, which must be `expected_version` when one is given."""
+    registry = get_model_registry()
+    loaded = registry.get()
+    if expected_version is not None and loaded.version != expected_version:
+        # Usually this worker's watcher has not seen the new files yet
+        registry.refresh(force=True)
+        loaded = registry.get()
+        if loaded.version != expected_version:
+            raise ModelVersionMismatchError(
+                f"inference worker has model {loaded.version}, the request expects {expected_version}")
+    return loaded.model
+
+
+def predict_record(record: dict, expected_version: Optional[str] = None) -> float:
+    crop_yield_model = get_model(expected_version)
+    return float(crop_yield_model.predict_record(record))
+
+
+def predict_frame(dataframe: pd.DataFrame, expected_version: Optional[str] = None) -> pd.DataFrame:
+    crop_yield_model = get_model(expected_version)
+    dataframe[PREDICTION_COLUMN_NAME] = crop_yield_model.predict(dataframe)
+    return dataframe
+
+
+def predict_records(records: list, expected_version: Optional[str] = None) -> list:
+    """Vectorized prediction for a micro-batch of single-record requests."""
+    crop_yield_model = get_model(expected_version)
+    with INFERENCE_STAGE_SECONDS.time(stage="decode"):
+        dataframe = pd.DataFrame(records)
+    return [float(y) for y in crop_yield_model.predict(dataframe)]
@@ -0,0 +1,117 @@
+import sys
+import asyncio
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+from crop_yield.constant.prediction_pipeline import MICRO_BATCH_MAX_SIZE, MICRO_BATCH_MAX_WAIT_MS
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.logging.logger import logging
+
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-record predictions into one vectorized call.
+
+    Requests are collected until max_batch_size records are waiting or the
+    first record has waited max_wait_ms, then `run_batch(records, group)` is
+    called once per group the collected records were submitted with (e.g. the
+    model version a request is keyed by), so one call never mixes groups. It
+    must return (predictions, extra) with one prediction per record; every
+    waiting caller gets (its prediction, extra). Batches are dispatched
+    without waiting for the previous one to finish, so concurrency is bounded
+    by whatever run_batch submits to.
+    """
+
+    def __init__(self, run_batch: Callable[[list, Any], Awaitable[Tuple[list, Any]]],
+                 max_batch_size: int = MICRO_BATCH_MAX_SIZE, max_wait_ms: float = MICRO_BATCH_MAX_WAIT_MS):
+        try:
+            if max_batch_size < 1:
+                raise ValueError("max_batch_size must be at least 1")
+            self.run_batch = run_batch
+            self.max_batch_size = max_batch_size
+            self.max_wait = max_wait_ms / 1000
+            self._queue: Optional[asyncio.Queue] = None
+            self._collector: Optional[asyncio.Task] = None
+            self._in_progress = set()
+            self.batches = 0
+            self.records = 0
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def start(self):
+        """Start the collector task; must be called from the running event loop."""
+        if self._collector is None:
+            self._queue = asyncio.Queue()
+            self._collector = asyncio.create_task(self._collect())
+
+    async def stop(self):
+        if self._collector is not None:
+            self._collector.cancel()
+            try:
+                await self._collector
+            except asyncio.CancelledError:
+                pass
+            self._collector = None
+        if self._in_progress:
+            await asyncio.gather(*self._in_progress, return_exceptions=True)
+
+    async def submit(self, record: dict, group: Any = None) -> Tuple[Any, Any]:
+        if self._collector is None:
+            self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((record, group, future))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                # Take whatever is already queued before waiting on the clock
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            groups = {}
+            for record, group, future in batch:
+                groups.setdefault(group, []).append((record, future))
+            for group, grouped in groups.items():
+                task = asyncio.create_task(self._dispatch(grouped, group))
+                self._in_progress.add(task)
+                task.add_done_callback(self._in_progress.discard)
+
+    async def _dispatch(self, batch: List[tuple], group: Any):
+        # Callers that gave up (client disconnected) are dropped before predicting
+        batch = [(record, future) for record, future in batch if not future.done()]
+        if not batch:
+            return
+        self.batches += 1
+        self.records += len(batch)
+        try:
+            predictions, extra = await self.run_batch([record for record, _ in batch], group)
+            if len(predictions) != len(batch):
+                raise ValueError(f"run_batch returned {len(predictions)} predictions for {len(batch)} records")
+        except Exception as e:
+            logging.error(f"Micro-batch of {len(batch)} records failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), prediction in zip(batch, predictions):
+            if not future.done():
+                future.set_result((prediction, extra))
+
+    def stats(self) -> dict:
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+            "batches": self.batches,
+            "records": self.records,
+            "avg_batch_size": self.records / self.batches if self.batches else 0.0,
+        }
@@ -0,0 +1,198 @@
+import os
+import sys
+import time
+import hashlib
+import threading
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from crop_yield.constant.prediction_pipeline import (
+    FINAL_MODEL_DIR,
+    AREA_FREQ_MAP_FILE_NAME,
+    PREPROCESSOR_FILE_NAME,
+    FINAL_MODEL_FILE_NAME,
+    MODEL_BUNDLE_FILE_NAME,
+    MODEL_REGISTRY_POLL_INTERVAL,
+    MODEL_BUNDLE_VERIFY_CHECKSUM,
+    TREE_ENGINE_ENABLED,
+    TREE_ENGINE_MAX_ROWS,
+)
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.logging.logger import logging
+from crop_yield.utils.main_utils.utils import load_object
+from crop_yield.utils.ml_utils.model.estimator import CropYieldModel
+from crop_yield.utils.ml_utils.model.bundle import load_model_bundle
+
+
+class ModelNotReadyError(Exception):
+    """Raised when a prediction is requested before any model has been loaded."""
+
+
+class ModelVersionMismatchError(ModelNotReadyError):
+    """Raised when an inference worker holds another model version than the one a request was keyed by."""
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    model: CropYieldModel
+    version: str
+    loaded_at: float
+
+
+class ModelRegistry:
+    """
+    Keeps the CropYieldModel from final_model/ warm in memory.
+
+    The model is loaded once at startup and replaced atomically (a single
+    reference swap) when the files on disk change, so requests never see a
+    half-loaded model and never pay for unpickling. It is read from
+    model.bundle, whose checksum is verified, or from the three separate
+    pickles of older training runs when there is no bundle.
+    """
+
+    def __init__(self, model_dir: str = FINAL_MODEL_DIR, poll_interval: float = MODEL_REGISTRY_POLL_INTERVAL,
+                 verify_checksum: bool = MODEL_BUNDLE_VERIFY_CHECKSUM):
+        try:
+            self.model_dir = model_dir
+            self.poll_interval = poll_interval
+            self.verify_checksum = verify_checksum
+            self._current: Optional[LoadedModel] = None
+            self._loaded_fingerprint = None
+            self._pending_fingerprint = None
+            self._last_error: Optional[str] = None
+            self._reload_lock = threading.Lock()
+            self._stop_event = threading.Event()
+            self._watcher: Optional[threading.Thread] = None
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    @property
+    def bundle_path(self) -> str:
+        return os.path.join(self.model_dir, MODEL_BUNDLE_FILE_NAME)
+
+    @property
+    def file_paths(self) -> Tuple[str, ...]:
+        if os.path.exists(self.bundle_path):
+            return (self.bundle_path,)
+        return (
+            os.path.join(self.model_dir, AREA_FREQ_MAP_FILE_NAME),
+            os.path.join(self.model_dir, PREPROCESSOR_FILE_NAME),
+            os.path.join(self.model_dir, FINAL_MODEL_FILE_NAME),
+        )
+
+    @property
+    def ready(self) -> bool:
+        return self._current is not None
+
+    def _fingerprint(self) -> Optional[tuple]:
+        """Cheap change detector: (path, mtime, size) of every file, or None if any is missing."""
+        fingerprint = []
+        for file_path in self.file_paths:
+            try:
+                stat = os.stat(file_path)
+            except FileNotFoundError:
+                return None
+            fingerprint.append((file_path, stat.st_mtime_ns, stat.st_size))
+        return tuple(fingerprint)
+
+    def _load(self, fingerprint: tuple) -> LoadedModel:
+        if len(fingerprint) == 1:
+            bundle = load_model_bundle(fingerprint[0][0], verify=self.verify_checksum)
+            crop_yield_model = CropYieldModel(
+                preprocessor=bundle.preprocessor,
+                model=bundle.model,
+                area_freq_map=bundle.area_freq_map,
+            )
+            version = bundle.version
+        else:
+            area_freq_map_path, preprocessor_path, model_path = (file_path for file_path, _, _ in fingerprint)
+            crop_yield_model = CropYieldModel(
+                preprocessor=load_object(preprocessor_path),
+                model=load_object(model_path),
+                area_freq_map=load_object(area_freq_map_path),
+            )
+            version = hashlib.sha1(repr(fingerprint).encode()).hexdigest()[:12]
+        crop_yield_model.enable_fast_path()
+        if TREE_ENGINE_ENABLED:
+            crop_yield_model.enable_tree_engine(max_rows=TREE_ENGINE_MAX_ROWS)
+        return LoadedModel(model=crop_yield_model, version=version, loaded_at=time.time())
+
+    def refresh(self, force: bool = False) -> bool:
+        """
+        Reload the bundle if the files changed. Returns True when a new model was swapped in.
+
+        A changed fingerprint must be seen on two consecutive checks before it is
+        loaded, so a training run that is still writing the model files is not
+        picked up half way. `force` skips that settle step.
+        """
+        with self._reload_lock:
+            fingerprint = self._fingerprint()
+            if fingerprint is None:
+                self._last_error = f"Model files missing in {self.model_dir}"
+                return False
+            if fingerprint == self._loaded_fingerprint:
+                self._pending_fingerprint = None
+                return False
+            if not force and self._current is not None and fingerprint != self._pending_fingerprint:
+                self._pending_fingerprint = fingerprint
+                return False
+
+            try:
+                loaded = self._load(fingerprint)
+            except Exception as e:
+                # Keep serving the previous model if the new files cannot be loaded
+                self._last_error = str(e)
+                logging.error(f"Model reload from {self.model_dir} failed: {e}")
+                return False
+
+            self._current = loaded
+            self._loaded_fingerprint = fingerprint
+            self._pending_fingerprint = None
+            self._last_error = None
+            logging.info(f"Loaded model version {loaded.version} from {self.model_dir}")
+            return True
+
+    def get(self) -> LoadedModel:
+        current = self._current
+        if current is None:
+            raise ModelNotReadyError(self._last_error or "Model has not been loaded yet")
+        return current
+
+    def status(self) -> dict:
+        current = self._current
+        return {
+            "ready": current is not None,
+            "model_version": current.version if current else None,
+            "loaded_at": current.loaded_at if current else None,
+            "model_dir": self.model_dir,
+            "last_error": self._last_error,
+        }
+
+    def _watch(self):
+        while not self._stop_event.wait(self.poll_interval):
+            self.refresh()
+
+    def start(self):
+        """Load the model and start the background thread that watches final_model/."""
+        self.refresh(force=True)
+        if self.poll_interval > 0 and self._watcher is None:
+            self._stop_event.clear()
+            self._watcher = threading.Thread(target=self._watch, name="model-registry-watcher", daemon=True)
+            self._watcher.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._watcher is not None:
+            self._watcher.join(timeout=self.poll_interval + 1)
+            self._watcher = None
+
+
+_model_registry: Optional[ModelRegistry] = None
+
+
+def get_model_registry() -> ModelRegistry:
+    """Process-wide registry shared by the app and by inference workers in the same process."""
+    global _model_registry
+    if _model_registry is None:
+        _model_registry = ModelRegistry()
+    return _model_registry
@@ -0,0 +1,154 @@
+import sys
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+import pandas as pd
+
+from crop_yield.constant.prediction_pipeline import (
+    PREDICTION_CACHE_ENABLED,
+    PREDICTION_CACHE_MAX_SIZE,
+    PREDICTION_CACHE_TTL_SECONDS,
+)
+from crop_yield.constant.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.utils.main_utils.utils import read_yaml_file
+
+
+class PredictionCache:
+    """
+    In-process cache of predictions for repeated inputs, e.g. dashboards that refresh.
+
+    Keys are the model's input features in schema order, with numbers as
+    floats (Year 1990 and 1990.0 are the same input to the model) and
+    missing values as None; a numeric field holding something that is not a
+    number keeps it as text, so it never shares the key of a missing value.
+    Fields the model does not use are ignored.
+    Values are only valid for one model version. With `current_version`
+    (the registry's version) the cache only moves forward: the first lookup
+    for the current version empties it, while requests still holding an
+    older version miss and store nothing. Without it every change of version
+    empties the cache. Entries are evicted least recently used
+    beyond `max_size` and expire `ttl_seconds` after they were stored
+    (0 keeps them until evicted).
+    """
+
+    def __init__(self, max_size: int = PREDICTION_CACHE_MAX_SIZE, ttl_seconds: float = PREDICTION_CACHE_TTL_SECONDS,
+                 enabled: bool = PREDICTION_CACHE_ENABLED, current_version: Optional[Callable[[], str]] = None):
+        try:
+            schema_columns = read_yaml_file(SCHEMA_FILE_PATH)["columns"]
+            self.columns = [name for name in schema_columns if name != TARGET_COLUMN]
+            self.numeric = [schema_columns[name] in ("int", "float") for name in self.columns]
+            self.max_size = max_size
+            self.ttl_seconds = ttl_seconds
+            self.enabled = enabled and max_size > 0
+            self.current_version = current_version
+            self._entries: OrderedDict = OrderedDict()
+            self._version: Optional[str] = None
+            self._lock = threading.Lock()
+            self._counters = dict(hits=0, misses=0, evictions=0, expirations=0, invalidations=0)
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def record_key(self, record: dict) -> tuple:
+        key = []
+        for column, numeric in zip(self.columns, self.numeric):
+            value = record.get(column)
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                key.append(None)
+            else:
+                key.append(float(value) if numeric else str(value))
+        return tuple(key)
+
+    def frame_keys(self, dataframe: pd.DataFrame) -> list:
+        """record_key for every row, built column-wise."""
+        columns = []
+        for column, numeric in zip(self.columns, self.numeric):
+            if column not in dataframe.columns:
+                columns.append([None] * len(dataframe))
+                continue
+            values = dataframe[column]
+            if numeric:
+                numbers = pd.to_numeric(values, errors="coerce")
+                keys = numbers.astype(object).where(numbers.notna(), None)
+                keys = keys.where(numbers.notna() | values.isna(), values.astype(str))
+            else:
+                keys = values.astype(str).astype(object).where(values.notna(), None)
+            columns.append(keys.tolist())
+        return list(zip(*columns))
+
+    def _check_version(self, version: str) -> bool:
+        """Whether entries may be read and stored for `version`. Called with the lock held."""
+        if self.current_version is not None and version != self.current_version():
+            # A request that started before a reload: never let it reset the new model's entries
+            return False
+        if version != self._version:
+            if self._entries:
+                self._counters["invalidations"] += 1
+            self._entries.clear()
+            self._version = version
+        return True
+
+    def get_many(self, keys: list, version: str) -> list:
+        """Cached predictions for `keys` (None where missing or expired)."""
+        if not self.enabled:
+            return [None] * len(keys)
+        now = time.monotonic()
+        results = []
+        with self._lock:
+            if not self._check_version(version):
+                self._counters["misses"] += len(keys)
+                return [None] * len(keys)
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is not None and self.ttl_seconds and entry[1] <= now:
+                    del self._entries[key]
+                    self._counters["expirations"] += 1
+                    entry = None
+                if entry is None:
+                    self._counters["misses"] += 1
+                    results.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    results.append(entry[0])
+        return results
+
+    def get(self, key: tuple, version: str):
+        return self.get_many([key], version)[0]
+
+    def put_many(self, keys: list, values: list, version: str):
+        if not self.enabled:
+            return
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            if not self._check_version(version):
+                return
+            for key, value in zip(keys, values):
+                self._entries[key] = (value, expires_at)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def put(self, key: tuple, value, version: str):
+        self.put_many([key], [value], version)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "model_version": self._version,
+                **self._counters,
+                "hit_rate": self._counters["hits"] / lookups if lookups else 0.0,
+            }
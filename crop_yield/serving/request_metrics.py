@@ -0,0 +1,46 @@
+import time
+import logging
+
+from crop_yield.logging.logger import request_logger, sample_request_log
+from crop_yield.utils.main_utils.metrics import HTTP_REQUEST_SECONDS
+
+
+class RequestTimingMiddleware:
+    """
+    ASGI middleware observing every HTTP request into HTTP_REQUEST_SECONDS
+    and writing a sampled access log line (server errors are always logged).
+
+    The duration runs until the last body chunk is sent, so streamed
+    /predict-batch responses are timed in full. Requests are labelled by the
+    route template (/predict, not the raw path) to keep label values bounded;
+    anything that matched no route is "unmatched".
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            seconds = time.perf_counter() - started
+            route = getattr(scope.get("route"), "path", "unmatched")
+            HTTP_REQUEST_SECONDS.observe(seconds, method=scope["method"], route=route, status=status[0])
+            if status[0] >= 500 or sample_request_log():
+                request_logger.log(
+                    logging.WARNING if status[0] >= 500 else logging.INFO,
+                    f"{scope['method']} {route} {status[0]} {seconds * 1000:.1f}ms",
+                    extra={"method": scope["method"], "route": route, "status": status[0],
+                           "duration_ms": round(seconds * 1000, 3)},
+                )
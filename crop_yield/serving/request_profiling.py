@@ -0,0 +1,69 @@
+import os
+import itertools
+from datetime import datetime
+from urllib.parse import parse_qs
+
+from crop_yield.constant.prediction_pipeline import (
+    REQUEST_PROFILING_ROUTES,
+    REQUEST_PROFILING_QUERY_FLAG,
+    REQUEST_PROFILING_MODE,
+    REQUEST_PROFILING_DIR,
+)
+from crop_yield.utils.main_utils.profiling import ProfiledSection
+
+_TRUE_VALUES = ("1", "true", "yes")
+
+
+class RequestProfilingMiddleware:
+    """
+    ASGI middleware profiling selected requests from start to the last body
+    chunk: every request to REQUEST_PROFILING_ROUTES, and any request with
+    ?profile=true when REQUEST_PROFILING_QUERY_FLAG is set. Profiles are
+    written to REQUEST_PROFILING_DIR and named in the X-Profile response
+    header. Sampling profiles show every thread, so requests running at the
+    same time appear in each other's profiles; with the process executor the
+    model's own work happens in the workers and is not sampled.
+    """
+
+    def __init__(self, app, routes: list = REQUEST_PROFILING_ROUTES, query_flag: bool = REQUEST_PROFILING_QUERY_FLAG,
+                 mode: str = REQUEST_PROFILING_MODE, output_dir: str = REQUEST_PROFILING_DIR):
+        self.app = app
+        self.routes = set(routes)
+        self.query_flag = query_flag
+        self.mode = mode
+        self.output_dir = output_dir
+        self._counter = itertools.count()
+        self._active = 0
+
+    def wanted(self, scope) -> bool:
+        if scope["path"] in self.routes:
+            return True
+        if not self.query_flag or b"profile" not in scope["query_string"]:
+            return False
+        values = parse_qs(scope["query_string"].decode("latin-1")).get("profile", [])
+        return any(value.lower() in _TRUE_VALUES for value in values)
+
+    async def __call__(self, scope, receive, send):
+        # cProfile hooks the event loop thread, which can only carry one profiler at a time
+        busy = self.mode == "cprofile" and self._active
+        if scope["type"] != "http" or busy or not self.wanted(scope):
+            await self.app(scope, receive, send)
+            return
+        name = "_".join([
+            datetime.now().strftime("%Y%m%d_%H%M%S"),
+            scope["method"],
+            scope["path"].strip("/").replace("/", "-") or "root",
+            f"{os.getpid()}-{next(self._counter)}",
+        ])
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile", name.encode())]}
+            await send(message)
+
+        self._active += 1
+        try:
+            with ProfiledSection(name, self.output_dir, mode=self.mode):
+                await self.app(scope, receive, send_wrapper)
+        finally:
+            self._active -= 1
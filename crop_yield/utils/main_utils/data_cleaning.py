@@ -0,0 +1,155 @@
+"""
+Cleaning applied to the raw collection before it enters the feature store:
+drop rows without a target, impute missing feature values with the median,
+and remove IQR outliers.
+"""
+import sys
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.logging.logger import logging
+from crop_yield.utils.ml_utils.sketch import QuantileSketch
+
+
+@dataclass
+class CleaningStats:
+    medians: Dict[str, float]
+    bounds: Dict[str, Tuple[float, float]]
+    exact: bool
+
+
+class DataCleaner:
+    """
+    Computes the cleaning statistics and applies them with a single combined
+    boolean mask, without building a filtered copy of the frame per column.
+
+    The IQR bounds keep the established sequential semantics: the bounds of
+    each outlier column come from the rows kept by the columns before it.
+    Bounds computed independently on all rows would keep more rows (24203
+    rather than 24193 on crop_data/crop_yield.csv) and change the training
+    data. Medians are taken after rows without a target are dropped and
+    before any outlier filtering.
+
+    clean() works in memory and is exact. fit_chunks()/clean_chunks() do the
+    same on a stream of DataFrame chunks, for collections that do not fit in
+    memory. They make one pass for the medians and one per outlier column,
+    and use a QuantileSketch per statistic. The result is exact until the
+    sketch reaches its capacity, and approximate after that.
+    """
+
+    def __init__(self, target_column: str, impute_columns: List[str], outlier_columns: List[str],
+                 iqr_multiplier: float = 1.5, sketch_capacity: int = 200_000):
+        try:
+            self.target_column = target_column
+            self.impute_columns = list(impute_columns)
+            self.outlier_columns = list(outlier_columns)
+            self.iqr_multiplier = iqr_multiplier
+            self.sketch_capacity = sketch_capacity
+            self.columns = list(dict.fromkeys(self.impute_columns + self.outlier_columns))
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    @staticmethod
+    def _check_not_empty(count: int, column: str):
+        # Quantiles of nothing are NaN (or, on NumPy 2, a scalar that cannot be unpacked)
+        if count == 0:
+            raise ValueError(f"No rows left to compute the IQR bounds of {column} from; "
+                             "the data has no rows with a target value")
+
+    def _bounds(self, q1: float, q3: float) -> Tuple[float, float]:
+        iqr = q3 - q1
+        return q1 - self.iqr_multiplier * iqr, q3 + self.iqr_multiplier * iqr
+
+    def _values(self, dataframe: pd.DataFrame, medians: Dict[str, float]) -> np.ndarray:
+        """Feature columns as one float64 matrix, with missing values already imputed."""
+        values = dataframe[self.columns].to_numpy(dtype=np.float64, copy=True)
+        for j, column in enumerate(self.columns):
+            if column in medians:
+                missing = np.isnan(values[:, j])
+                values[missing, j] = medians[column]
+        return values
+
+    def _mask(self, values: np.ndarray, stats: CleaningStats, upto: int = None) -> np.ndarray:
+        mask = np.ones(len(values), dtype=bool)
+        for column in self.outlier_columns[:upto]:
+            lower, upper = stats.bounds[column]
+            column_values = values[:, self.columns.index(column)]
+            mask &= (column_values >= lower) & (column_values <= upper)
+        return mask
+
+    def _drop_missing_target(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        return dataframe.dropna(subset=[self.target_column])
+
+    def fit(self, dataframe: pd.DataFrame) -> CleaningStats:
+        try:
+            dataframe = self._drop_missing_target(dataframe)
+            raw = dataframe[self.impute_columns].to_numpy(dtype=np.float64)
+            medians = dict(zip(self.impute_columns, np.nanmedian(raw, axis=0).tolist()))
+
+            values = self._values(dataframe, medians)
+            stats = CleaningStats(medians=medians, bounds={}, exact=True)
+            mask = np.ones(len(values), dtype=bool)
+            for column in self.outlier_columns:
+                column_values = values[:, self.columns.index(column)]
+                self._check_not_empty(int(np.count_nonzero(~np.isnan(column_values[mask]))), column)
+                q1, q3 = np.nanquantile(column_values[mask], [0.25, 0.75])
+                stats.bounds[column] = self._bounds(float(q1), float(q3))
+                lower, upper = stats.bounds[column]
+                mask &= (column_values >= lower) & (column_values <= upper)
+            return stats
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def transform(self, dataframe: pd.DataFrame, stats: CleaningStats) -> pd.DataFrame:
+        try:
+            dataframe = self._drop_missing_target(dataframe)
+            mask = self._mask(self._values(dataframe, stats.medians), stats)
+            return dataframe.loc[mask].fillna(stats.medians)
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def clean(self, dataframe: pd.DataFrame) -> pd.DataFrame:
+        stats = self.fit(dataframe)
+        cleaned = self.transform(dataframe, stats)
+        logging.info(f"Cleaning kept {len(cleaned)} of {len(dataframe)} rows; bounds {stats.bounds}")
+        return cleaned
+
+    def fit_chunks(self, chunk_factory: Callable[[], Iterable[pd.DataFrame]]) -> CleaningStats:
+        """
+        `chunk_factory` returns a fresh iterator over the chunks on each call;
+        it is called once for the medians and once per outlier column.
+        """
+        try:
+            sketches = {column: QuantileSketch(self.sketch_capacity) for column in self.impute_columns}
+            for chunk in chunk_factory():
+                chunk = self._drop_missing_target(chunk)
+                for column, sketch in sketches.items():
+                    sketch.update(chunk[column].to_numpy(dtype=np.float64))
+            stats = CleaningStats(
+                medians={column: float(sketch.quantile(0.5)) for column, sketch in sketches.items()},
+                bounds={},
+                exact=all(sketch.exact for sketch in sketches.values()),
+            )
+
+            for i, column in enumerate(self.outlier_columns):
+                sketch = QuantileSketch(self.sketch_capacity)
+                for chunk in chunk_factory():
+                    values = self._values(self._drop_missing_target(chunk), stats.medians)
+                    sketch.update(values[self._mask(values, stats, upto=i), self.columns.index(column)])
+                self._check_not_empty(sketch.count, column)
+                q1, q3 = sketch.quantile([0.25, 0.75])
+                stats.bounds[column] = self._bounds(float(q1), float(q3))
+                stats.exact = stats.exact and sketch.exact
+            return stats
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def clean_chunks(self, chunk_factory: Callable[[], Iterable[pd.DataFrame]]) -> Iterator[pd.DataFrame]:
+        stats = self.fit_chunks(chunk_factory)
+        logging.info(f"Chunked cleaning bounds {stats.bounds} (exact: {stats.exact})")
+        for chunk in chunk_factory():
+            yield self.transform(chunk, stats)
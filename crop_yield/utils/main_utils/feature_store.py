@@ -0,0 +1,94 @@
+"""
+Storage backend for the tabular hand-offs between pipeline stages.
+
+Every stage reads and writes its DataFrames through read_dataframe /
+write_dataframe, and the format is chosen by the file extension, so readers
+never need to know which backend produced a file. Parquet (via pyarrow) keeps
+dtypes across stages, so nothing is re-parsed from text, and stores Area and
+Item dictionary-encoded. CSV remains available, and is used automatically when
+pyarrow is not installed.
+"""
+import os
+import sys
+import importlib.util
+from typing import List, Optional
+
+import pandas as pd
+
+from crop_yield.constant.training_pipeline import FEATURE_STORE_FORMAT, FEATURE_STORE_DICTIONARY_COLUMNS
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.logging.logger import logging
+
+SUPPORTED_FORMATS = ("parquet", "csv")
+
+
+def resolve_storage_format(storage_format: str = FEATURE_STORE_FORMAT) -> str:
+    if storage_format not in SUPPORTED_FORMATS:
+        raise ValueError(f"Unsupported feature store format: {storage_format}")
+    if storage_format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        logging.warning("pyarrow is not installed; falling back to CSV for the feature store")
+        return "csv"
+    return storage_format
+
+
+def storage_file_name(file_name: str, storage_format: str) -> str:
+    """'train.csv' -> 'train.parquet' for the parquet backend."""
+    return f"{os.path.splitext(file_name)[0]}.{storage_format}"
+
+
+def write_dataframe(dataframe: pd.DataFrame, file_path: str) -> None:
+    try:
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        if file_path.endswith(".parquet"):
+            dictionary_columns = [c for c in FEATURE_STORE_DICTIONARY_COLUMNS if c in dataframe.columns]
+            dataframe.to_parquet(
+                file_path,
+                engine="pyarrow",
+                index=False,
+                use_dictionary=dictionary_columns,
+                compression="snappy",
+            )
+        else:
+            dataframe.to_csv(file_path, index=False, header=True)
+    except Exception as e:
+        raise CropYieldException(e, sys)
+
+
+def read_dataframe(file_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Read a stage output; parquet columns come back with the dtypes they were written with."""
+    try:
+        if file_path.endswith(".parquet"):
+            return pd.read_parquet(file_path, engine="pyarrow", columns=columns)
+        return pd.read_csv(file_path, usecols=columns)
+    except Exception as e:
+        raise CropYieldException(e, sys)
+
+
+def read_column_names(file_path: str) -> List[str]:
+    """Column names of a stage output, read from the parquet footer or the CSV header only."""
+    try:
+        if file_path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            return list(pq.read_schema(file_path).names)
+        return list(pd.read_csv(file_path, nrows=0).columns)
+    except Exception as e:
+        raise CropYieldException(e, sys)
+
+
+def count_rows(file_path: str) -> int:
+    """Data rows of a stage output, from the parquet footer or by counting CSV line breaks."""
+    try:
+        if file_path.endswith(".parquet"):
+            import pyarrow.parquet as pq
+
+            return pq.read_metadata(file_path).num_rows
+        lines, last = 0, b"\n"
+        with open(file_path, "rb") as file:
+            for block in iter(lambda: file.read(1 << 20), b""):
+                lines += block.count(b"\n")
+                last = block[-1:]
+        # An unterminated last line still counts; the header does not
+        return max(lines + (last != b"\n") - 1, 0)
+    except Exception as e:
+        raise CropYieldException(e, sys)
@@ -0,0 +1,234 @@
+"""
+Minimal in-process metrics in the Prometheus text exposition format (version 0.0.4).
+
+Counters, gauges and histograms with labels, collected in a registry that
+the app renders on GET /metrics. Metrics recorded by the serving code are
+declared at the bottom of this module so every caller shares them.
+Observations are a dict update under a lock, cheap enough for the
+per-record path.
+"""
+import math
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from crop_yield.constant.prediction_pipeline import METRICS_LATENCY_BUCKETS
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self.samples()
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(values.items())]
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in sorted(values.items())]
+
+
+class Histogram(Metric):
+    """
+    Cumulative-bucket histogram; `time()` observes the duration of a with-block in seconds.
+
+    `capture()` diverts the calling thread's observations into a list instead,
+    so work done in another process (an inference pool worker) can send them
+    back to be observed by the histogram the app renders.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                 buckets: Iterable[float] = METRICS_LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets))
+        # Per label set: [count per bucket (non-cumulative, last is +Inf), sum]
+        self._values: Dict[Tuple[str, ...], list] = {}
+        self._captured = threading.local()
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        captured = getattr(self._captured, "observations", None)
+        if captured is not None:
+            captured.append((labels, value))
+            return
+        index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    @contextmanager
+    def capture(self):
+        """Collect this thread's observations as [(labels, value), ...] instead of recording them."""
+        previous = getattr(self._captured, "observations", None)
+        observations = []
+        self._captured.observations = observations
+        try:
+            yield observations
+        finally:
+            self._captured.observations = previous
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = {key: (list(counts), total) for key, (counts, total) in self._values.items()}
+        lines = []
+        for key, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', _format_value(bound)))} "
+                             f"{cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: Metric) -> Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} is already registered")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Iterable[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Iterable[str] = (),
+                  buckets: Iterable[float] = METRICS_LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics_registry = MetricsRegistry()
+
+INFERENCE_STAGE_SECONDS = metrics_registry.histogram(
+    "crop_yield_inference_stage_seconds",
+    "Time per inference call in decode (raw input to rows), preprocess (area_freq_map + ColumnTransformer) "
+    "and predict (model)",
+    ["stage"],
+)
+INFERENCE_QUEUE_WAIT_SECONDS = metrics_registry.histogram(
+    "crop_yield_inference_queue_wait_seconds", "Time inference jobs waited for an executor worker")
+HTTP_REQUEST_SECONDS = metrics_registry.histogram(
+    "crop_yield_http_request_duration_seconds", "HTTP request latency by route", ["method", "route", "status"])
+BATCH_PREDICTION_ROWS = metrics_registry.counter(
+    "crop_yield_batch_prediction_rows_total", "Rows predicted by /predict-batch")
+BATCH_PREDICTION_SECONDS = metrics_registry.histogram(
+    "crop_yield_batch_prediction_seconds", "Duration of /predict-batch uploads",
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300))
+BATCH_PREDICTION_ROWS_PER_SECOND = metrics_registry.gauge(
+    "crop_yield_batch_prediction_rows_per_second", "Throughput of the last completed /predict-batch upload")
+
+# Set from final_model/pipeline_metrics.json, the last training run's report, when /metrics is scraped
+PIPELINE_STAGE_DURATION_SECONDS = metrics_registry.gauge(
+    "crop_yield_pipeline_stage_duration_seconds", "Duration of each stage in the last training run", ["stage"])
+PIPELINE_STAGE_ROWS = metrics_registry.gauge(
+    "crop_yield_pipeline_stage_rows", "Rows produced (or trained on) by each stage in the last training run", ["stage"])
+PIPELINE_STAGE_CACHED = metrics_registry.gauge(
+    "crop_yield_pipeline_stage_cached", "1 if the stage reused a cached artifact in the last training run", ["stage"])
+PIPELINE_LAST_RUN_TIMESTAMP_SECONDS = metrics_registry.gauge(
+    "crop_yield_pipeline_last_run_timestamp_seconds", "Unix time the last training run finished")
+PIPELINE_LAST_RUN_DURATION_SECONDS = metrics_registry.gauge(
+    "crop_yield_pipeline_last_run_duration_seconds", "Duration of the last training run")
+PIPELINE_LAST_RUN_SUCCESS = metrics_registry.gauge(
+    "crop_yield_pipeline_last_run_success", "1 if the last training run completed, 0 if it failed")
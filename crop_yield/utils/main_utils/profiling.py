@@ -0,0 +1,184 @@
+"""
+Opt-in profiling of a block of code: pipeline stages and selected API requests.
+
+    with profile_section("data_transformation", output_dir):
+        ...
+
+writes into output_dir, depending on the mode:
+
+    cprofile   <name>.prof        cProfile stats of the calling thread (snakeviz, pstats)
+    sampling   <name>.collapsed   stacks of every thread sampled every few ms, one
+                                  "frame;frame;frame count" line per stack
+                                  (flamegraph.pl, speedscope)
+
+plus <name>.memory.txt with tracemalloc's peak and the lines that allocated
+the most while the block ran. When profiling is disabled profile_section
+returns a shared nullcontext, so the guard costs a function call.
+"""
+import os
+import sys
+import time
+import cProfile
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import nullcontext
+
+from crop_yield.constant.training_pipeline import (
+    PROFILING_ENABLED,
+    PROFILING_MODE,
+    PROFILING_SAMPLE_INTERVAL_MS,
+    PROFILING_TRACEMALLOC,
+    PROFILING_TRACEMALLOC_TOP,
+)
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.logging.logger import logging
+
+PROFILING_MODES = ("cprofile", "sampling")
+
+_DISABLED = nullcontext()
+# tracemalloc is process-wide: it runs while any profiled section that asked for it is open
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+# Whether profiling started it (and so stops it), rather than e.g. PYTHONTRACEMALLOC
+_tracemalloc_owned = False
+
+
+class SamplingProfiler:
+    """
+    Low-overhead statistical profiler: a daemon thread records the stack of
+    every other thread each `interval` seconds. Unlike cProfile it sees work
+    done on pool threads and costs nothing between samples. Samples are wall
+    clock, so idle threads show up too, ending in frames such as wait().
+    """
+
+    def __init__(self, interval: float = PROFILING_SAMPLE_INTERVAL_MS / 1000):
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def _collapse(frame, thread_name: str) -> str:
+        frames = []
+        while frame is not None:
+            code = frame.f_code
+            frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+            frame = frame.f_back
+        frames.append(thread_name)
+        return ";".join(name.replace(";", ":") for name in reversed(frames))
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != own_id:
+                    self.samples[self._collapse(frame, names.get(thread_id, str(thread_id)))] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, file_path: str):
+        with open(file_path, "w") as file:
+            for stack, count in self.samples.most_common():
+                file.write(f"{stack} {count}\n")
+
+
+def _start_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_owned
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_owned = True
+        _tracemalloc_users += 1
+    tracemalloc.reset_peak()
+    return tracemalloc.take_snapshot()
+
+
+def _stop_tracemalloc(before: tracemalloc.Snapshot, file_path: str, top: int):
+    global _tracemalloc_users, _tracemalloc_owned
+    try:
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        stats = after.compare_to(before, "lineno")
+        with open(file_path, "w") as file:
+            file.write(f"Traced memory: {current / 1e6:.1f} MB at the end, {peak / 1e6:.1f} MB peak\n")
+            file.write(f"Net change: {sum(stat.size_diff for stat in stats) / 1e6:+.1f} MB\n\n")
+            file.write(f"Top {top} lines by allocated size while the section ran:\n")
+            for stat in stats[:top]:
+                file.write(f"{stat}\n")
+    finally:
+        with _tracemalloc_lock:
+            _tracemalloc_users -= 1
+            if _tracemalloc_users == 0 and _tracemalloc_owned:
+                tracemalloc.stop()
+                _tracemalloc_owned = False
+
+
+class ProfiledSection:
+    def __init__(self, name: str, output_dir: str, mode: str = PROFILING_MODE, memory: bool = PROFILING_TRACEMALLOC,
+                 memory_top: int = PROFILING_TRACEMALLOC_TOP):
+        try:
+            if mode not in PROFILING_MODES:
+                raise ValueError(f"Unknown profiling mode '{mode}', expected one of {PROFILING_MODES}")
+            self.name = name
+            self.output_dir = output_dir
+            self.mode = mode
+            self.memory = memory
+            self.memory_top = memory_top
+            self.file_paths = []
+            self._profiler = None
+            self._snapshot = None
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def _path(self, suffix: str) -> str:
+        file_path = os.path.join(self.output_dir, f"{self.name}{suffix}")
+        self.file_paths.append(file_path)
+        return file_path
+
+    def __enter__(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.memory:
+            self._snapshot = _start_tracemalloc()
+        self._started = time.perf_counter()
+        if self.mode == "cprofile":
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        else:
+            self._profiler = SamplingProfiler()
+            self._profiler.start()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self._started
+        # A failing profile write must not turn into the section's error
+        try:
+            if self.mode == "cprofile":
+                self._profiler.disable()
+                self._profiler.dump_stats(self._path(".prof"))
+            else:
+                self._profiler.stop()
+                self._profiler.write(self._path(".collapsed"))
+        except Exception as e:
+            logging.warning(f"Could not write profile of {self.name}: {e}")
+        if self._snapshot is not None:
+            try:
+                _stop_tracemalloc(self._snapshot, self._path(".memory.txt"), self.memory_top)
+            except Exception as e:
+                logging.warning(f"Could not write memory profile of {self.name}: {e}")
+        logging.info(f"Profiled {self.name} ({seconds:.2f}s): {', '.join(self.file_paths)}")
+        return False
+
+
+def profile_section(name: str, output_dir: str, enabled: bool = PROFILING_ENABLED, **options):
+    """ProfiledSection writing <name>.* into output_dir, or a no-op context when not enabled."""
+    if not enabled:
+        return _DISABLED
+    return ProfiledSection(name, output_dir, **options)
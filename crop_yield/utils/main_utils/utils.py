@@ -1,7 +1,8 @@
 import yaml
 import os,sys
+import json
 import pickle
-import dill
+import shutil
 import numpy as np
 from crop_yield.exception.exception import CropYieldException
 from crop_yield.logging.logger import logging
@@ -28,7 +29,56 @@ def write_yaml_file(file_path: str, content: object, replace: bool = False) -> N
             yaml.dump(content, file)
     except Exception as e:
         raise CropYieldException(e, sys)
+
+def read_json_file(file_path: str) -> dict:
+    """
+    Reads a JSON file and returns its content, or None if the file does not exist.
+    """
+    try:
+        if not os.path.exists(file_path):
+            return None
+        with open(file_path, "r") as json_file:
+            return json.load(json_file)
+    except Exception as e:
+        raise CropYieldException(e, sys) from e
+
+def write_json_file(file_path: str, content: object) -> None:
+    """
+    Writes content as JSON atomically (write to a temp file, then rename),
+    so concurrent readers never see a partially written file.
+    """
+    try:
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        tmp_file_path = f"{file_path}.{os.getpid()}.tmp"
+        with open(tmp_file_path, "w") as file:
+            json.dump(content, file, indent=2)
+        os.replace(tmp_file_path, file_path)
+    except Exception as e:
+        raise CropYieldException(e, sys) from e
     
+def link_file(src_path: str, dst_path: str) -> str:
+    """
+    Make dst_path refer to src_path's data without copying it: a hard link,
+    or a plain copy where hard links are not possible (another filesystem).
+    dst_path is replaced atomically, so readers see either the old or the new file.
+    """
+    try:
+        os.makedirs(os.path.dirname(dst_path) or ".", exist_ok=True)
+        if os.path.exists(dst_path) and os.path.samefile(src_path, dst_path):
+            # Already linked; renaming a link over its own file would be a no-op and leave tmp_path behind
+            return dst_path
+        tmp_path = f"{dst_path}.{os.getpid()}.tmp"
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        try:
+            os.link(src_path, tmp_path)
+        except OSError:
+            shutil.copy2(src_path, tmp_path)
+        os.replace(tmp_path, dst_path)
+        return dst_path
+    except Exception as e:
+        raise CropYieldException(e, sys) from e
+
 def save_numpy_array_data(file_path: str, array: np.array):
     """
     Save numpy array data to file
@@ -58,50 +108,89 @@ def load_object(file_path: str, ) -> object:
         if not os.path.exists(file_path):
             raise Exception(f"The file: {file_path} is not exists")
         with open(file_path, "rb") as file_obj:
-            print(file_obj)
             return pickle.load(file_obj)
     except Exception as e:
         raise CropYieldException(e, sys) from e
     
-def load_numpy_array_data(file_path: str) -> np.array:
+def load_numpy_array_data(file_path: str, mmap_mode: str = None) -> np.array:
     """
     load numpy array data from file
     file_path: str location of file to load
+    mmap_mode: e.g. "r" to memory-map the file instead of reading it into RAM
     return: np.array data loaded
     """
     try:
+        if mmap_mode is not None:
+            return np.load(file_path, mmap_mode=mmap_mode)
         with open(file_path, "rb") as file_obj:
             return np.load(file_obj)
     except Exception as e:
         raise CropYieldException(e, sys) from e
-    
-from sklearn.model_selection import GridSearchCV
-from sklearn.metrics import r2_score
-import sys
-
-from crop_yield.exception.exception import CropYieldException
 
-def evaluate_models(X_train, y_train, X_test, y_test, models: dict, param: dict) -> dict:
+def save_transformed_data(dir_path: str, X, y: np.array) -> None:
+    """
+    Save features and target of one split as separate .npy files under dir_path.
+    A sparse X is stored as its CSR components (data, indices, indptr), which
+    np.load can memory-map just like a dense X.
+    """
     try:
-        report = {}
+        from scipy import sparse
 
-        for model_name in models:
-            model = models[model_name]
-            param_grid = param.get(model_name, {})
+        os.makedirs(dir_path, exist_ok=True)
+        if sparse.issparse(X):
+            X = sparse.csr_matrix(X)
+            for component in ("data", "indices", "indptr"):
+                save_numpy_array_data(os.path.join(dir_path, f"X_{component}.npy"), getattr(X, component))
+            x_format = "csr"
+        else:
+            save_numpy_array_data(os.path.join(dir_path, "X.npy"), np.asarray(X))
+            x_format = "dense"
+        save_numpy_array_data(os.path.join(dir_path, "y.npy"), np.asarray(y))
+        write_json_file(os.path.join(dir_path, "dataset.json"), {"X_format": x_format, "X_shape": list(X.shape)})
+    except Exception as e:
+        raise CropYieldException(e, sys) from e
+
+def load_transformed_data(dir_path: str, mmap_mode: str = "r") -> tuple:
+    """
+    Load (X, y) saved by save_transformed_data, memory-mapped by default, so
+    no slice of a combined array has to be copied out.
+    """
+    try:
+        from scipy import sparse
 
-            if param_grid:
-                gs = GridSearchCV(model, param_grid, cv=3, n_jobs=-1, verbose=0)
-                gs.fit(X_train, y_train)
-                model.set_params(**gs.best_params_)
-            
-            model.fit(X_train, y_train)
+        meta = read_json_file(os.path.join(dir_path, "dataset.json"))
+        if meta is None:
+            raise Exception(f"No transformed dataset found in {dir_path}")
+        y = load_numpy_array_data(os.path.join(dir_path, "y.npy"), mmap_mode=mmap_mode)
+        if meta["X_format"] == "csr":
+            data, indices, indptr = (
+                load_numpy_array_data(os.path.join(dir_path, f"X_{component}.npy"), mmap_mode=mmap_mode)
+                for component in ("data", "indices", "indptr")
+            )
+            X = sparse.csr_matrix((data, indices, indptr), shape=tuple(meta["X_shape"]), copy=False)
+        else:
+            X = load_numpy_array_data(os.path.join(dir_path, "X.npy"), mmap_mode=mmap_mode)
+        return X, y
+    except Exception as e:
+        raise CropYieldException(e, sys) from e
+    
+import sys
 
-            y_test_pred = model.predict(X_test)
-            test_score = r2_score(y_test, y_test_pred)
+from crop_yield.exception.exception import CropYieldException
 
-            report[model_name] = test_score
+def evaluate_models(X_train, y_train, X_test, y_test, models: dict, param: dict, **selector_options) -> dict:
+    """
+    Tune and score every model; returns {model_name: R² on X_test}.
+    models[model_name] is replaced by its tuned estimator, already fitted on X_train.
+    selector_options are passed to ModelSelector (strategy, budget_seconds, n_jobs, ...).
+    """
+    try:
+        from crop_yield.utils.ml_utils.model.model_selection import ModelSelector
 
-        return report
+        results = ModelSelector(**selector_options).select(models, param, X_train, y_train, X_test, y_test)
+        for model_name, result in results.items():
+            models[model_name] = result.estimator
+        return {model_name: result.val_score for model_name, result in results.items()}
 
     except Exception as e:
         raise CropYieldException(e, sys)
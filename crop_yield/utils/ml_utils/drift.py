@@ -0,0 +1,229 @@
+import os
+import sys
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.utils.ml_utils.sketch import ReservoirSampler
+
+# Floor for empty categories in PSI, so a category missing on one side does not give an infinite index
+PSI_EPSILON = 1e-4
+# Quantiles kept per numeric column; the deciles are the bins for numeric PSI
+PROFILE_QUANTILES = np.linspace(0, 1, 11)
+PROFILE_FORMAT_VERSION = 1
+
+
+@dataclass
+class ReferenceProfile:
+    """
+    What drift detection needs to know about the reference (training) data:
+    a sorted sample and the deciles of every numeric column, a frequency
+    table of every categorical column, and a hash of the schema it was built
+    for. Comparing a batch against it never touches the reference rows again.
+
+    save()/load() keep it in a single .npz file: the samples as plain arrays
+    and everything else as one JSON string, so no pickle is involved.
+    """
+    n_rows: int
+    numeric: Dict[str, np.ndarray] = field(default_factory=dict)
+    categorical: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    quantiles: Dict[str, list] = field(default_factory=dict)
+    schema_hash: Optional[str] = None
+
+    def save(self, file_path: str) -> None:
+        try:
+            meta = {
+                "version": PROFILE_FORMAT_VERSION,
+                "n_rows": self.n_rows,
+                "schema_hash": self.schema_hash,
+                "numeric_columns": list(self.numeric),
+                "quantiles": self.quantiles,
+                "categorical": self.categorical,
+            }
+            arrays = {f"numeric_{i}": values for i, values in enumerate(self.numeric.values())}
+            os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+            # Written beside the target and renamed, so the app never loads a half-written profile
+            tmp_file_path = f"{file_path}.{os.getpid()}.tmp"
+            with open(tmp_file_path, "wb") as file:
+                np.savez(file, meta=np.array(json.dumps(meta)), **arrays)
+            os.replace(tmp_file_path, file_path)
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    @classmethod
+    def load(cls, file_path: str) -> "ReferenceProfile":
+        try:
+            with np.load(file_path, allow_pickle=False) as data:
+                meta = json.loads(str(data["meta"]))
+                if meta.get("version") != PROFILE_FORMAT_VERSION:
+                    raise ValueError(f"Unsupported reference profile version {meta.get('version')} in {file_path}")
+                numeric = {column: data[f"numeric_{i}"] for i, column in enumerate(meta["numeric_columns"])}
+            return cls(
+                n_rows=meta["n_rows"],
+                numeric=numeric,
+                categorical=meta["categorical"],
+                quantiles=meta["quantiles"],
+                schema_hash=meta["schema_hash"],
+            )
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+
+def column_kinds(schema_columns: dict) -> Dict[str, str]:
+    """{column: "categorical" | "numeric"} from the dtypes under `columns` in schema.yaml."""
+    return {
+        column: "categorical" if str(dtype) in ("object", "str", "string", "category") else "numeric"
+        for column, dtype in schema_columns.items()
+    }
+
+
+def schema_hash(schema_columns: dict) -> str:
+    """Short, order-independent hash of the column names and dtypes a profile was built for."""
+    canonical = json.dumps({column: str(dtype) for column, dtype in schema_columns.items()}, sort_keys=True)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def ks_from_sorted(reference: np.ndarray, current: np.ndarray) -> tuple:
+    """
+    Two-sample KS statistic and asymptotic p-value from two sorted samples.
+    Both empirical CDFs are evaluated with searchsorted on the pooled values,
+    the same statistic and p-value as scipy.stats.ks_2samp(method="asymp").
+    """
+    from scipy.stats import kstwo
+
+    n, m = len(reference), len(current)
+    pooled = np.concatenate([reference, current])
+    cdf_reference = np.searchsorted(reference, pooled, side="right") / n
+    cdf_current = np.searchsorted(current, pooled, side="right") / m
+    statistic = float(np.max(np.abs(cdf_reference - cdf_current)))
+    en = n * m / (n + m)
+    p_value = float(np.clip(kstwo.sf(statistic, np.round(en)), 0, 1))
+    return statistic, p_value
+
+
+def chi_square_psi(reference_counts: Dict[str, int], current_counts: Dict[str, int]) -> tuple:
+    """
+    Chi-square test of homogeneity on the 2 x K table of category counts, plus
+    the population stability index of the current distribution against the reference.
+    """
+    from scipy.stats import chi2
+
+    categories = sorted(set(reference_counts) | set(current_counts), key=str)
+    table = np.array([
+        [reference_counts.get(category, 0) for category in categories],
+        [current_counts.get(category, 0) for category in categories],
+    ], dtype=np.float64)
+    totals = table.sum(axis=1, keepdims=True)
+    expected = totals * table.sum(axis=0, keepdims=True) / table.sum()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        statistic = float(np.nansum((table - expected) ** 2 / expected))
+    dof = max(len(categories) - 1, 1)
+    p_value = float(chi2.sf(statistic, dof))
+
+    proportions = np.maximum(table / totals, PSI_EPSILON)
+    psi = float(np.sum((proportions[1] - proportions[0]) * np.log(proportions[1] / proportions[0])))
+    return statistic, p_value, psi
+
+
+def binned_psi(reference: np.ndarray, current: np.ndarray, edges) -> float:
+    """PSI of a numeric column over the bins between the reference quantiles `edges`."""
+    cuts = np.unique(np.asarray(edges, dtype=np.float64)[1:-1])
+    reference_counts = np.bincount(np.searchsorted(cuts, reference, side="right"), minlength=len(cuts) + 1)
+    current_counts = np.bincount(np.searchsorted(cuts, current, side="right"), minlength=len(cuts) + 1)
+    expected = np.maximum(reference_counts / reference_counts.sum(), PSI_EPSILON)
+    actual = np.maximum(current_counts / current_counts.sum(), PSI_EPSILON)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+class DriftDetector:
+    """
+    Compares batches of data against a ReferenceProfile, column by column.
+
+    Numeric columns use the two-sample KS test on sorted samples of at most
+    `sample_size` values, drawn by reservoir sampling, so the cost stops
+    growing with the data. Categorical columns use a chi-square test on
+    exact frequency tables. Both also report PSI (numeric columns over the
+    reference deciles). Columns are compared
+    concurrently on a thread pool: the sorting and counting run in NumPy and
+    pandas with the GIL released.
+    """
+
+    def __init__(self, column_kinds: Dict[str, str], threshold: float = 0.05,
+                 sample_size: int = 100_000, max_workers: Optional[int] = None, seed: int = 42):
+        try:
+            self.column_kinds = column_kinds
+            self.threshold = threshold
+            self.sample_size = sample_size
+            self.max_workers = max_workers
+            self.seed = seed
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def _sorted_sample(self, series: pd.Series) -> np.ndarray:
+        values = pd.to_numeric(series, errors="coerce").to_numpy(dtype=np.float64)
+        return np.sort(ReservoirSampler(self.sample_size, seed=self.seed).update(values).sample)
+
+    @staticmethod
+    def _counts(series: pd.Series) -> Dict[str, int]:
+        return {str(category): int(count) for category, count in series.value_counts(dropna=True).items()}
+
+    def _map_columns(self, fn, columns: list) -> dict:
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="drift") as executor:
+            return dict(zip(columns, executor.map(fn, columns)))
+
+    def build_reference(self, dataframe: pd.DataFrame, schema_hash: Optional[str] = None) -> ReferenceProfile:
+        try:
+            columns = [column for column in self.column_kinds if column in dataframe.columns]
+
+            def summarize(column):
+                if self.column_kinds[column] == "categorical":
+                    return self._counts(dataframe[column])
+                return self._sorted_sample(dataframe[column])
+
+            summaries = self._map_columns(summarize, columns)
+            profile = ReferenceProfile(n_rows=len(dataframe), schema_hash=schema_hash)
+            for column, summary in summaries.items():
+                if self.column_kinds[column] == "categorical":
+                    profile.categorical[column] = summary
+                else:
+                    profile.numeric[column] = summary
+                    if len(summary):
+                        profile.quantiles[column] = np.quantile(summary, PROFILE_QUANTILES).tolist()
+            return profile
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def compare(self, reference: ReferenceProfile, dataframe: pd.DataFrame) -> dict:
+        """
+        Returns {column: {"test", "statistic", "p_value", "drift_detected", ...}} for
+        every profiled column present in `dataframe`.
+        """
+        try:
+            profiled = set(reference.numeric) | set(reference.categorical)
+            columns = [column for column in self.column_kinds if column in profiled and column in dataframe.columns]
+
+            def compare_column(column):
+                if column in reference.categorical:
+                    statistic, p_value, psi = chi_square_psi(reference.categorical[column],
+                                                             self._counts(dataframe[column]))
+                    result = {"test": "chi_square", "statistic": statistic, "p_value": p_value, "psi": psi}
+                else:
+                    current = self._sorted_sample(dataframe[column])
+                    if len(current) == 0 or len(reference.numeric[column]) == 0:
+                        return {"test": "ks", "statistic": None, "p_value": None, "drift_detected": False}
+                    statistic, p_value = ks_from_sorted(reference.numeric[column], current)
+                    result = {"test": "ks", "statistic": statistic, "p_value": p_value}
+                    if column in reference.quantiles:
+                        result["psi"] = binned_psi(reference.numeric[column], current, reference.quantiles[column])
+                result["drift_detected"] = bool(p_value < self.threshold)
+                return result
+
+            return self._map_columns(compare_column, columns)
+        except Exception as e:
+            raise CropYieldException(e, sys)
@@ -0,0 +1,257 @@
+"""
+Single-file, versioned model bundle: preprocessor, estimator and area_freq_map together.
+
+Layout of a .bundle file:
+
+    MAGIC | manifest length (8 bytes, little endian) | manifest JSON | padding | payload
+
+The manifest records the format version, the feature and schema info, the
+library versions, a sha256 of the payload and where each payload section
+starts. The payload holds one pickle (protocol 5) whose large NumPy arrays
+are written out-of-band as separate 64-byte aligned sections. Loading
+memory-maps the file and hands those sections to pickle as buffers, so the
+arrays are views of the mapped file instead of copies. An XGBoost estimator
+can instead be stored in its native JSON/UBJ format, which any xgboost
+version (or another runtime) can read.
+"""
+import os
+import sys
+import json
+import mmap
+import time
+import pickle
+import struct
+import hashlib
+import platform
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.logging.logger import logging
+
+BUNDLE_MAGIC = b"CYBUNDLE"
+BUNDLE_FORMAT_VERSION = 1
+# Section offsets are aligned so mapped arrays start on a cache line
+BUNDLE_ALIGNMENT = 64
+# Arrays smaller than this are pickled in-band; a section each would only add padding
+OUT_OF_BAND_MIN_BYTES = 4096
+NATIVE_MODEL_FORMATS = ("json", "ubj")
+
+
+class BundleIntegrityError(Exception):
+    """Raised when a bundle is truncated, corrupted or written by a newer format version."""
+
+
+@dataclass
+class ModelBundle:
+    preprocessor: object
+    model: object
+    area_freq_map: Optional[dict]
+    manifest: dict
+
+    @property
+    def version(self) -> str:
+        """Content version: the start of the payload checksum."""
+        return self.manifest["checksum"]["sha256"][:12]
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // BUNDLE_ALIGNMENT) * BUNDLE_ALIGNMENT
+
+
+def _library_versions() -> dict:
+    versions = {"python": platform.python_version(), "numpy": np.__version__}
+    for name in ("sklearn", "xgboost"):
+        module = sys.modules.get(name)
+        if module is not None:
+            versions[name] = module.__version__
+    return versions
+
+
+def _feature_info(preprocessor, model, schema_columns: Optional[dict], target_column: Optional[str]) -> dict:
+    info = {"n_model_features": getattr(model, "n_features_in_", None)}
+    if schema_columns:
+        from crop_yield.utils.ml_utils.drift import schema_hash
+
+        info["columns"] = {name: dtype for name, dtype in schema_columns.items() if name != target_column}
+        info["schema_hash"] = schema_hash(schema_columns)
+    try:
+        info["feature_names_out"] = [str(name) for name in preprocessor.get_feature_names_out()]
+    except Exception:
+        info["feature_names_out"] = None
+    return info
+
+
+def _is_xgboost_model(model) -> bool:
+    return type(model).__module__.startswith("xgboost")
+
+
+def save_model_bundle(file_path: str, preprocessor, model, area_freq_map: Optional[dict] = None,
+                      schema_columns: Optional[dict] = None, target_column: Optional[str] = None,
+                      metadata: Optional[dict] = None, native_model_format: Optional[str] = None) -> dict:
+    """
+    Write the bundle atomically (temp file + rename) and return its manifest.
+
+    `native_model_format` ("json" or "ubj") stores an XGBoost estimator with
+    Booster.save_raw instead of pickle; it is ignored for other estimators.
+    """
+    try:
+        native = None
+        if native_model_format:
+            if native_model_format not in NATIVE_MODEL_FORMATS:
+                raise ValueError(f"native_model_format must be one of {NATIVE_MODEL_FORMATS}")
+            if _is_xgboost_model(model):
+                native = {
+                    "format": native_model_format,
+                    "class": f"{type(model).__module__}.{type(model).__qualname__}",
+                    # Estimator settings live outside the booster (e.g. missing=0.0 for sparse-trained models)
+                    "params": {name: value for name, value in model.get_params().items()
+                               if value is None or isinstance(value, (bool, int, float, str))},
+                    "data": bytes(model.get_booster().save_raw(raw_format=native_model_format)),
+                }
+
+        buffers = []
+
+        def buffer_callback(buffer: pickle.PickleBuffer) -> bool:
+            # Returning True keeps a buffer in-band
+            if buffer.raw().nbytes < OUT_OF_BAND_MIN_BYTES:
+                return True
+            buffers.append(buffer)
+            return False
+
+        state = {"preprocessor": preprocessor, "model": None if native else model, "area_freq_map": area_freq_map}
+        pickled = pickle.dumps(state, protocol=5, buffer_callback=buffer_callback)
+
+        # Payload sections, offsets relative to the start of the payload
+        sections, blobs, offset = [], [], 0
+        for name, blob in [("pickle", memoryview(pickled))] + \
+                [("buffer", buffer.raw()) for buffer in buffers] + \
+                ([("native_model", memoryview(native["data"]))] if native else []):
+            offset = _aligned(offset)
+            sections.append({"name": name, "offset": offset, "length": blob.nbytes})
+            blobs.append((offset, blob))
+            offset += blob.nbytes
+        payload_length = offset
+
+        digest = hashlib.sha256()
+        position = 0
+        for blob_offset, blob in blobs:
+            digest.update(bytes(blob_offset - position))
+            digest.update(blob)
+            position = blob_offset + blob.nbytes
+
+        manifest = {
+            "format_version": BUNDLE_FORMAT_VERSION,
+            "created_at": time.time(),
+            "model_class": f"{type(model).__module__}.{type(model).__qualname__}",
+            "preprocessor_class": f"{type(preprocessor).__module__}.{type(preprocessor).__qualname__}",
+            "features": _feature_info(preprocessor, model, schema_columns, target_column),
+            "libraries": _library_versions(),
+            "native_model": {key: native[key] for key in ("format", "class", "params")} if native else None,
+            "metadata": metadata or {},
+            "payload_length": payload_length,
+            "sections": sections,
+            "checksum": {"algorithm": "sha256", "sha256": digest.hexdigest()},
+        }
+        manifest_bytes = json.dumps(manifest, default=str).encode("utf-8")
+        header_length = len(BUNDLE_MAGIC) + 8 + len(manifest_bytes)
+        payload_start = _aligned(header_length)
+
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        tmp_path = f"{file_path}.tmp"
+        with open(tmp_path, "wb") as file:
+            file.write(BUNDLE_MAGIC)
+            file.write(struct.pack("<Q", len(manifest_bytes)))
+            file.write(manifest_bytes)
+            file.write(bytes(payload_start - header_length))
+            position = 0
+            for blob_offset, blob in blobs:
+                file.write(bytes(blob_offset - position))
+                file.write(blob)
+                position = blob_offset + blob.nbytes
+        os.replace(tmp_path, file_path)
+        logging.info(f"Saved model bundle {file_path}: {payload_start + payload_length} bytes, "
+                     f"{len(buffers)} out-of-band arrays")
+        return manifest
+    except Exception as e:
+        raise CropYieldException(e, sys)
+
+
+def _read_header(file) -> tuple:
+    magic = file.read(len(BUNDLE_MAGIC))
+    if magic != BUNDLE_MAGIC:
+        raise BundleIntegrityError("Not a model bundle (bad magic bytes)")
+    (manifest_length,) = struct.unpack("<Q", file.read(8))
+    manifest = json.loads(file.read(manifest_length).decode("utf-8"))
+    if manifest.get("format_version", 0) > BUNDLE_FORMAT_VERSION:
+        raise BundleIntegrityError(f"Bundle format version {manifest['format_version']} is newer than "
+                                   f"the supported version {BUNDLE_FORMAT_VERSION}")
+    return manifest, _aligned(len(BUNDLE_MAGIC) + 8 + manifest_length)
+
+
+def read_bundle_manifest(file_path: str) -> dict:
+    """Only the manifest, without touching the payload."""
+    try:
+        with open(file_path, "rb") as file:
+            return _read_header(file)[0]
+    except Exception as e:
+        raise CropYieldException(e, sys)
+
+
+def load_model_bundle(file_path: str, verify: bool = True) -> ModelBundle:
+    """
+    Memory-map a bundle and rebuild its objects. Out-of-band arrays are read-only
+    views of the mapping. With `verify` the payload checksum is checked first.
+    """
+    try:
+        with open(file_path, "rb") as file:
+            manifest, payload_start = _read_header(file)
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        payload = memoryview(mapped)[payload_start:]
+        if len(payload) != manifest["payload_length"]:
+            raise BundleIntegrityError(f"Bundle is truncated: payload has {len(payload)} of "
+                                       f"{manifest['payload_length']} bytes")
+        if verify and hashlib.sha256(payload).hexdigest() != manifest["checksum"]["sha256"]:
+            raise BundleIntegrityError(f"Checksum mismatch in {file_path}")
+
+        def section(entry) -> memoryview:
+            return payload[entry["offset"]:entry["offset"] + entry["length"]]
+
+        sections = manifest["sections"]
+        buffers = [section(entry) for entry in sections if entry["name"] == "buffer"]
+        state = pickle.loads(section(sections[0]), buffers=buffers)
+
+        model = state["model"]
+        if manifest.get("native_model"):
+            import xgboost
+
+            native_section = next(entry for entry in sections if entry["name"] == "native_model")
+            native = manifest["native_model"]
+            model = getattr(xgboost, native["class"].rsplit(".", 1)[-1])(**native["params"])
+            model.load_model(bytearray(section(native_section)))
+
+        expected = manifest["libraries"].get("sklearn")
+        installed = sys.modules.get("sklearn")
+        if expected and installed is not None and installed.__version__ != expected:
+            logging.warning(f"Model bundle {file_path} was written with scikit-learn {expected}, "
+                            f"loading it with {installed.__version__}")
+        return ModelBundle(preprocessor=state["preprocessor"], model=model,
+                           area_freq_map=state["area_freq_map"], manifest=manifest)
+    except Exception as e:
+        raise CropYieldException(e, sys)
+
+
+def export_native_model(model, file_path: str) -> Optional[str]:
+    """
+    Save an XGBoost estimator in its native format, picked from the extension
+    (.json or .ubj). Returns None for estimators that have no native format.
+    """
+    try:
+        if not _is_xgboost_model(model):
+            return None
+        model.save_model(file_path)
+        return file_path
+    except Exception as e:
+        raise CropYieldException(e, sys)
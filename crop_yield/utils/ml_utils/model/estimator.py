@@ -2,21 +2,135 @@ from crop_yield.constant.training_pipeline import SAVED_MODEL_DIR, MODEL_FILE_NA
 
 import os
 import sys
+import numpy as np
+import pandas as pd
 from crop_yield.exception.exception import CropYieldException
 from crop_yield.logging.logger import logging
+from crop_yield.utils.ml_utils.model.fast_encoder import FastFeatureEncoder
+from crop_yield.utils.ml_utils.model.tree_engine import compile_tree_ensemble, calibrate_max_rows
+from crop_yield.utils.main_utils.metrics import INFERENCE_STAGE_SECONDS
 
 class CropYieldModel:
-    def __init__(self, preprocessor, model):
+    def __init__(self, preprocessor, model, area_freq_map: dict = None):
         try:
             self.preprocessor = preprocessor
             self.model = model
+            # Frequency encoding for 'Area'; unseen areas fall back to the mean frequency
+            self.area_freq_map = area_freq_map
+            self.mean_area_freq = np.mean(list(area_freq_map.values())) if area_freq_map else None
+            self.fast_encoder = None
+            self.tree_engine = None
+            self.tree_engine_max_rows = 0
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def enable_fast_path(self) -> bool:
+        """
+        Compile the preprocessor into a FastFeatureEncoder for single-record prediction.
+
+        The encoder is only kept if it reproduces preprocessor.transform exactly
+        on a set of probe records (tests/test_fast_path.py checks the predictions
+        on real rows); otherwise predict_record keeps using the DataFrame path.
+        """
+        try:
+            encoder = FastFeatureEncoder(self.preprocessor, getattr(self, "area_freq_map", None))
+            records = encoder.probe_records()
+            fast_features = np.vstack([encoder.encode(record) for record in records])
+            frame = self.encode_area(pd.DataFrame(records))
+            reference_features = np.asarray(self.preprocessor.transform(frame), dtype=np.float64)
+            # Both paths predict one row at a time, so equal features give equal predictions.
+            # Comparing against one batched model.predict would not: a linear model's matrix
+            # product can differ from its row-by-row result in the last bit.
+            if not np.array_equal(fast_features, reference_features):
+                raise ValueError("Fast encoder features differ from preprocessor.transform")
+            self.fast_encoder = encoder
+            return True
+        except Exception as e:
+            self.fast_encoder = None
+            logging.warning(f"Single-record fast path disabled: {e}")
+            return False
+
+    def enable_tree_engine(self, max_rows: int = 0, rtol: float = 1e-5) -> bool:
+        """
+        Compile a tree-ensemble model into a TreeEnsemble, used for batches of up to
+        `max_rows` rows (0: measured against model.predict, see calibrate_max_rows).
+
+        The engine is only kept if it matches model.predict within `rtol` on random
+        probe inputs, missing values included.
+        """
+        try:
+            engine = compile_tree_ensemble(self.model)
+            if engine is None:
+                raise ValueError(f"{type(self.model).__name__} is not a tree ensemble")
+            rng = np.random.default_rng(0)
+            probe = rng.standard_normal((512, engine.n_features))
+            probe[rng.random(probe.shape) < 0.5] = 0.0
+            probe[rng.random(probe.shape) < 0.01] = np.nan
+            try:
+                expected = self.model.predict(probe)
+            except ValueError:
+                # Models that reject missing values are only probed with finite inputs
+                probe = np.nan_to_num(probe)
+                expected = self.model.predict(probe)
+            if not np.allclose(engine.predict(probe), expected, rtol=rtol, atol=rtol * np.abs(expected).max()):
+                raise ValueError("Tree engine predictions differ from model.predict")
+            self.tree_engine_max_rows = max_rows or calibrate_max_rows(engine, self.model, probe)
+            self.tree_engine = engine if self.tree_engine_max_rows else None
+            logging.info(f"Tree engine for {engine.source}: {engine.n_trees} trees, {engine.n_nodes} nodes, "
+                         f"used up to {self.tree_engine_max_rows} rows per call")
+            return self.tree_engine is not None
+        except Exception as e:
+            self.tree_engine = None
+            self.tree_engine_max_rows = 0
+            logging.warning(f"Tree engine disabled: {e}")
+            return False
+
+    def predict_features(self, x_transform) -> np.ndarray:
+        """model.predict on already transformed features, through the tree engine for small batches."""
+        # Models pickled before the tree engine existed do not carry the attribute
+        engine = getattr(self, "tree_engine", None)
+        if engine is not None and x_transform.shape[0] <= self.tree_engine_max_rows:
+            return engine.predict(x_transform)
+        return self.model.predict(x_transform)
+
+    def encode_area(self, x: pd.DataFrame) -> pd.DataFrame:
+        """
+        Return a copy of x with 'Area' mapped through area_freq_map.
+        Frames whose 'Area' column is already numeric are returned unchanged.
+        """
+        try:
+            # Models pickled before area_freq_map was bundled do not carry the attribute
+            area_freq_map = getattr(self, "area_freq_map", None)
+            if area_freq_map is None or "Area" not in x.columns:
+                return x
+            if pd.api.types.is_numeric_dtype(x["Area"]):
+                return x
+            return x.assign(Area=x["Area"].map(area_freq_map).fillna(self.mean_area_freq))
         except Exception as e:
             raise CropYieldException(e, sys)
 
     def predict(self, x):
         try:
-            x_transform = self.preprocessor.transform(x)
-            y_hat = self.model.predict(x_transform)
+            with INFERENCE_STAGE_SECONDS.time(stage="preprocess"):
+                x = self.encode_area(x)
+                x_transform = self.preprocessor.transform(x)
+            with INFERENCE_STAGE_SECONDS.time(stage="predict"):
+                y_hat = self.predict_features(x_transform)
             return y_hat
         except Exception as e:
             raise CropYieldException(e, sys)
+
+    def predict_record(self, record: dict) -> float:
+        """Predict a single record given as a dict of raw feature values."""
+        try:
+            encoder = getattr(self, "fast_encoder", None)
+            if encoder is None:
+                with INFERENCE_STAGE_SECONDS.time(stage="decode"):
+                    x = pd.DataFrame([record])
+                return self.predict(x)[0]
+            with INFERENCE_STAGE_SECONDS.time(stage="preprocess"):
+                x_transform = encoder.encode(record)
+            with INFERENCE_STAGE_SECONDS.time(stage="predict"):
+                return self.predict_features(x_transform)[0]
+        except Exception as e:
+            raise CropYieldException(e, sys)
@@ -0,0 +1,143 @@
+import sys
+import numbers
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from crop_yield.exception.exception import CropYieldException
+
+if TYPE_CHECKING:
+    from sklearn.compose import ColumnTransformer
+
+
+class FastFeatureEncoder:
+    """
+    Flat NumPy replacement for the fitted preprocessing of a single record.
+
+    Compiles the fitted ColumnTransformer from
+    DataTransformation.get_data_transformer_object (StandardScaler + OneHotEncoder)
+    and the area_freq_map into plain arrays and dicts, so one row can be encoded
+    without building a DataFrame or going through ColumnTransformer.transform.
+    The arithmetic is the same as sklearn's, so the output is bit-for-bit equal.
+    """
+
+    def __init__(self, preprocessor: "ColumnTransformer", area_freq_map: dict = None):
+        try:
+            # Imported here, not at module level: the serving entry point should not pay for sklearn at import
+            from sklearn.compose import ColumnTransformer
+            from sklearn.preprocessing import StandardScaler, OneHotEncoder
+
+            self.area_freq_map = area_freq_map
+            self.mean_area_freq = float(np.mean(list(area_freq_map.values()))) if area_freq_map else None
+
+            if not isinstance(preprocessor, ColumnTransformer) or not hasattr(preprocessor, "transformers_"):
+                raise ValueError("Expected a fitted ColumnTransformer")
+            if getattr(preprocessor, "sparse_output_", False):
+                raise ValueError("Sparse ColumnTransformer output is not supported by the fast path")
+
+            self.numerical_columns = []
+            self.categorical_columns = []
+            means, scales = [], []
+            category_index = []
+            unknown_ignored = []
+
+            for name, transformer, columns in preprocessor.transformers_:
+                if isinstance(transformer, str):
+                    if transformer == "drop":
+                        continue
+                    raise ValueError(f"Unsupported transformer '{transformer}' for {name}")
+                step = self._single_step(transformer)
+                columns = list(columns)
+                if isinstance(step, StandardScaler):
+                    n = len(columns)
+                    means.append(step.mean_ if step.with_mean else np.zeros(n))
+                    scales.append(step.scale_ if step.with_std else np.ones(n))
+                    self.numerical_columns.extend(columns)
+                elif isinstance(step, OneHotEncoder):
+                    if step.drop_idx_ is not None or getattr(step, "_infrequent_enabled", False):
+                        raise ValueError("OneHotEncoder with drop/infrequent categories is not supported")
+                    for column, categories in zip(columns, step.categories_):
+                        category_index.append({category: i for i, category in enumerate(categories)})
+                        unknown_ignored.append(step.handle_unknown != "error")
+                        self.categorical_columns.append(column)
+                else:
+                    raise ValueError(f"Unsupported transformer {type(step).__name__}")
+
+            # Numerical block must come first, as in the training-time ColumnTransformer
+            expected_order = [
+                column for _, transformer, columns in preprocessor.transformers_
+                if not isinstance(transformer, str) for column in columns
+            ]
+            if expected_order != self.numerical_columns + self.categorical_columns:
+                raise ValueError("Numerical transformers must precede categorical ones")
+
+            self.mean = np.concatenate(means) if means else np.empty(0)
+            self.scale = np.concatenate(scales) if scales else np.empty(0)
+            self.n_numerical = len(self.numerical_columns)
+
+            # Item -> absolute output column, one dict per categorical column
+            self.category_index = []
+            offset = self.n_numerical
+            for index in category_index:
+                self.category_index.append({category: offset + i for category, i in index.items()})
+                offset += len(index)
+            self.unknown_ignored = unknown_ignored
+            self.n_features = offset
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    @staticmethod
+    def _single_step(transformer):
+        from sklearn.pipeline import Pipeline
+
+        if isinstance(transformer, Pipeline):
+            if len(transformer.steps) != 1:
+                raise ValueError("Only single-step pipelines are supported")
+            return transformer.steps[0][1]
+        return transformer
+
+    def _numeric_value(self, record: dict, column: str) -> float:
+        value = record[column]
+        if column == "Area" and self.area_freq_map is not None and not isinstance(value, numbers.Number):
+            return self.area_freq_map.get(value, self.mean_area_freq)
+        return value
+
+    def encode(self, record: dict) -> np.ndarray:
+        """Encode one record (dict of raw feature values) into a (1, n_features) float64 array."""
+        try:
+            row = np.zeros((1, self.n_features), dtype=np.float64)
+            numeric = row[0, :self.n_numerical]
+            numeric[:] = [self._numeric_value(record, column) for column in self.numerical_columns]
+            numeric -= self.mean
+            numeric /= self.scale
+
+            for column, index, ignore in zip(self.categorical_columns, self.category_index, self.unknown_ignored):
+                position = index.get(record[column])
+                if position is not None:
+                    row[0, position] = 1.0
+                elif not ignore:
+                    raise ValueError(f"Found unknown category {record[column]!r} in column {column}")
+            return row
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def probe_records(self) -> list:
+        """
+        Records covering every known category, an unseen category and an unseen Area,
+        used to check the fast path against the ColumnTransformer before enabling it.
+        """
+        areas = list(self.area_freq_map)[:3] + ["__unseen_area__"] if self.area_freq_map else [0.0]
+        n_records = max([len(index) for index in self.category_index] + [len(areas)]) + 1
+        records = []
+        for i in range(n_records):
+            record = {
+                column: float(self.mean[k] + ((i % 5) - 2) * self.scale[k])
+                for k, column in enumerate(self.numerical_columns)
+            }
+            if "Area" in record:
+                record["Area"] = areas[i % len(areas)]
+            for column, index in zip(self.categorical_columns, self.category_index):
+                known = list(index)
+                record[column] = known[i] if i < len(known) else "__unseen_category__"
+            records.append(record)
+        return records
@@ -0,0 +1,224 @@
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.metrics import r2_score
+from sklearn.model_selection import ParameterGrid, ParameterSampler, cross_val_score
+
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.logging.logger import logging
+
+SEARCH_STRATEGIES = ("grid", "random", "halving")
+# Share of parameter sets kept, and growth of the sample count, per successive halving iteration
+HALVING_FACTOR = 3
+
+
+@dataclass
+class CandidateResult:
+    model_name: str
+    estimator: object
+    best_params: dict
+    cv_score: Optional[float]
+    val_score: float
+    configs_evaluated: int
+    configs_total: int
+    budget_exhausted: bool
+    search_seconds: float
+    fit_seconds: float
+    timings: List[dict] = field(default_factory=list)
+
+    def summary(self) -> dict:
+        """Everything but the fitted estimator, for logs and the YAML report."""
+        return {
+            "best_params": {k: v.item() if isinstance(v, np.generic) else v for k, v in self.best_params.items()},
+            "cv_score": None if self.cv_score is None else float(self.cv_score),
+            "val_score": float(self.val_score),
+            "configs_evaluated": self.configs_evaluated,
+            "configs_total": self.configs_total,
+            "budget_exhausted": self.budget_exhausted,
+            "search_seconds": round(self.search_seconds, 3),
+            "fit_seconds": round(self.fit_seconds, 3),
+        }
+
+
+def _parameter_candidates(param_grid: dict, strategy: str, n_iter: int, random_state: int) -> list:
+    if strategy == "random":
+        grid = ParameterGrid(param_grid)
+        return list(ParameterSampler(param_grid, n_iter=min(n_iter, len(grid)), random_state=random_state))
+    return list(ParameterGrid(param_grid))
+
+
+def _budget_exhausted(scored: bool, deadline: Optional[float]) -> bool:
+    # At least one parameter set is always scored, so every candidate gets a result
+    return scored and deadline is not None and time.time() >= deadline
+
+
+def _successive_halving(estimator, param_grid: dict, X_train, y_train, cv: int, deadline: Optional[float],
+                        random_state: int) -> tuple:
+    """
+    (best_params, cv_score, timings, configs_evaluated, budget_exhausted) of a
+    successive halving search over the grid.
+
+    Every parameter set is scored on a random subset of the rows; the best
+    1 / HALVING_FACTOR go on to a HALVING_FACTOR times larger subset, the last
+    iteration using all rows. No more parameter sets are scored once the
+    deadline has passed; the best of the furthest iteration reached wins.
+    """
+    candidates = list(ParameterGrid(param_grid))
+    n_samples = X_train.shape[0]
+    n_iterations = 1 + int(np.floor(np.log(len(candidates)) / np.log(HALVING_FACTOR)))
+    min_samples = max(n_samples // HALVING_FACTOR ** (n_iterations - 1), 2 * cv)
+    order = np.random.default_rng(random_state).permutation(n_samples)
+
+    best_params, cv_score, timings = {}, None, []
+    configs_evaluated, budget_exhausted = 0, False
+    for iteration in range(n_iterations):
+        n_rows = n_samples if iteration == n_iterations - 1 else min(min_samples * HALVING_FACTOR ** iteration,
+                                                                     n_samples)
+        rows = np.sort(order[:n_rows])
+        X_rows, y_rows = X_train[rows], y_train[rows]
+        started = time.perf_counter()
+        scores = []
+        for params in candidates:
+            if _budget_exhausted(bool(timings or scores), deadline):
+                budget_exhausted = True
+                break
+            scores.append(cross_val_score(clone(estimator).set_params(**params), X_rows, y_rows,
+                                          cv=cv, scoring="r2", n_jobs=1).mean())
+        if iteration == 0:
+            configs_evaluated = len(scores)
+        if scores:
+            timings.append({"iteration": iteration, "n_candidates": len(scores), "n_samples": int(n_rows),
+                            "seconds": round(time.perf_counter() - started, 3)})
+            best = int(np.argmax(scores))
+            best_params, cv_score = candidates[best], scores[best]
+        if budget_exhausted:
+            break
+        ranked = np.argsort(scores, kind="stable")[::-1]
+        candidates = [candidates[i] for i in ranked[:max(-(-len(scores) // HALVING_FACTOR), 1)]]
+    return best_params, cv_score, timings, configs_evaluated, budget_exhausted
+
+
+def search_candidate(model_name: str, estimator, param_grid: dict, X_train, y_train, X_val, y_val,
+                     strategy: str, n_iter: int, cv: int, deadline: Optional[float],
+                     random_state: int) -> CandidateResult:
+    """
+    Tune one estimator and fit it once on the full training set (runs inside a pool worker).
+
+    "grid" and "random" score parameter sets with cross-validation one at a
+    time and stop once the wall-clock deadline has passed; at least one set is
+    always scored, so every candidate gets a result. "halving" runs successive
+    halving, which spends its budget by growing the sample count only for the
+    surviving parameter sets, and honours the deadline the same way.
+    """
+    search_started = time.perf_counter()
+    best_params, cv_score, timings = {}, None, []
+    configs_total, budget_exhausted = 1, False
+
+    if param_grid and strategy == "halving":
+        best_params, cv_score, timings, configs_evaluated, budget_exhausted = _successive_halving(
+            estimator, param_grid, X_train, y_train, cv, deadline, random_state)
+        configs_total = len(ParameterGrid(param_grid))
+    elif param_grid:
+        candidates = _parameter_candidates(param_grid, strategy, n_iter, random_state)
+        configs_total = len(candidates)
+        for params in candidates:
+            if _budget_exhausted(bool(timings), deadline):
+                budget_exhausted = True
+                break
+            started = time.perf_counter()
+            score = cross_val_score(clone(estimator).set_params(**params), X_train, y_train,
+                                    cv=cv, scoring="r2", n_jobs=1).mean()
+            timings.append({"params": params, "cv_score": float(score),
+                            "seconds": round(time.perf_counter() - started, 3)})
+            if cv_score is None or score > cv_score:
+                best_params, cv_score = params, score
+        configs_evaluated = len(timings)
+    else:
+        configs_evaluated = 1
+    search_seconds = time.perf_counter() - search_started
+
+    # The only fit on the full training set; this estimator is the one that gets saved
+    fit_started = time.perf_counter()
+    fitted = clone(estimator).set_params(**best_params).fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - fit_started
+
+    return CandidateResult(
+        model_name=model_name,
+        estimator=fitted,
+        best_params=best_params,
+        cv_score=cv_score,
+        val_score=r2_score(y_val, fitted.predict(X_val)),
+        configs_evaluated=configs_evaluated,
+        configs_total=configs_total,
+        budget_exhausted=budget_exhausted,
+        search_seconds=search_seconds,
+        fit_seconds=fit_seconds,
+        timings=timings,
+    )
+
+
+class ModelSelector:
+    """
+    Tunes every candidate model concurrently and picks the best by validation R².
+
+    Candidates are spread over a joblib (loky) process pool; memory-mapped
+    training data is handed to the workers by file reference rather than
+    copied. `budget_seconds` is a wall-clock budget for the whole selection,
+    shared by all candidates. When candidates run in parallel, estimators
+    with their own thread pool (XGBoost, forests) are limited to one thread
+    each so the workers do not oversubscribe the cores. The winner is
+    returned already fitted, so it does not need to be trained again.
+    """
+
+    def __init__(self, strategy: str = "grid", budget_seconds: float = 0, n_iter: int = 10,
+                 cv: int = 3, n_jobs: int = 1, random_state: int = 42):
+        try:
+            if strategy not in SEARCH_STRATEGIES:
+                raise ValueError(f"Unknown search strategy '{strategy}', expected one of {SEARCH_STRATEGIES}")
+            self.strategy = strategy
+            self.budget_seconds = budget_seconds
+            self.n_iter = n_iter
+            self.cv = cv
+            self.n_jobs = n_jobs
+            self.random_state = random_state
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def select(self, models: dict, param_grids: dict, X_train, y_train, X_val, y_val) -> Dict[str, CandidateResult]:
+        try:
+            deadline = time.time() + self.budget_seconds if self.budget_seconds else None
+            started = time.perf_counter()
+            n_workers = min(self.n_jobs, len(models))
+            if n_workers > 1:
+                models = {model_name: clone(model).set_params(n_jobs=1) if "n_jobs" in model.get_params() else model
+                          for model_name, model in models.items()}
+            results = Parallel(n_jobs=n_workers, backend="loky")(
+                delayed(search_candidate)(
+                    model_name, model, param_grids.get(model_name, {}), X_train, y_train, X_val, y_val,
+                    self.strategy, self.n_iter, self.cv, deadline, self.random_state,
+                )
+                for model_name, model in models.items()
+            )
+            for result in results:
+                logging.info(f"Model selection: {result.model_name} {result.summary()}")
+            logging.info(f"Model selection ({self.strategy}) took {time.perf_counter() - started:.1f}s")
+            return {result.model_name: result for result in results}
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    @staticmethod
+    def best(results: Dict[str, CandidateResult]) -> CandidateResult:
+        return max(results.values(), key=lambda result: result.val_score)
+
+    @staticmethod
+    def report(results: Dict[str, CandidateResult]) -> dict:
+        best = ModelSelector.best(results)
+        return {
+            "best_model": best.model_name,
+            "candidates": {name: {**result.summary(), "timings": result.timings} for name, result in results.items()},
+        }
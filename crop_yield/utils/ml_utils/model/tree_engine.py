@@ -0,0 +1,255 @@
+import sys
+import json
+import time
+from typing import Optional
+
+import numpy as np
+
+from crop_yield.exception.exception import CropYieldException
+
+# Rows evaluated together; keeps the (rows x trees) working arrays in cache
+TREE_ENGINE_BLOCK_ROWS = 2048
+
+
+class TreeEnsemble:
+    """
+    Fitted tree ensemble compiled into flat NumPy arrays.
+
+    Every tree's nodes are concatenated into shared arrays (input slot,
+    threshold, children, leaf value) and `roots` holds where each tree
+    starts. Leaves point to themselves, so a block of rows walks all trees at
+    once, one level per step, for as many steps as the deepest tree:
+
+        node = children[2 * node + (x[slot[node]] goes left)]
+
+    prediction = (base_score + leaf of tree 1 + leaf of tree 2 + ...) / divisor,
+    added in tree order in the library's own precision, so it equals the
+    library's output exactly.
+
+    sklearn trees compare float32 inputs with `<=`; XGBoost compares float32
+    values with `<`, and sends NaN (and `missing`, e.g. 0.0) the default way.
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray, right: np.ndarray,
+                 default_left: np.ndarray, value: np.ndarray, roots: np.ndarray, max_depth: int,
+                 n_features: int, base_score: float = 0.0, divisor: float = 1.0, strict_less: bool = False,
+                 missing: Optional[float] = None, dtype=np.float64, source: str = ""):
+        try:
+            n_nodes = len(feature)
+            default_left = np.asarray(default_left, dtype=bool)
+            # Missing values are stored twice per row, as NaN (fails every comparison, so goes right)
+            # and as -inf (goes left); a node reads the copy matching its default direction, so the
+            # walk needs no missing-value branch
+            self.slot = np.ascontiguousarray(np.asarray(feature) + n_features * default_left, dtype=np.int32)
+            self.threshold = np.ascontiguousarray(threshold, dtype=np.float32 if strict_less else np.float64)
+            # children[2 * node] is the right child, children[2 * node + 1] the left one
+            self.children = np.ascontiguousarray(np.column_stack([right, left]).ravel(), dtype=np.int32)
+            self.value = np.ascontiguousarray(value, dtype=dtype)
+            self.roots = np.ascontiguousarray(roots, dtype=np.int32)
+            self.is_leaf = np.asarray(left) == np.arange(n_nodes)
+            self.max_depth = int(max_depth)
+            self.n_features = int(n_features)
+            self.base_score = float(base_score)
+            self.divisor = divisor
+            self.strict_less = strict_less
+            self.missing = missing
+            self.dtype = np.dtype(dtype)
+            self.source = source
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.slot)
+
+    def _prepare(self, x) -> np.ndarray:
+        """(rows, 2 * n_features): the inputs with missing values as NaN, then as -inf."""
+        if hasattr(x, "toarray"):
+            x = x.toarray()
+        x = np.asarray(x)
+        if x.ndim != 2 or x.shape[1] != self.n_features:
+            raise ValueError(f"Expected {self.n_features} features, got shape {x.shape}")
+        # Both libraries see float32 inputs; sklearn then compares them as doubles against its thresholds
+        x = x.astype(np.float32, copy=False).astype(np.float32 if self.strict_less else np.float64)
+        missing = np.isnan(x)
+        if self.missing is not None and not np.isnan(self.missing):
+            missing |= x == self.missing
+        return np.hstack([np.where(missing, np.nan, x), np.where(missing, -np.inf, x)])
+
+    def _leaves(self, x: np.ndarray) -> np.ndarray:
+        n_rows = len(x)
+        nodes = np.broadcast_to(self.roots, (n_rows, self.n_trees)).copy()
+        row_offsets = (np.arange(n_rows, dtype=np.int32) * x.shape[1])[:, None]
+        flat_x = x.ravel()
+        for step in range(self.max_depth):
+            values = flat_x[row_offsets + self.slot[nodes]]
+            thresholds = self.threshold[nodes]
+            go_left = values < thresholds if self.strict_less else values <= thresholds
+            nodes = self.children[2 * nodes + go_left]
+            # Most paths end well above the deepest leaf; stop once every row has reached one
+            if step % 4 == 3 and self.is_leaf[nodes].all():
+                break
+        return nodes
+
+    def predict(self, x) -> np.ndarray:
+        try:
+            x = self._prepare(x)
+            out = np.empty(len(x), dtype=self.dtype)
+            for start in range(0, len(x), TREE_ENGINE_BLOCK_ROWS):
+                block = x[start:start + TREE_ENGINE_BLOCK_ROWS]
+                terms = np.empty((len(block), self.n_trees + 1), dtype=self.dtype)
+                terms[:, 0] = self.base_score
+                terms[:, 1:] = self.value[self._leaves(block)]
+                # cumsum adds strictly left to right, as the libraries do (sum() would add pairwise)
+                out[start:start + len(block)] = np.cumsum(terms, axis=1)[:, -1]
+            return out / self.dtype.type(self.divisor) if self.divisor != 1 else out
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+
+def _tree_depth(left: np.ndarray, right: np.ndarray, root: int = 0) -> int:
+    depth, level = 0, np.array([root])
+    while True:
+        children = np.concatenate([left[level], right[level]])
+        children = children[children >= 0]
+        if not len(children):
+            return depth
+        depth, level = depth + 1, children
+
+
+def _concatenate(trees: list) -> dict:
+    """trees: dicts of per-tree arrays with -1 children at leaves. Returns global arrays with self-looping leaves."""
+    parts = {name: [] for name in ("feature", "threshold", "left", "right", "default_left", "value")}
+    roots, offset, max_depth = [], 0, 0
+    for tree in trees:
+        n_nodes = len(tree["left"])
+        local = np.arange(n_nodes)
+        leaf = tree["left"] < 0
+        max_depth = max(max_depth, _tree_depth(tree["left"], tree["right"]))
+        parts["left"].append(np.where(leaf, local, tree["left"]) + offset)
+        parts["right"].append(np.where(leaf, local, tree["right"]) + offset)
+        parts["feature"].append(np.where(leaf, 0, tree["feature"]))
+        parts["threshold"].append(np.where(leaf, 0, tree["threshold"]))
+        parts["default_left"].append(np.asarray(tree["default_left"], dtype=bool) & ~leaf)
+        parts["value"].append(np.where(leaf, tree["value"], 0.0))
+        roots.append(offset)
+        offset += n_nodes
+    arrays = {name: np.concatenate(values) for name, values in parts.items()}
+    arrays["roots"] = np.asarray(roots)
+    arrays["max_depth"] = max_depth
+    return arrays
+
+
+def _compile_sklearn(model) -> TreeEnsemble:
+    from sklearn.tree import DecisionTreeRegressor
+    from sklearn.ensemble import RandomForestRegressor, ExtraTreesRegressor
+
+    if isinstance(model, DecisionTreeRegressor):
+        estimators = [model]
+    elif isinstance(model, (RandomForestRegressor, ExtraTreesRegressor)):
+        estimators = model.estimators_
+    else:
+        raise ValueError(f"{type(model).__name__} is not a supported sklearn tree model")
+    if getattr(model, "n_outputs_", 1) != 1:
+        raise ValueError("Multi-output trees are not supported")
+
+    trees = []
+    for estimator in estimators:
+        tree = estimator.tree_
+        missing_go_to_left = getattr(tree, "missing_go_to_left", None)
+        trees.append({
+            "feature": tree.feature,
+            "threshold": tree.threshold,
+            "left": tree.children_left,
+            "right": tree.children_right,
+            "default_left": missing_go_to_left if missing_go_to_left is not None else np.zeros(tree.node_count, dtype=bool),
+            "value": tree.value[:, 0, 0],
+        })
+    arrays = _concatenate(trees)
+    return TreeEnsemble(**arrays, n_features=model.n_features_in_, divisor=len(estimators), strict_less=False,
+                        source=type(model).__name__)
+
+
+def _compile_xgboost(model) -> TreeEnsemble:
+    dump = json.loads(bytes(model.get_booster().save_raw(raw_format="json")))
+    learner = dump["learner"]
+    if learner["gradient_booster"]["name"] != "gbtree":
+        raise ValueError(f"XGBoost booster '{learner['gradient_booster']['name']}' is not supported")
+    if learner["objective"]["name"] not in ("reg:squarederror", "reg:absoluteerror", "reg:pseudohubererror"):
+        raise ValueError(f"XGBoost objective '{learner['objective']['name']}' is not supported")
+    if int(learner["learner_model_param"].get("num_target", 1)) > 1:
+        raise ValueError("Multi-target XGBoost models are not supported")
+
+    booster_model = learner["gradient_booster"]["model"]
+    trees = booster_model["trees"]
+    try:
+        best_iteration = model.best_iteration
+    except AttributeError:
+        best_iteration = None
+    if best_iteration is not None:
+        # predict() stops at the best iteration when early stopping was used
+        trees = trees[:booster_model["iteration_indptr"][best_iteration + 1]]
+
+    compiled = []
+    for tree in trees:
+        if any(tree.get("split_type", [])):
+            raise ValueError("Categorical XGBoost splits are not supported")
+        compiled.append({
+            "feature": np.asarray(tree["split_indices"]),
+            "threshold": np.asarray(tree["split_conditions"], dtype=np.float32),
+            "left": np.asarray(tree["left_children"]),
+            "right": np.asarray(tree["right_children"]),
+            "default_left": np.asarray(tree["default_left"], dtype=bool),
+            # A leaf keeps its value in split_conditions
+            "value": np.asarray(tree["split_conditions"], dtype=np.float32),
+        })
+    arrays = _concatenate(compiled)
+    base_score = float(str(learner["learner_model_param"]["base_score"]).strip("[]"))
+    missing = model.get_params().get("missing", np.nan)
+    return TreeEnsemble(**arrays, n_features=int(learner["learner_model_param"]["num_feature"]),
+                        base_score=base_score, strict_less=True,
+                        missing=None if missing is None else float(missing), dtype=np.float32,
+                        source=type(model).__name__)
+
+
+def compile_tree_ensemble(model) -> Optional[TreeEnsemble]:
+    """TreeEnsemble for a fitted sklearn forest/tree or XGBoost regressor; None for other models."""
+    try:
+        module = type(model).__module__
+        if module.startswith("xgboost"):
+            return _compile_xgboost(model)
+        if module.startswith("sklearn.") and (hasattr(model, "estimators_") or hasattr(model, "tree_")):
+            return _compile_sklearn(model)
+        return None
+    except Exception as e:
+        raise CropYieldException(e, sys)
+
+
+def calibrate_max_rows(engine: TreeEnsemble, model, features: np.ndarray, sizes=(1, 8, 64, 512)) -> int:
+    """
+    Largest batch size in `sizes` up to which the engine beats model.predict (best of three
+    timings each), 0 if it is slower even for one row. The NumPy walk wins on per-call
+    overhead but loses to the libraries' compiled loops on large batches.
+    """
+    try:
+        def best_of_three(predict, batch) -> float:
+            timings = []
+            for _ in range(3):
+                started = time.perf_counter()
+                predict(batch)
+                timings.append(time.perf_counter() - started)
+            return min(timings)
+
+        max_rows = 0
+        for size in sizes:
+            batch = features[np.arange(size) % len(features)]
+            if best_of_three(engine.predict, batch) >= best_of_three(model.predict, batch):
+                break
+            max_rows = size
+        return max_rows
+    except Exception as e:
+        raise CropYieldException(e, sys)
@@ -0,0 +1,129 @@
+import sys
+from typing import List
+
+import numpy as np
+
+from crop_yield.exception.exception import CropYieldException
+
+
+class QuantileSketch:
+    """
+    Mergeable approximate quantile sketch in the style of KLL.
+
+    Values are kept in levels, and an item on level i stands for 2**i
+    original values. When the sketch outgrows `capacity`, a level is sorted
+    and every other item (random offset) is promoted to the next level. That
+    keeps memory bounded for a stream of any length, at a rank error of about
+    1 / capacity per compaction level. Until the first compaction the sketch
+    holds every value, and quantile() is exact and equal to pandas/NumPy
+    linear interpolation.
+    """
+
+    def __init__(self, capacity: int = 200_000, seed: int = 0):
+        try:
+            if capacity < 16:
+                raise ValueError("QuantileSketch capacity must be at least 16")
+            self.capacity = capacity
+            self.levels: List[np.ndarray] = [np.empty(0, dtype=np.float64)]
+            self.count = 0
+            self._rng = np.random.default_rng(seed)
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    @property
+    def exact(self) -> bool:
+        return len(self.levels) == 1
+
+    def _level_capacity(self, level: int) -> int:
+        # Lower levels get the larger share, as in KLL
+        return max(self.capacity >> (level + 1), 8)
+
+    def _compress(self):
+        level = 0
+        while sum(len(items) for items in self.levels) > self.capacity:
+            if len(self.levels[level]) > self._level_capacity(level) or level == len(self.levels) - 1:
+                items = np.sort(self.levels[level])
+                if len(items) % 2:
+                    # An odd item out stays behind so no weight is lost
+                    self.levels[level], items = items[-1:], items[:-1]
+                else:
+                    self.levels[level] = np.empty(0, dtype=np.float64)
+                promoted = items[self._rng.integers(0, 2)::2]
+                if level + 1 == len(self.levels):
+                    self.levels.append(promoted)
+                else:
+                    self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level = (level + 1) % len(self.levels)
+
+    def update(self, values) -> "QuantileSketch":
+        """Add values; NaNs are skipped, like pandas quantile/median do."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        if sum(len(items) for items in self.levels) > self.capacity:
+            self._compress()
+        return self
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        for level, items in enumerate(other.levels):
+            if level == len(self.levels):
+                self.levels.append(np.empty(0, dtype=np.float64))
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self._compress()
+        return self
+
+    def quantile(self, q):
+        """Quantile(s) q in [0, 1]. Returns NaN for an empty sketch."""
+        q_array = np.asarray(q, dtype=np.float64)
+        if self.count == 0:
+            return np.full(q_array.shape, np.nan) if q_array.ndim else np.nan
+        if self.exact:
+            return np.quantile(self.levels[0], q_array)
+
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="stable")
+        values, cumulative = values[order], np.cumsum(weights[order])
+        positions = np.searchsorted(cumulative, q_array * cumulative[-1], side="left")
+        return values[np.minimum(positions, len(values) - 1)]
+
+
+class ReservoirSampler:
+    """
+    Uniform fixed-size sample of a stream (Algorithm R, vectorized per batch).
+
+    Holds every value until `size` values have been seen, so for small inputs
+    the sample is the data itself.
+    """
+
+    def __init__(self, size: int = 100_000, seed: int = 0):
+        try:
+            if size < 1:
+                raise ValueError("ReservoirSampler size must be positive")
+            self.size = size
+            self.sample = np.empty(0, dtype=np.float64)
+            self.count = 0
+            self._rng = np.random.default_rng(seed)
+        except Exception as e:
+            raise CropYieldException(e, sys)
+
+    def update(self, values) -> "ReservoirSampler":
+        """Add values; NaNs are skipped."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        free = max(self.size - len(self.sample), 0)
+        if free:
+            self.sample = np.concatenate([self.sample, values[:free]])
+            self.count += min(free, len(values))
+            values = values[free:]
+        if len(values):
+            # The t-th value seen replaces a random slot with probability size / t
+            positions = self.count + np.arange(1, len(values) + 1)
+            keep = self._rng.random(len(values)) < self.size / positions
+            slots = self._rng.integers(0, self.size, size=int(keep.sum()))
+            # Fancy assignment applies repeated slots in order, so later values win as in the sequential algorithm
+            self.sample[slots] = values[keep]
+            self.count += len(values)
+        return self
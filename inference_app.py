@@ -0,0 +1,350 @@
+"""
+Inference-only entry point: prediction, health, drift and metrics routes.
+
+Imports just the serving runtime (model registry, CropYieldModel, executor),
+none of the training pipeline, so a prediction server starts quickly:
+
+    uvicorn inference_app:app
+
+app.py builds its own app with create_app() and adds the training routes.
+"""
+import sys
+import os
+import time
+import pandas as pd
+import numpy as np
+from contextlib import asynccontextmanager, ExitStack
+from typing import Literal
+from dotenv import load_dotenv
+from fastapi import APIRouter, FastAPI, File, UploadFile, Request, Query
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, JSONResponse, StreamingResponse, PlainTextResponse
+from fastapi.templating import Jinja2Templates
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import RedirectResponse
+from uvicorn import run as app_run
+from pydantic import BaseModel
+
+# Load settings from .env
+load_dotenv()
+
+# Project Imports
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.serving.model_registry import get_model_registry, ModelNotReadyError, ModelVersionMismatchError
+from crop_yield.serving.inference_executor import InferenceExecutor, InferenceQueueFullError
+from crop_yield.serving.inference_tasks import predict_frame, predict_record, predict_records
+from crop_yield.serving.micro_batcher import MicroBatcher
+from crop_yield.serving.drift_monitor import DriftMonitor
+from crop_yield.serving.prediction_cache import PredictionCache
+from crop_yield.serving.request_metrics import RequestTimingMiddleware
+from crop_yield.serving.request_profiling import RequestProfilingMiddleware
+from crop_yield.serving.columnar import ColumnarPayloadError, decode_columns, encode_predictions
+from crop_yield.pipeline.batch_prediction import BatchPrediction, STREAM_MEDIA_TYPES
+from crop_yield.pipeline.pipeline_metrics import export_pipeline_metrics
+from crop_yield.utils.main_utils.metrics import metrics_registry, CONTENT_TYPE
+from crop_yield.constant.prediction_pipeline import (
+    PREDICTION_OUTPUT_DIR,
+    PREDICTION_OUTPUT_FILE_NAME,
+    PREDICTION_COLUMN_NAME,
+    BATCH_PREDICTION_CHUNK_SIZE,
+    BATCH_PREDICTION_PREVIEW_ROWS,
+    MICRO_BATCH_ENABLED,
+    REQUEST_PROFILING_ROUTES,
+    REQUEST_PROFILING_QUERY_FLAG,
+)
+
+# Model is loaded once per process and swapped in place when final_model/ changes
+model_registry = get_model_registry()
+# Prediction runs on a thread/process pool so the event loop only does I/O
+inference_executor = InferenceExecutor()
+# Optional: coalesce concurrent /predict calls into one vectorized predict per micro-batch
+micro_batcher = None
+if MICRO_BATCH_ENABLED:
+    # Records are grouped by the model version their request is cached under
+    micro_batcher = MicroBatcher(
+        run_batch=lambda records, version: inference_executor.run(predict_records, records, version))
+# Recent inputs, compared with the training reference profile on GET /drift
+drift_monitor = DriftMonitor()
+# Predictions for repeated inputs, keyed by the model version so a reload invalidates them
+prediction_cache = PredictionCache(current_version=lambda: model_registry.get().version)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    model_registry.start()
+    inference_executor.start()
+    if micro_batcher is not None:
+        micro_batcher.start()
+    yield
+    if micro_batcher is not None:
+        await micro_batcher.stop()
+    inference_executor.shutdown()
+    model_registry.stop()
+
+
+# Prediction, health, drift and metrics routes; included by every app create_app() builds
+router = APIRouter()
+templates = Jinja2Templates(directory="./templates")
+
+
+async def model_not_ready_handler(request: Request, exc: ModelNotReadyError):
+    return JSONResponse(status_code=503, content={"detail": f"Model not ready: {exc}"})
+
+
+async def model_version_mismatch_handler(request: Request, exc: ModelVersionMismatchError):
+    # Transient while a new model rolls out to the inference workers
+    return JSONResponse(status_code=503, content={"detail": f"Model is being updated: {exc}"},
+                        headers={"Retry-After": "1"})
+
+
+async def inference_queue_full_handler(request: Request, exc: InferenceQueueFullError):
+    return JSONResponse(status_code=503, content={"detail": str(exc)}, headers={"Retry-After": "1"})
+
+
+async def columnar_payload_handler(request: Request, exc: ColumnarPayloadError):
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)})
+
+
+EXCEPTION_HANDLERS = {
+    ModelNotReadyError: model_not_ready_handler,
+    ModelVersionMismatchError: model_version_mismatch_handler,
+    InferenceQueueFullError: inference_queue_full_handler,
+    ColumnarPayloadError: columnar_payload_handler,
+}
+
+
+def timing_headers(timings: list) -> dict:
+    """Per-request queue-wait and compute time, summed over the request's inference jobs."""
+    return {
+        "X-Inference-Queue-Wait-Ms": f"{sum(t.queue_wait_ms for t in timings):.3f}",
+        "X-Inference-Compute-Ms": f"{sum(t.compute_ms for t in timings):.3f}",
+    }
+
+
+class ReservedStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse holding an executor reservation (an ExitStack) that is
+    released however the response ends: after the last chunk, on an error, or
+    when the client disconnects before the body iterator ever starts (Starlette
+    then skips both the generator body and any BackgroundTask).
+    """
+
+    def __init__(self, content, reservation: ExitStack, **kwargs):
+        super().__init__(content, **kwargs)
+        self.reservation = reservation
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # ExitStack.close() is idempotent, so the generator may already have released it
+            self.reservation.close()
+
+
+@router.get("/", tags=["authentication"])
+async def index():
+    return RedirectResponse(url="/docs")
+
+
+@router.get("/health", tags=["health"])
+async def health():
+    status = model_registry.status()
+    status["inference"] = inference_executor.stats()
+    if micro_batcher is not None:
+        status["micro_batching"] = micro_batcher.stats()
+    status["prediction_cache"] = prediction_cache.stats()
+    return JSONResponse(content=status, status_code=200 if status["ready"] else 503)
+
+@router.get("/drift", tags=["monitoring"])
+async def drift():
+    # Runs the tests on a worker thread: they are cheap (profile + window) but CPU-bound
+    report = await run_in_threadpool(drift_monitor.report)
+    return JSONResponse(content=report)
+
+
+@router.get("/metrics", tags=["monitoring"])
+async def metrics():
+    """Prometheus text format: inference stage, queue-wait and request latency histograms,
+    batch throughput, and the stage durations and row counts of the last training run."""
+    def render() -> str:
+        export_pipeline_metrics()
+        return metrics_registry.render()
+
+    return PlainTextResponse(await run_in_threadpool(render), media_type=CONTENT_TYPE)
+
+
+async def predict_cached_chunk(chunk: pd.DataFrame, version: str, timings: list) -> pd.DataFrame:
+    """Add the prediction column to a batch chunk, predicting only rows not in the cache.
+    Runs inside an executor reservation held by the caller."""
+    keys = prediction_cache.frame_keys(chunk)
+    predictions = prediction_cache.get_many(keys, version)
+    missing = [i for i, prediction in enumerate(predictions) if prediction is None]
+    if missing:
+        # Only the first row of each distinct uncached input goes to the model
+        first_rows = {}
+        for i in missing:
+            first_rows.setdefault(keys[i], i)
+        result, timing = await inference_executor.run(
+            predict_frame, chunk.iloc[list(first_rows.values())].copy(), version, reserved=True
+        )
+        timings.append(timing)
+        predicted = dict(zip(first_rows, result[PREDICTION_COLUMN_NAME].tolist()))
+        prediction_cache.put_many(list(predicted), list(predicted.values()), version)
+        for i in missing:
+            predictions[i] = predicted[keys[i]]
+    chunk[PREDICTION_COLUMN_NAME] = predictions
+    drift_monitor.observe_frame(chunk)
+    return chunk
+
+
+# ✅ BATCH PREDICTION ROUTE
+# format=html writes the full result to prediction_output/output.csv and renders a preview;
+# format=csv / ndjson stream the predictions back chunk by chunk with bounded memory.
+@router.post("/predict-batch", tags=["Prediction"])
+async def predict_batch_route(
+    request: Request,
+    file: UploadFile = File(...),
+    output_format: Literal["html", "csv", "ndjson"] = Query("html", alias="format"),
+):
+    version = model_registry.get().version
+    timings = []
+    batch_prediction = BatchPrediction(predict_chunk=lambda chunk: predict_cached_chunk(chunk, version, timings))
+
+    if output_format in STREAM_MEDIA_TYPES:
+        # Admit (or reject with 503) before the response starts; the slot is held until the stream ends
+        reservation = ExitStack()
+        reservation.enter_context(inference_executor.reserve())
+
+        async def stream():
+            # Frees the slot as soon as the last chunk is produced
+            with reservation:
+                async for data in batch_prediction.stream(file.file, output_format):
+                    yield data
+
+        try:
+            return ReservedStreamingResponse(stream(), reservation, media_type=STREAM_MEDIA_TYPES[output_format])
+        except BaseException:
+            reservation.close()
+            raise
+
+    try:
+        with inference_executor.reserve():
+            output_file_path = os.path.join(PREDICTION_OUTPUT_DIR, PREDICTION_OUTPUT_FILE_NAME)
+            preview, total_rows = await batch_prediction.predict_to_file(
+                file.file, output_file_path, preview_rows=BATCH_PREDICTION_PREVIEW_ROWS
+            )
+
+        table_html = preview.to_html(classes='table table-striped', index=False)
+        note = None
+        if total_rows > len(preview):
+            note = f"Showing the first {len(preview)} of {total_rows} rows. Full output: {output_file_path}"
+        return templates.TemplateResponse(
+            request, "table.html", {"table": table_html, "note": note}, headers=timing_headers(timings)
+        )
+
+    except (ModelNotReadyError, InferenceQueueFullError):
+        raise
+    except Exception as e:
+        raise CropYieldException(e, sys)
+
+
+# Column-oriented variant for services that already hold arrays: the body is JSON columns,
+# an Arrow IPC stream/file or a structured .npy (see crop_yield/serving/columnar.py), and the
+# predictions come back in the same format
+@router.post("/predict-batch/columnar", tags=["Prediction"])
+async def predict_batch_columnar_route(request: Request):
+    version = model_registry.get().version
+    started = time.perf_counter()
+    try:
+        body = await request.body()
+        dataframe, payload_format = await run_in_threadpool(
+            decode_columns, body, request.headers.get("content-type", ""), prediction_cache.columns,
+            [column for column, numeric in zip(prediction_cache.columns, prediction_cache.numeric) if numeric]
+        )
+        del body
+
+        timings = []
+        predictions = np.empty(len(dataframe), dtype=np.float64)
+        with inference_executor.reserve():
+            for start in range(0, len(dataframe), BATCH_PREDICTION_CHUNK_SIZE):
+                chunk = dataframe.iloc[start:start + BATCH_PREDICTION_CHUNK_SIZE].copy()
+                chunk = await predict_cached_chunk(chunk, version, timings)
+                predictions[start:start + len(chunk)] = chunk[PREDICTION_COLUMN_NAME].to_numpy(dtype=np.float64)
+
+        content, media_type = await run_in_threadpool(encode_predictions, predictions, payload_format)
+        BatchPrediction.record_throughput(len(predictions), started)
+        headers = {**timing_headers(timings), "X-Rows": str(len(predictions))}
+        return Response(content=content, media_type=media_type, headers=headers)
+
+    except (ModelNotReadyError, InferenceQueueFullError, ColumnarPayloadError):
+        raise
+    except Exception as e:
+        raise CropYieldException(e, sys)
+
+
+# ✅ SINGLE PREDICTION ROUTE
+class SinglePredictionInput(BaseModel):
+    Area: str
+    Crop: str
+    Season: str
+    Year: int
+    Item: str
+    average_rain_fall_mm_per_year: float
+    pesticides_tonnes: float
+    avg_temp: float
+
+@router.post("/predict", tags=["Prediction"])
+async def predict_single(input_data: SinglePredictionInput):
+    version = model_registry.get().version
+    try:
+        data = input_data.model_dump()
+        key = prediction_cache.record_key(data)
+        prediction = prediction_cache.get(key, version)
+        if prediction is not None:
+            drift_monitor.observe_records([data])
+            return JSONResponse(content={"Predicted_Yield": prediction}, headers={"X-Prediction-Cache": "hit"})
+
+        if micro_batcher is not None:
+            prediction, timing = await micro_batcher.submit(data, version)
+        else:
+            prediction, timing = await inference_executor.run(predict_record, data, version)
+        prediction_cache.put(key, prediction, version)
+        drift_monitor.observe_records([data])
+
+        headers = {**timing_headers([timing]), "X-Prediction-Cache": "miss"}
+        return JSONResponse(content={"Predicted_Yield": prediction}, headers=headers)
+
+    except (ModelNotReadyError, InferenceQueueFullError):
+        raise
+    except Exception as e:
+        raise CropYieldException(e, sys)
+
+
+def create_app(lifespan=lifespan) -> FastAPI:
+    """
+    FastAPI app with the inference routes, middleware and error handlers. `lifespan`
+    must enter this module's lifespan; app.py wraps it to also close MongoDB.
+    """
+    app = FastAPI(lifespan=lifespan)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    app.add_middleware(RequestTimingMiddleware)
+    # Only installed when some request can be profiled, so it costs nothing otherwise
+    if REQUEST_PROFILING_ROUTES or REQUEST_PROFILING_QUERY_FLAG:
+        app.add_middleware(RequestProfilingMiddleware)
+    for exception_class, handler in EXCEPTION_HANDLERS.items():
+        app.add_exception_handler(exception_class, handler)
+    app.include_router(router)
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    app_run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,88 @@
+"""
+Shared fixtures. Run from the repository root:
+
+    python -m pytest -q
+"""
+import os
+import tempfile
+
+# Before crop_yield is imported: keep test runs out of the checkout's logs/
+os.environ.setdefault("LOG_DIR", tempfile.mkdtemp(prefix="crop_yield_test_logs_"))
+
+import pandas as pd
+import pytest
+
+from crop_yield.constant.training_pipeline import SCHEMA_FILE_PATH, TARGET_COLUMN
+
+CROP_DATA_FILE_PATH = os.path.join("crop_data", "crop_yield.csv")
+
+
+@pytest.fixture(scope="session")
+def schema_config() -> dict:
+    from crop_yield.utils.main_utils.utils import read_yaml_file
+
+    return read_yaml_file(SCHEMA_FILE_PATH)
+
+
+@pytest.fixture(scope="session")
+def crop_data() -> pd.DataFrame:
+    return pd.read_csv(CROP_DATA_FILE_PATH)
+
+
+@pytest.fixture(scope="session")
+def fit_model(crop_data, schema_config):
+    """Fit the training-time preprocessing and the given estimator the way the pipeline does."""
+    from crop_yield.components.data_transformation import DataTransformation
+    from crop_yield.utils.ml_utils.model.estimator import CropYieldModel
+
+    def fit(estimator, rows: int = 5000):
+        dataframe = crop_data.dropna().sample(n=rows, random_state=0)
+        features = dataframe.drop(columns=[TARGET_COLUMN])
+        crop_yield_model = CropYieldModel(preprocessor=None, model=None,
+                                          area_freq_map=features["Area"].value_counts().to_dict())
+        features = crop_yield_model.encode_area(features)
+        preprocessor = DataTransformation.get_data_transformer_object(None, schema_config).fit(features)
+        estimator.fit(preprocessor.transform(features), dataframe[TARGET_COLUMN])
+        crop_yield_model.preprocessor = preprocessor
+        crop_yield_model.model = estimator
+        return crop_yield_model
+
+    return fit
+
+
+@pytest.fixture(scope="session")
+def model_dir(fit_model, tmp_path_factory) -> str:
+    """A final_model/ directory with a small RandomForest, in the three-pickle layout."""
+    from sklearn.ensemble import RandomForestRegressor
+
+    from crop_yield.constant.prediction_pipeline import (
+        AREA_FREQ_MAP_FILE_NAME,
+        PREPROCESSOR_FILE_NAME,
+        FINAL_MODEL_FILE_NAME,
+    )
+    from crop_yield.utils.main_utils.utils import save_object
+
+    crop_yield_model = fit_model(RandomForestRegressor(n_estimators=10, max_depth=12, random_state=0, n_jobs=1))
+    directory = str(tmp_path_factory.mktemp("final_model"))
+    save_object(os.path.join(directory, AREA_FREQ_MAP_FILE_NAME), crop_yield_model.area_freq_map)
+    save_object(os.path.join(directory, PREPROCESSOR_FILE_NAME), crop_yield_model.preprocessor)
+    save_object(os.path.join(directory, FINAL_MODEL_FILE_NAME), crop_yield_model.model)
+    return directory
+
+
+@pytest.fixture
+def app_client(model_dir):
+    """TestClient of the inference app serving the model from model_dir, with an empty prediction cache."""
+    from fastapi.testclient import TestClient
+
+    import inference_app
+
+    registry = inference_app.model_registry
+    previous_model_dir = registry.model_dir
+    registry.model_dir = model_dir
+    inference_app.prediction_cache.clear()
+    try:
+        with TestClient(inference_app.app) as client:
+            yield client
+    finally:
+        registry.model_dir = previous_model_dir
@@ -0,0 +1,67 @@
+"""Columnar batch payloads: numeric validation, cache keys of bad values and JSON-safe predictions."""
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import inference_app
+from crop_yield.constant.prediction_pipeline import PREDICTION_COLUMN_NAME
+from crop_yield.constant.training_pipeline import TARGET_COLUMN
+from crop_yield.serving.columnar import ColumnarPayloadError, decode_columns, encode_predictions
+
+
+@pytest.fixture
+def columns(crop_data) -> dict:
+    return {column: values.tolist() for column, values in crop_data.drop(columns=[TARGET_COLUMN]).dropna().head(20).items()}
+
+
+def post_json(app_client, columns: dict):
+    return app_client.post("/predict-batch/columnar", content=json.dumps(columns).encode(),
+                           headers={"Content-Type": "application/json"})
+
+
+def test_text_in_a_numeric_column_is_a_400(app_client, columns):
+    columns["avg_temp"][3] = "abc"
+
+    response = post_json(app_client, columns)
+
+    assert response.status_code == 400
+    assert "avg_temp" in response.json()["detail"]
+
+
+def test_numeric_columns_are_decoded_as_numbers(columns):
+    cache = inference_app.prediction_cache
+    columns["Year"] = [str(year) for year in columns["Year"]]
+    columns["avg_temp"][0] = None
+    numeric_columns = [column for column, numeric in zip(cache.columns, cache.numeric) if numeric]
+
+    dataframe, _ = decode_columns(json.dumps(columns).encode(), "application/json", cache.columns, numeric_columns)
+
+    assert all(pd.api.types.is_numeric_dtype(dataframe[column]) for column in numeric_columns)
+    assert np.isnan(dataframe["avg_temp"].iloc[0])
+    with pytest.raises(ColumnarPayloadError):
+        decode_columns(json.dumps({**columns, "Year": ["x"] * 20}).encode(), "application/json",
+                       cache.columns, numeric_columns)
+
+
+def test_bad_numeric_value_does_not_share_the_missing_value_key(crop_data):
+    cache = inference_app.prediction_cache
+    rows = pd.concat([crop_data.drop(columns=[TARGET_COLUMN]).dropna().head(1)] * 3, ignore_index=True)
+    rows["avg_temp"] = rows["avg_temp"].astype(object)
+    rows.loc[0, "avg_temp"] = None
+    rows.loc[1, "avg_temp"] = "abc"
+
+    missing, bad, valid = cache.frame_keys(rows)
+
+    assert len({missing, bad, valid}) == 3
+    assert missing == cache.record_key({**rows.iloc[2].to_dict(), "avg_temp": None})
+    assert valid == cache.record_key(rows.iloc[2].to_dict())
+
+
+def test_json_predictions_use_null_for_non_finite_values():
+    body, media_type = encode_predictions(np.array([1.5, np.nan, np.inf]), "json")
+
+    assert media_type == "application/json"
+    assert json.loads(body) == {PREDICTION_COLUMN_NAME: [1.5, None, None]}
+    assert b"NaN" not in body and b"Infinity" not in body
@@ -0,0 +1,70 @@
+"""DataCleaner against the original per-column cleaning on crop_data, in memory and chunked, and on empty input."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from crop_yield.constant.training_pipeline import (
+    TARGET_COLUMN,
+    DATA_INGESTION_IMPUTE_COLUMNS,
+    DATA_INGESTION_OUTLIER_COLUMNS,
+)
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.utils.main_utils.data_cleaning import DataCleaner
+
+
+def reference_clean(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """The cleaning DataIngestion did before DataCleaner: median imputation, then remove_outliers_iqr."""
+    dataframe = dataframe.dropna(subset=[TARGET_COLUMN]).copy()
+    for col in DATA_INGESTION_IMPUTE_COLUMNS:
+        dataframe[col] = dataframe[col].fillna(dataframe[col].median())
+
+    def remove_outliers_iqr(df, cols):
+        for col in cols:
+            Q1 = df[col].quantile(0.25)
+            Q3 = df[col].quantile(0.75)
+            IQR = Q3 - Q1
+            lower = Q1 - 1.5 * IQR
+            upper = Q3 + 1.5 * IQR
+            df = df[(df[col] >= lower) & (df[col] <= upper)]
+        return df
+
+    return remove_outliers_iqr(dataframe, DATA_INGESTION_OUTLIER_COLUMNS)
+
+
+def make_cleaner(sketch_capacity: int = 200_000) -> DataCleaner:
+    return DataCleaner(TARGET_COLUMN, DATA_INGESTION_IMPUTE_COLUMNS, DATA_INGESTION_OUTLIER_COLUMNS,
+                       sketch_capacity=sketch_capacity)
+
+
+def chunk_factory(dataframe: pd.DataFrame, chunk_size: int):
+    return lambda: (dataframe.iloc[start:start + chunk_size] for start in range(0, len(dataframe), chunk_size))
+
+
+def test_clean_matches_the_original_cleaning(crop_data):
+    expected = reference_clean(crop_data)
+
+    cleaned = make_cleaner().clean(crop_data)
+
+    assert len(expected) == 24193
+    pd.testing.assert_frame_equal(cleaned, expected)
+
+
+@pytest.mark.parametrize("chunk_size", [1000, 7777])
+def test_chunked_cleaning_matches_in_memory_while_exact(crop_data, chunk_size):
+    cleaner = make_cleaner(sketch_capacity=len(crop_data))
+
+    stats = cleaner.fit_chunks(chunk_factory(crop_data, chunk_size))
+    cleaned = pd.concat(cleaner.clean_chunks(chunk_factory(crop_data, chunk_size)))
+
+    assert stats.exact
+    pd.testing.assert_frame_equal(cleaned, make_cleaner().clean(crop_data))
+
+
+@pytest.mark.parametrize("dataframe", [
+    pd.DataFrame({column: pd.Series(dtype=np.float64) for column in [TARGET_COLUMN, *DATA_INGESTION_IMPUTE_COLUMNS]}),
+    pd.DataFrame({TARGET_COLUMN: [np.nan, np.nan], **{column: [1.0, 2.0] for column in DATA_INGESTION_IMPUTE_COLUMNS}}),
+], ids=["no rows", "no target values"])
+def test_empty_input_is_a_clear_error(dataframe):
+    for fit in (make_cleaner().fit, lambda frame: make_cleaner().fit_chunks(chunk_factory(frame, 10))):
+        with pytest.raises(CropYieldException, match="no rows with a target value"):
+            fit(dataframe)
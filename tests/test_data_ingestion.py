@@ -0,0 +1,150 @@
+"""Incremental MongoDB ingestion (DataIngestion.sync_snapshot) against a mongomock collection."""
+import json
+import os
+from datetime import datetime
+
+import mongomock
+import numpy as np
+import pandas as pd
+import pytest
+
+from crop_yield.components.data_ingestion import DataIngestion
+from crop_yield.entity.config_entity import TrainingPipelineConfig, DataIngestionConfig
+from crop_yield.exception.exception import CropYieldException
+
+
+@pytest.fixture
+def documents(crop_data) -> list:
+    """Real rows as MongoDB documents; missing values stored as "na" like the loaded collection."""
+    rows = crop_data.iloc[:600].astype(object).where(crop_data.iloc[:600].notna(), "na")
+    return rows.to_dict("records")
+
+
+@pytest.fixture
+def mongo_client():
+    return mongomock.MongoClient()
+
+
+@pytest.fixture
+def make_ingestion(tmp_path, mongo_client):
+    def make(mode: str = "incremental", batch_size: int = 64) -> DataIngestion:
+        config = DataIngestionConfig(TrainingPipelineConfig(timestamp=datetime(2026, 1, 1)))
+        config.ingestion_mode = mode
+        config.batch_size = batch_size
+        config.snapshot_dir = str(tmp_path / "mongo_snapshot")
+        config.watermark_file_path = os.path.join(config.snapshot_dir, "watermark.json")
+        return DataIngestion(config, mongo_client=mongo_client)
+
+    return make
+
+
+@pytest.fixture
+def collection(make_ingestion):
+    return make_ingestion().get_collection()
+
+
+def read_watermark_file(ingestion: DataIngestion) -> dict:
+    with open(ingestion.data_ingestion_config.watermark_file_path) as file:
+        return json.load(file)
+
+
+def test_first_run_pulls_everything(make_ingestion, collection, documents):
+    collection.insert_many([dict(document) for document in documents[:400]])
+    ingestion = make_ingestion()
+
+    parts = ingestion.sync_snapshot()
+
+    assert parts == ["part-00000.parquet"]
+    assert len(ingestion.read_snapshot(parts)) == 400
+    watermark = read_watermark_file(ingestion)
+    last_id = collection.find().sort("_id", -1).limit(1)[0]["_id"]
+    assert watermark["value"] == str(last_id) and watermark["rows"] == 400
+
+
+def test_second_run_only_fetches_past_watermark(make_ingestion, collection, documents, monkeypatch):
+    collection.insert_many([dict(document) for document in documents[:400]])
+    make_ingestion().sync_snapshot()
+    collection.insert_many([dict(document) for document in documents[400:]])
+
+    ingestion = make_ingestion()
+    queries = []
+    find = mongomock.collection.Collection.find
+
+    def recording_find(self, query=None, *args, **kwargs):
+        queries.append(query)
+        return find(self, query, *args, **kwargs)
+
+    monkeypatch.setattr(mongomock.collection.Collection, "find", recording_find)
+    parts = ingestion.sync_snapshot()
+
+    assert len(queries) == 1 and "$gt" in queries[0]["_id"]
+    assert parts == ["part-00000.parquet", "part-00001.parquet"]
+    assert len(pd.read_parquet(os.path.join(ingestion.data_ingestion_config.snapshot_dir, parts[1]))) == 200
+    assert read_watermark_file(ingestion)["rows"] == 600
+
+    # Nothing new: no part file is added
+    assert make_ingestion().sync_snapshot() == parts
+
+
+def test_snapshot_parts_match_full_export(make_ingestion, collection, documents):
+    for start in range(0, 600, 150):
+        collection.insert_many([dict(document) for document in documents[start:start + 150]])
+        make_ingestion().sync_snapshot()
+
+    incremental = make_ingestion().export_collection_as_dataframe()
+    full = make_ingestion(mode="full").export_collection_as_dataframe()
+
+    assert len(incremental) == 600
+    pd.testing.assert_frame_equal(incremental.reset_index(drop=True), full.reset_index(drop=True),
+                                  check_dtype=False)
+    assert incremental["avg_temp"].isna().sum() == pd.to_numeric(
+        pd.Series([document["avg_temp"] for document in documents]), errors="coerce").isna().sum()
+
+
+@pytest.mark.parametrize("damage", ["corrupt", "truncated", "missing", "part_deleted"])
+def test_recovers_from_bad_watermark(make_ingestion, collection, documents, damage):
+    collection.insert_many([dict(document) for document in documents[:300]])
+    make_ingestion().sync_snapshot()
+    collection.insert_many([dict(document) for document in documents[300:]])
+    make_ingestion().sync_snapshot()
+
+    ingestion = make_ingestion()
+    config = ingestion.data_ingestion_config
+    if damage == "corrupt":
+        with open(config.watermark_file_path, "w") as file:
+            file.write('{"field": "_id", "value": ')
+    elif damage == "truncated":
+        with open(config.watermark_file_path, "w") as file:
+            json.dump({"field": "_id"}, file)
+    elif damage == "missing":
+        os.remove(config.watermark_file_path)
+    else:
+        os.remove(os.path.join(config.snapshot_dir, "part-00001.parquet"))
+
+    parts = ingestion.sync_snapshot()
+
+    # The snapshot is rebuilt from one full pull, without duplicating the earlier parts
+    assert parts == ["part-00000.parquet"]
+    snapshot = ingestion.read_snapshot(parts)
+    assert len(snapshot) == 600
+    assert read_watermark_file(ingestion)["rows"] == 600
+    np.testing.assert_array_equal(snapshot["Year"].to_numpy(), [document["Year"] for document in documents])
+
+
+def test_watermark_on_another_field_is_an_error(make_ingestion, collection, documents):
+    collection.insert_many([dict(document) for document in documents[:100]])
+    make_ingestion().sync_snapshot()
+    ingestion = make_ingestion()
+    ingestion.data_ingestion_config.watermark_field = "Year"
+
+    with pytest.raises(Exception, match="clear"):
+        ingestion.sync_snapshot()
+
+
+@pytest.mark.parametrize("mode, cleaning_mode", [("full", "memory"), ("full", "chunked"), ("incremental", "chunked")])
+def test_empty_collection_is_reported(make_ingestion, mode, cleaning_mode):
+    ingestion = make_ingestion(mode)
+    ingestion.data_ingestion_config.cleaning_mode = cleaning_mode
+
+    with pytest.raises(CropYieldException, match="has no documents"):
+        ingestion.initiate_data_ingestion()
@@ -0,0 +1,92 @@
+"""Parity of the single-record fast path (FastFeatureEncoder + predict_record) with CropYieldModel.predict."""
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.tree import DecisionTreeRegressor
+from xgboost import XGBRegressor
+
+from crop_yield.constant.training_pipeline import TARGET_COLUMN
+from crop_yield.exception.exception import CropYieldException
+
+ESTIMATORS = {
+    "LinearRegression": lambda: LinearRegression(),
+    "DecisionTree": lambda: DecisionTreeRegressor(max_depth=12, random_state=0),
+    "RandomForest": lambda: RandomForestRegressor(n_estimators=10, max_depth=12, random_state=0, n_jobs=1),
+    "XGBoost": lambda: XGBRegressor(n_estimators=20, max_depth=6, missing=0.0),
+}
+
+
+@pytest.fixture(scope="module", params=list(ESTIMATORS))
+def fast_model(request, fit_model):
+    crop_yield_model = fit_model(ESTIMATORS[request.param]())
+    assert crop_yield_model.enable_fast_path()
+    return crop_yield_model
+
+
+@pytest.fixture(scope="module")
+def records(crop_data) -> list:
+    """Real rows, plus rows with unseen Area / Item values and missing numeric values."""
+    features = crop_data.drop(columns=[TARGET_COLUMN])
+    rows = features.sample(n=200, random_state=1).to_dict("records")
+    edge_cases = []
+    for i, row in enumerate(rows[:40]):
+        row = dict(row)
+        if i % 4 == 0:
+            row["Area"] = "Atlantis"
+        elif i % 4 == 1:
+            row["Item"] = "Quinoa"
+        elif i % 4 == 2:
+            row["avg_temp"] = np.nan
+        else:
+            row["pesticides_tonnes"] = np.nan
+            row["Item"] = "Quinoa"
+        edge_cases.append(row)
+    return rows + edge_cases
+
+
+def reference_features(crop_yield_model, record: dict) -> np.ndarray:
+    frame = crop_yield_model.encode_area(pd.DataFrame([record]))
+    return np.asarray(crop_yield_model.preprocessor.transform(frame), dtype=np.float64)
+
+
+def test_encode_matches_preprocessor(fast_model, records):
+    for record in records:
+        np.testing.assert_array_equal(fast_model.fast_encoder.encode(record), reference_features(fast_model, record))
+
+
+def outcome(predict, *args):
+    """The prediction, or the error message for models that reject the input (e.g. NaN in a linear model)."""
+    try:
+        return float(predict(*args))
+    except CropYieldException as e:
+        return str(e).rsplit("message: [", 1)[-1].rstrip("]")
+
+
+def assert_same_outcome(actual, expected, record):
+    if isinstance(expected, float) and np.isnan(expected):
+        assert isinstance(actual, float) and np.isnan(actual), record
+    else:
+        assert actual == expected, record
+
+
+def test_predict_record_matches_predict(fast_model, records):
+    for record in records:
+        expected = outcome(lambda: fast_model.predict(pd.DataFrame([record]))[0])
+        assert_same_outcome(outcome(fast_model.predict_record, record), expected, record)
+
+
+def test_predict_record_without_fast_path_matches(fast_model, records):
+    fast_model.fast_encoder, encoder = None, fast_model.fast_encoder
+    try:
+        for record in records[::10]:
+            expected = outcome(lambda: fast_model.predict(pd.DataFrame([record]))[0])
+            assert_same_outcome(outcome(fast_model.predict_record, record), expected, record)
+    finally:
+        fast_model.fast_encoder = encoder
+
+
+def test_missing_area_matches(fast_model, records):
+    record = dict(records[0], Area=np.nan)
+    np.testing.assert_array_equal(fast_model.fast_encoder.encode(record), reference_features(fast_model, record))
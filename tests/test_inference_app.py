@@ -0,0 +1,87 @@
+"""Serving behaviour of inference_app: executor reservations held by streamed batch responses."""
+import asyncio
+import io
+from contextlib import ExitStack
+
+import pytest
+
+import inference_app
+from inference_app import ReservedStreamingResponse
+from crop_yield.constant.training_pipeline import TARGET_COLUMN
+from crop_yield.serving.inference_executor import InferenceExecutor, InferenceQueueFullError
+
+HTTP_SCOPE = {"type": "http", "asgi": {"spec_version": "2.4"}, "method": "POST", "path": "/predict-batch",
+              "headers": []}
+
+
+async def no_request_body():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+def reserved_response(executor: InferenceExecutor) -> ReservedStreamingResponse:
+    reservation = ExitStack()
+    reservation.enter_context(executor.reserve())
+
+    async def stream():
+        with reservation:
+            yield b"a,b\n"
+            yield b"1,2\n"
+
+    return ReservedStreamingResponse(stream(), reservation, media_type="text/csv")
+
+
+@pytest.fixture
+def executor():
+    executor = InferenceExecutor(kind="thread", max_workers=1, max_queue=0)
+    yield executor
+    executor.shutdown()
+
+
+def test_reservation_released_when_client_disconnects_before_body(executor):
+    async def disconnected_send(message):
+        raise OSError("client went away")
+
+    # More disconnects than the executor has slots: a leaked slot would make a later reserve() fail
+    for _ in range(executor.capacity + 2):
+        response = reserved_response(executor)
+        with pytest.raises(Exception):
+            asyncio.run(response(HTTP_SCOPE, no_request_body, disconnected_send))
+        assert executor.stats()["in_flight"] == 0
+
+
+def test_reservation_released_after_full_stream(executor):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(reserved_response(executor)(HTTP_SCOPE, no_request_body, send))
+
+    assert b"".join(message.get("body", b"") for message in messages) == b"a,b\n1,2\n"
+    assert executor.stats()["in_flight"] == 0
+    with executor.reserve():
+        with pytest.raises(InferenceQueueFullError):
+            with executor.reserve():
+                pass
+
+
+def test_streamed_batch_route_releases_its_slot(app_client, crop_data):
+    body = crop_data.drop(columns=[TARGET_COLUMN]).dropna().head(50).to_csv(index=False).encode()
+    response = app_client.post("/predict-batch", params={"format": "csv"},
+                               files={"file": ("batch.csv", io.BytesIO(body), "text/csv")})
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 51
+    assert inference_app.inference_executor.stats()["in_flight"] == 0
+
+
+def test_importing_the_full_app_leaves_the_inference_app_alone():
+    lifespan_context = inference_app.app.router.lifespan_context
+    routes = list(inference_app.app.routes)
+
+    import app
+
+    assert inference_app.app.router.lifespan_context is lifespan_context
+    assert list(inference_app.app.routes) == routes
+    paths = set(inference_app.app.openapi()["paths"])
+    assert "/predict" in paths and "/train" not in paths
+    assert {"/train", "/health/mongo", "/predict"} <= set(app.app.openapi()["paths"])
@@ -0,0 +1,137 @@
+"""Inference executor, tasks and micro-batcher: stage timings reach the app, workers answer only with the expected model."""
+import asyncio
+import os
+import time
+
+import pytest
+
+import inference_app
+from crop_yield.constant.training_pipeline import TARGET_COLUMN
+from crop_yield.serving import inference_tasks
+from crop_yield.serving.inference_executor import InferenceExecutor
+from crop_yield.serving.micro_batcher import MicroBatcher
+from crop_yield.serving.model_registry import LoadedModel, ModelVersionMismatchError
+from crop_yield.utils.main_utils.metrics import INFERENCE_STAGE_SECONDS
+
+STAGES = ("decode", "preprocess", "predict")
+
+
+def observe_stages() -> int:
+    """Stand-in task: observes every stage once where it runs, returns that process's pid."""
+    for stage in STAGES:
+        INFERENCE_STAGE_SECONDS.observe(0.001, stage=stage)
+    return os.getpid()
+
+
+def stage_counts() -> dict:
+    counts = {}
+    for line in INFERENCE_STAGE_SECONDS.samples():
+        for stage in STAGES:
+            if line.startswith(f'crop_yield_inference_stage_seconds_count{{stage="{stage}"}}'):
+                counts[stage] = float(line.rsplit(" ", 1)[1])
+    return counts
+
+
+@pytest.mark.parametrize("kind", ["thread", "process"])
+def test_stage_timings_are_recorded_in_the_app_process(kind):
+    executor = InferenceExecutor(kind=kind, max_workers=1, max_queue=0)
+    executor.start()
+    try:
+        before = stage_counts()
+        pid, timing = asyncio.run(executor.run(observe_stages))
+    finally:
+        executor.shutdown()
+
+    assert (pid != os.getpid()) == (kind == "process")
+    assert sorted(stage for stage, _ in timing.stage_seconds) == sorted(STAGES)
+    # Observed exactly once each, in this process's histogram
+    assert {stage: count - before.get(stage, 0) for stage, count in stage_counts().items()} == dict.fromkeys(STAGES, 1)
+
+
+class StaleRegistry:
+    """A worker's registry that holds `version` until refresh() loads `refreshed_version`."""
+
+    def __init__(self, model, version: str, refreshed_version: str):
+        self.loaded = LoadedModel(model=model, version=version, loaded_at=time.time())
+        self.refreshed_version = refreshed_version
+        self.refreshes = 0
+
+    def get(self) -> LoadedModel:
+        return self.loaded
+
+    def refresh(self, force: bool = False) -> bool:
+        self.refreshes += 1
+        self.loaded = LoadedModel(model=self.loaded.model, version=self.refreshed_version, loaded_at=time.time())
+        return True
+
+
+@pytest.fixture
+def record(crop_data) -> dict:
+    # /predict also asks for Crop and Season, which the model does not use
+    return {**crop_data.drop(columns=[TARGET_COLUMN]).dropna().iloc[0].to_dict(), "Crop": "-", "Season": "-"}
+
+
+def test_stale_worker_refreshes_to_the_expected_version(app_client, record, monkeypatch):
+    current = inference_app.model_registry.get()
+    worker_registry = StaleRegistry(current.model, version="previous", refreshed_version=current.version)
+    monkeypatch.setattr(inference_tasks, "get_model_registry", lambda: worker_registry)
+
+    response = app_client.post("/predict", json=record)
+
+    assert response.status_code == 200
+    assert worker_registry.refreshes == 1
+
+
+def test_worker_on_another_version_is_a_retryable_503(app_client, record, monkeypatch):
+    current = inference_app.model_registry.get()
+    worker_registry = StaleRegistry(current.model, version="previous", refreshed_version="next")
+    monkeypatch.setattr(inference_tasks, "get_model_registry", lambda: worker_registry)
+
+    with pytest.raises(ModelVersionMismatchError):
+        inference_tasks.predict_record(record, current.version)
+    response = app_client.post("/predict", json=record)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    # Nothing answered by the wrong model was cached under the app's version
+    assert inference_app.prediction_cache.stats()["size"] == 0
+
+
+def test_micro_batches_never_mix_model_versions():
+    calls = []
+
+    async def run_batch(records, version):
+        calls.append((version, list(records)))
+        return [version] * len(records), None
+
+    async def submit_all():
+        batcher = MicroBatcher(run_batch=run_batch, max_batch_size=8, max_wait_ms=50)
+        batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit({"i": i}, "v1" if i % 2 else "v2") for i in range(6)))
+        finally:
+            await batcher.stop()
+
+    results = asyncio.run(submit_all())
+
+    assert [prediction for prediction, _ in results] == ["v2", "v1"] * 3
+    assert sorted((version, len(records)) for version, records in calls) == [("v1", 3), ("v2", 3)]
+    assert all(record["i"] % 2 == (version == "v1") for version, records in calls for record in records)
+
+
+def test_micro_batched_predict_is_pinned_to_the_request_version(app_client, record, monkeypatch):
+    current = inference_app.model_registry.get()
+    worker_registry = StaleRegistry(current.model, version="previous", refreshed_version="next")
+    monkeypatch.setattr(inference_tasks, "get_model_registry", lambda: worker_registry)
+    batcher = MicroBatcher(run_batch=lambda records, version: inference_app.inference_executor.run(
+        inference_tasks.predict_records, records, version), max_wait_ms=1)
+    monkeypatch.setattr(inference_app, "micro_batcher", batcher)
+
+    try:
+        response = app_client.post("/predict", json=record)
+    finally:
+        app_client.portal.call(batcher.stop)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+    assert inference_app.prediction_cache.stats()["size"] == 0
@@ -0,0 +1,100 @@
+"""Model bundle: round trip, integrity checks, and ModelRegistry preferring model.bundle over the pickles."""
+import os
+import shutil
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.tree import DecisionTreeRegressor
+from xgboost import XGBRegressor
+
+from crop_yield.constant.prediction_pipeline import MODEL_BUNDLE_FILE_NAME
+from crop_yield.constant.training_pipeline import TARGET_COLUMN
+from crop_yield.exception.exception import CropYieldException
+from crop_yield.serving.model_registry import ModelRegistry
+from crop_yield.utils.ml_utils.model.bundle import BundleIntegrityError, load_model_bundle, save_model_bundle
+from crop_yield.utils.ml_utils.model.estimator import CropYieldModel
+
+
+@pytest.fixture(scope="module")
+def features(crop_data):
+    return crop_data.drop(columns=[TARGET_COLUMN]).dropna().sample(n=500, random_state=1)
+
+
+@pytest.fixture(scope="module")
+def forest(fit_model) -> CropYieldModel:
+    return fit_model(RandomForestRegressor(n_estimators=10, max_depth=12, random_state=0, n_jobs=1))
+
+
+def save(file_path: str, crop_yield_model: CropYieldModel, **kwargs) -> dict:
+    return save_model_bundle(file_path, preprocessor=crop_yield_model.preprocessor, model=crop_yield_model.model,
+                             area_freq_map=crop_yield_model.area_freq_map, **kwargs)
+
+
+def load(file_path: str, verify: bool = True) -> CropYieldModel:
+    bundle = load_model_bundle(file_path, verify=verify)
+    return CropYieldModel(preprocessor=bundle.preprocessor, model=bundle.model, area_freq_map=bundle.area_freq_map)
+
+
+def integrity_error(error_info) -> BundleIntegrityError:
+    error = error_info.value.error_message
+    assert isinstance(error, BundleIntegrityError)
+    return error
+
+
+@pytest.mark.parametrize("estimator, native_model_format", [
+    (RandomForestRegressor(n_estimators=10, max_depth=12, random_state=0, n_jobs=1), None),
+    (XGBRegressor(n_estimators=20, max_depth=4, n_jobs=1), None),
+    (XGBRegressor(n_estimators=20, max_depth=4, n_jobs=1), "ubj"),
+], ids=["random_forest", "xgboost_pickle", "xgboost_native"])
+def test_round_trip_predicts_identically(fit_model, features, tmp_path, estimator, native_model_format):
+    crop_yield_model = fit_model(estimator)
+    file_path = str(tmp_path / MODEL_BUNDLE_FILE_NAME)
+
+    manifest = save(file_path, crop_yield_model, native_model_format=native_model_format)
+
+    np.testing.assert_array_equal(load(file_path).predict(features), crop_yield_model.predict(features))
+    assert load_model_bundle(file_path).version == manifest["checksum"]["sha256"][:12]
+
+
+def test_flipped_payload_byte_fails_verification(forest, tmp_path):
+    file_path = str(tmp_path / MODEL_BUNDLE_FILE_NAME)
+    save(file_path, forest)
+    with open(file_path, "r+b") as file:
+        file.seek(-100, os.SEEK_END)
+        byte = file.read(1)
+        file.seek(-100, os.SEEK_END)
+        file.write(bytes([byte[0] ^ 0xFF]))
+
+    with pytest.raises(CropYieldException) as error_info:
+        load_model_bundle(file_path, verify=True)
+
+    assert "Checksum mismatch" in str(integrity_error(error_info))
+
+
+@pytest.mark.parametrize("verify", [True, False])
+def test_truncated_bundle_is_rejected(forest, tmp_path, verify):
+    file_path = str(tmp_path / MODEL_BUNDLE_FILE_NAME)
+    save(file_path, forest)
+    with open(file_path, "r+b") as file:
+        file.truncate(os.path.getsize(file_path) - 1)
+
+    with pytest.raises(CropYieldException) as error_info:
+        load_model_bundle(file_path, verify=verify)
+
+    assert "truncated" in str(integrity_error(error_info))
+
+
+def test_registry_prefers_the_bundle_over_the_pickles(fit_model, model_dir, features, tmp_path):
+    directory = shutil.copytree(model_dir, tmp_path / "final_model")
+    registry = ModelRegistry(model_dir=str(directory), poll_interval=0)
+    registry.refresh(force=True)
+    from_pickles = registry.get()
+
+    tree = fit_model(DecisionTreeRegressor(max_depth=8, random_state=0))
+    manifest = save(os.path.join(directory, MODEL_BUNDLE_FILE_NAME), tree)
+    assert registry.refresh(force=True)
+    from_bundle = registry.get()
+
+    assert from_bundle.version == manifest["checksum"]["sha256"][:12] != from_pickles.version
+    np.testing.assert_array_equal(from_bundle.model.predict(features), tree.predict(features))
@@ -0,0 +1,70 @@
+"""ModelSelector: successive halving, the search budget, and one thread per candidate in parallel selection."""
+import time
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.tree import DecisionTreeRegressor
+from xgboost import XGBRegressor
+
+from crop_yield.constant.training_pipeline import TARGET_COLUMN
+from crop_yield.utils.ml_utils.model import model_selection
+from crop_yield.utils.ml_utils.model.model_selection import ModelSelector, search_candidate
+
+PARAM_GRID = {"max_depth": [2, 4, 6, 8, 10], "min_samples_split": [2, 10]}
+
+
+@pytest.fixture(scope="module")
+def data(crop_data) -> dict:
+    rows = crop_data.dropna().sample(n=3000, random_state=0)
+    x = rows[["Year", "average_rain_fall_mm_per_year", "pesticides_tonnes", "avg_temp"]].to_numpy(dtype=np.float64)
+    y = rows[TARGET_COLUMN].to_numpy(dtype=np.float64)
+    return {"X_train": x[:2400], "y_train": y[:2400], "X_val": x[2400:], "y_val": y[2400:]}
+
+
+def search(data, deadline=None):
+    return search_candidate("DecisionTree", DecisionTreeRegressor(random_state=0), PARAM_GRID, data["X_train"],
+                            data["y_train"], data["X_val"], data["y_val"], strategy="halving", n_iter=10, cv=3,
+                            deadline=deadline, random_state=42)
+
+
+def test_halving_narrows_the_grid_on_growing_samples(data):
+    result = search(data)
+
+    assert not result.budget_exhausted
+    assert result.configs_evaluated == result.configs_total == 10
+    assert [timing["n_candidates"] for timing in result.timings] == [10, 4, 2]
+    assert [timing["n_samples"] for timing in result.timings] == [266, 798, 2400]
+    assert result.best_params in model_selection.ParameterGrid(PARAM_GRID)
+
+
+def test_halving_stops_launching_parameter_sets_after_the_deadline(data):
+    result = search(data, deadline=time.time() - 1)
+
+    assert result.budget_exhausted
+    assert result.configs_evaluated == 1
+    assert len(result.timings) == 1 and result.timings[0]["n_candidates"] == 1
+    # Still returns a fitted estimator
+    assert result.estimator.predict(data["X_val"]).shape == data["y_val"].shape
+
+
+def test_parallel_selection_runs_each_candidate_single_threaded(data, monkeypatch):
+    seen = {}
+
+    def record_n_jobs(model_name, estimator, *args):
+        seen[model_name] = estimator.get_params().get("n_jobs")
+        return search_candidate(model_name, estimator, *args)
+
+    monkeypatch.setattr(model_selection, "search_candidate", record_n_jobs)
+    models = {"LinearRegression": LinearRegression(), "XGBoost": XGBRegressor(n_estimators=10)}
+
+    # n_jobs=1 runs in-process, where the patched function is visible; check both pool sizes
+    ModelSelector(n_jobs=1).select(models, {}, **data)
+    assert seen == {"LinearRegression": None, "XGBoost": None}
+
+    with monkeypatch.context() as patch:
+        patch.setattr(model_selection, "Parallel", lambda n_jobs, backend: lambda tasks: [
+            function(*args, **kwargs) for function, args, kwargs in tasks])
+        ModelSelector(n_jobs=2).select(models, {}, **data)
+    assert seen == {"LinearRegression": 1, "XGBoost": 1}
+    assert models["XGBoost"].get_params()["n_jobs"] is None
@@ -0,0 +1,102 @@
+"""The shared MongoDB client: mongomock installed with use(), reuse across callers, and the bounded ping."""
+import socket
+import threading
+import time
+from datetime import datetime
+
+import mongomock
+import pytest
+
+from crop_yield.cloud.mongo_client import MongoClientManager, get_mongo_client, get_mongo_client_manager
+from crop_yield.components.data_ingestion import DataIngestion
+from crop_yield.entity.config_entity import TrainingPipelineConfig, DataIngestionConfig
+
+
+@pytest.fixture
+def shared_mock_client():
+    manager = get_mongo_client_manager()
+    client = mongomock.MongoClient()
+    manager.use(client)
+    yield client
+    manager.close()
+
+
+@pytest.fixture
+def silent_server():
+    """A TCP server that accepts connections and never answers, like a hung MongoDB."""
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    connections = []
+    stop = threading.Event()
+
+    def accept():
+        server.settimeout(0.1)
+        while not stop.is_set():
+            try:
+                connections.append(server.accept()[0])
+            except OSError:
+                pass
+
+    thread = threading.Thread(target=accept, daemon=True)
+    thread.start()
+    yield f"mongodb://127.0.0.1:{server.getsockname()[1]}/"
+    stop.set()
+    thread.join()
+    for connection in connections:
+        connection.close()
+    server.close()
+
+
+def test_use_installs_the_client_for_every_caller(shared_mock_client):
+    assert get_mongo_client() is shared_mock_client
+    assert get_mongo_client_manager().connected
+
+
+def test_ingestion_uses_the_shared_client(shared_mock_client):
+    config = DataIngestionConfig(TrainingPipelineConfig(timestamp=datetime(2026, 1, 1)))
+    shared_mock_client[config.database_name][config.collection_name].insert_one(
+        {"Area": "Albania", "Item": "Maize", "Year": 1990, "hg/ha_yield": 36613.0,
+         "average_rain_fall_mm_per_year": 1485.0, "pesticides_tonnes": 121.0, "avg_temp": 16.37})
+    first, second = DataIngestion(config), DataIngestion(config)
+
+    assert len(first.export_collection_as_dataframe()) == 1
+    assert len(second.export_collection_as_dataframe()) == 1
+    assert first.mongo_client is shared_mock_client and second.mongo_client is shared_mock_client
+
+
+def test_health_route_pings_the_shared_client(shared_mock_client, monkeypatch):
+    from fastapi.testclient import TestClient
+    from app import app
+
+    created = []
+    monkeypatch.setattr(MongoClientManager, "_create_client", lambda self, url: created.append(url))
+    with TestClient(app) as client:
+        first = client.get("/health/mongo")
+        second = client.get("/health/mongo")
+        assert get_mongo_client() is shared_mock_client
+
+    assert first.status_code == 200 and first.json()["ok"] is True
+    assert second.status_code == 200 and second.json()["ok"] is True
+    assert created == []
+
+
+def test_ping_fails_within_its_bound(silent_server):
+    manager = MongoClientManager(url=silent_server, connect_timeout_ms=30_000,
+                                 server_selection_timeout_ms=30_000, socket_timeout_ms=30_000)
+    try:
+        started = time.perf_counter()
+        status = manager.ping(timeout_ms=300)
+        elapsed = time.perf_counter() - started
+    finally:
+        manager.close()
+
+    assert status["ok"] is False and status["error"]
+    # Well under the client's own 30s timeouts
+    assert elapsed < 3
+
+
+def test_ping_reports_a_missing_url(monkeypatch):
+    monkeypatch.delenv("MONGO_DB_URL", raising=False)
+    status = MongoClientManager().ping(timeout_ms=100)
+    assert status["ok"] is False and "MONGO_DB_URL" in status["error"]
@@ -0,0 +1,105 @@
+"""PredictionCache: LRU eviction, TTL expiry, forward-only invalidation on reload, and /predict-batch dedup."""
+import io
+
+import pandas as pd
+import pytest
+
+import inference_app
+from crop_yield.constant.prediction_pipeline import PREDICTION_COLUMN_NAME
+from crop_yield.constant.training_pipeline import TARGET_COLUMN
+from crop_yield.serving import prediction_cache as prediction_cache_module
+from crop_yield.serving.prediction_cache import PredictionCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(prediction_cache_module.time, "monotonic", clock)
+    return clock
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = PredictionCache(max_size=2, ttl_seconds=0)
+    cache.put(("a",), 1.0, "v1")
+    cache.put(("b",), 2.0, "v1")
+    assert cache.get(("a",), "v1") == 1.0
+
+    cache.put(("c",), 3.0, "v1")
+
+    assert cache.get_many([("a",), ("b",), ("c",)], "v1") == [1.0, None, 3.0]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = PredictionCache(max_size=10, ttl_seconds=60)
+    cache.put(("a",), 1.0, "v1")
+
+    clock.now += 59
+    assert cache.get(("a",), "v1") == 1.0
+    clock.now += 2
+    assert cache.get(("a",), "v1") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_reload_invalidates_only_forward():
+    current = {"version": "v1"}
+    cache = PredictionCache(max_size=10, ttl_seconds=0, current_version=lambda: current["version"])
+    cache.put(("a",), 1.0, "v1")
+
+    current["version"] = "v2"
+    # A request that started before the reload: a miss that stores nothing and clears nothing
+    assert cache.get(("a",), "v1") is None
+    cache.put(("b",), 2.0, "v2")
+    cache.put(("c",), 3.0, "v1")
+    assert cache.get(("b",), "v1") is None
+
+    assert cache.get_many([("a",), ("b",), ("c",)], "v2") == [None, 2.0, None]
+    stats = cache.stats()
+    assert stats["model_version"] == "v2"
+    assert stats["invalidations"] == 1
+    assert stats["size"] == 1
+
+
+def test_without_current_version_any_new_version_invalidates():
+    cache = PredictionCache(max_size=10, ttl_seconds=0)
+    cache.put(("a",), 1.0, "v1")
+
+    assert cache.get(("a",), "v2") is None
+    assert cache.get(("a",), "v1") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_batch_route_predicts_each_distinct_row_once(app_client, crop_data, monkeypatch):
+    rows = crop_data.drop(columns=[TARGET_COLUMN]).dropna().drop_duplicates().head(50)
+    body = pd.concat([rows] * 3, ignore_index=True).to_csv(index=False).encode()
+    predicted_rows = []
+    predict_frame = inference_app.predict_frame
+
+    def counting_predict_frame(dataframe, expected_version=None):
+        predicted_rows.append(len(dataframe))
+        return predict_frame(dataframe, expected_version)
+
+    monkeypatch.setattr(inference_app, "predict_frame", counting_predict_frame)
+
+    def post() -> pd.DataFrame:
+        response = app_client.post("/predict-batch", params={"format": "csv"},
+                                   files={"file": ("batch.csv", io.BytesIO(body), "text/csv")})
+        assert response.status_code == 200
+        return pd.read_csv(io.StringIO(response.text))
+
+    first = post()
+    second = post()
+
+    assert predicted_rows == [50]
+    assert len(first) == 150
+    predictions = first[PREDICTION_COLUMN_NAME].to_numpy().reshape(3, 50)
+    assert (predictions == predictions[0]).all()
+    pd.testing.assert_frame_equal(first, second)
@@ -0,0 +1,64 @@
+"""MongoBulkLoader: row keys that survive re-chunking and dtype changes, and de-duplicated re-runs (mongomock)."""
+import mongomock
+import numpy as np
+import pandas as pd
+import pytest
+
+from push_data import MongoBulkLoader
+
+
+@pytest.fixture
+def source(crop_data, tmp_path):
+    """600 real rows, including exact duplicate rows and rows with missing values."""
+    rows = pd.concat([crop_data.iloc[:540], crop_data.iloc[:30], crop_data[crop_data.isna().any(axis=1)].head(30)])
+    file_path = tmp_path / "crop_yield.csv"
+    rows.to_csv(file_path, index=False)
+    return file_path
+
+
+@pytest.fixture
+def make_loader(tmp_path):
+    client = mongomock.MongoClient()
+
+    def make(chunk_size: int) -> MongoBulkLoader:
+        return MongoBulkLoader(mongo_client=client, chunk_size=chunk_size, batch_size=128, max_workers=2,
+                               checkpoint_dir=str(tmp_path / "mongo_load"))
+
+    return make
+
+
+def test_keys_do_not_depend_on_chunking_or_dtypes(source):
+    dataframe = pd.read_csv(source)
+    keys = MongoBulkLoader.row_keys(dataframe, {})
+
+    seen = {}
+    chunked = np.concatenate([MongoBulkLoader.row_keys(chunk, seen) for chunk in pd.read_csv(source, chunksize=111)])
+    np.testing.assert_array_equal(chunked, keys)
+
+    # Year read as float (a NaN elsewhere in the chunk), other dtypes as text, columns in another order
+    changed = dataframe.astype({"Year": "float64", "pesticides_tonnes": object})[dataframe.columns[::-1]]
+    np.testing.assert_array_equal(MongoBulkLoader.row_keys(changed, {}), keys)
+
+    # Exact duplicate rows keep distinct keys
+    assert len(set(keys)) == len(keys)
+
+
+def test_rerun_with_another_chunk_size_inserts_nothing(source, make_loader):
+    first = make_loader(chunk_size=200).load_csv(str(source), "crop_yield", "crop_yield_data")
+    second = make_loader(chunk_size=111).load_csv(str(source), "crop_yield", "crop_yield_data")
+
+    assert first.rows == 600 and first.inserted == 600
+    assert second.inserted == 0 and second.duplicates == 600
+    assert make_loader(chunk_size=200).get_collection("crop_yield", "crop_yield_data").count_documents({}) == 600
+
+
+def test_rerun_after_adding_a_missing_value_inserts_only_that_row(source, make_loader):
+    make_loader(chunk_size=200).load_csv(str(source), "crop_yield", "crop_yield_data")
+
+    # Blanking one Year turns the whole chunk's Year column from int64 into float64
+    dataframe = pd.read_csv(source)
+    dataframe.loc[10, "Year"] = np.nan
+    dataframe.to_csv(source, index=False)
+    stats = make_loader(chunk_size=200).load_csv(str(source), "crop_yield", "crop_yield_data")
+
+    assert stats.inserted == 1 and stats.duplicates == 599
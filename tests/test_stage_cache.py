@@ -0,0 +1,107 @@
+"""StageCache: keys that follow the code a stage depends on, and eviction limited to runs the cache created."""
+import os
+import sys
+import textwrap
+import time
+from dataclasses import dataclass
+
+import pytest
+
+from crop_yield.components.model_trainer import ModelTrainer
+from crop_yield.components.data_validation import DataValidation
+from crop_yield.components.data_transformation import DataTransformation
+from crop_yield.pipeline.stage_cache import StageCache, source_dependencies
+
+
+@dataclass
+class FakeArtifact:
+    output_file_path: str
+
+
+class FakeConfig:
+    def __init__(self, artifact_dir: str):
+        self.output_dir = os.path.join(artifact_dir, "stage")
+        self.threshold = 0.5
+
+
+def relative_dependencies(module_name: str) -> set:
+    return {os.path.relpath(file_path, os.path.dirname(os.path.dirname(sys.modules["crop_yield"].__file__)))
+            .replace(os.sep, "/") for file_path in source_dependencies(module_name)}
+
+
+@pytest.fixture
+def stage_cache(tmp_path) -> StageCache:
+    return StageCache(cache_dir=str(tmp_path / "artifacts" / "stage_cache"), artifact_root=str(tmp_path / "artifacts"),
+                      max_runs=2, max_size_mb=0)
+
+
+@pytest.mark.parametrize("component, expected", [
+    (ModelTrainer, {"crop_yield/utils/ml_utils/model/model_selection.py", "crop_yield/utils/ml_utils/model/bundle.py",
+                    "crop_yield/utils/ml_utils/model/estimator.py", "crop_yield/utils/main_utils/utils.py"}),
+    (DataValidation, {"crop_yield/utils/ml_utils/drift.py", "crop_yield/utils/main_utils/feature_store.py"}),
+    (DataTransformation, {"crop_yield/components/data_transformation.py", "crop_yield/utils/main_utils/utils.py"}),
+])
+def test_dependencies_include_imported_modules(component, expected):
+    assert expected <= relative_dependencies(component.__module__)
+
+
+def test_key_changes_when_an_imported_module_changes(tmp_path, monkeypatch, stage_cache):
+    package = tmp_path / "src" / "crop_yield"
+    (package / "helpers").mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "helpers" / "__init__.py").write_text("")
+    (package / "helpers" / "maths.py").write_text("def scale(x):\n    return 2 * x\n")
+    (package / "stage.py").write_text(textwrap.dedent("""
+        class Stage:
+            def run(self):
+                from crop_yield.helpers.maths import scale
+                return scale(1)
+    """))
+    # A throwaway crop_yield package on its own path, so the real source is never touched
+    for name in [name for name in sys.modules if name == "crop_yield" or name.startswith("crop_yield.")]:
+        monkeypatch.delitem(sys.modules, name)
+    monkeypatch.syspath_prepend(str(tmp_path / "src"))
+    source_dependencies.cache_clear()
+    try:
+        from crop_yield.stage import Stage
+
+        config = FakeConfig("artifacts/01_01_2026_00_00_00")
+        key = stage_cache.stage_key("stage", ["input"], config, "artifacts/01_01_2026_00_00_00", Stage)
+        assert stage_cache.stage_key("stage", ["input"], config, "artifacts/01_01_2026_00_00_00", Stage) == key
+
+        (package / "helpers" / "maths.py").write_text("def scale(x):\n    return 3 * x\n")
+        assert stage_cache.stage_key("stage", ["input"], config, "artifacts/01_01_2026_00_00_00", Stage) != key
+    finally:
+        source_dependencies.cache_clear()
+        for name in [name for name in sys.modules if name == "crop_yield" or name.startswith("crop_yield.")]:
+            del sys.modules[name]
+
+
+def make_run(stage_cache: StageCache, name: str, cached: bool, last_used: float) -> str:
+    run_dir = os.path.join(stage_cache.artifact_root, name)
+    os.makedirs(os.path.join(run_dir, "stage"))
+    output_file_path = os.path.join(run_dir, "stage", "output.csv")
+    with open(output_file_path, "w") as file:
+        file.write("a\n1\n")
+    if cached:
+        stage_cache.put("stage", name, FakeArtifact(output_file_path), run_dir, {})
+    os.utime(run_dir, (last_used, last_used))
+    return run_dir
+
+
+def test_evict_only_removes_runs_the_cache_created(stage_cache):
+    now = time.time()
+    # The uncached baseline is the least recently used of all
+    baseline = make_run(stage_cache, "07_24_2025_12_38_52", cached=False, last_used=now - 100)
+    cached_runs = [make_run(stage_cache, f"01_0{day}_2026_00_00_00", cached=True, last_used=now - 50 + day)
+                   for day in range(1, 6)]
+
+    removed = stage_cache.evict(keep=[cached_runs[0]])
+
+    assert os.path.isdir(baseline)
+    assert removed == cached_runs[1:4]
+    assert [os.path.isdir(run_dir) for run_dir in cached_runs] == [True, False, False, False, True]
+    # Entries of the removed runs are dropped with them
+    assert stage_cache.cached_run_dirs() == {os.path.abspath(cached_runs[0]), os.path.abspath(cached_runs[4])}
+    assert stage_cache.get("stage", "01_02_2026_00_00_00", FakeArtifact) is None
+    assert stage_cache.get("stage", "01_05_2026_00_00_00", FakeArtifact) is not None
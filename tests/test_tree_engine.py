@@ -0,0 +1,57 @@
+"""compile_tree_ensemble(model).predict equals model.predict on real transformed rows, NaN inputs included."""
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.tree import DecisionTreeRegressor
+from xgboost import XGBRegressor
+
+from crop_yield.constant.training_pipeline import TARGET_COLUMN
+from crop_yield.utils.ml_utils.model.tree_engine import compile_tree_ensemble
+
+ESTIMATORS = {
+    "random_forest": lambda: RandomForestRegressor(n_estimators=20, max_depth=16, random_state=0, n_jobs=1),
+    "decision_tree": lambda: DecisionTreeRegressor(max_depth=12, random_state=0),
+    "xgboost": lambda: XGBRegressor(n_estimators=50, max_depth=6, n_jobs=1),
+    "xgboost_csr_missing_zero": lambda: XGBRegressor(n_estimators=50, max_depth=6, n_jobs=1, missing=0.0),
+}
+
+
+@pytest.fixture(scope="module")
+def preprocessing(fit_model):
+    """The pipeline's fitted area encoding and ColumnTransformer."""
+    return fit_model(DecisionTreeRegressor(max_depth=1))
+
+
+@pytest.fixture(scope="module")
+def rows(crop_data, preprocessing) -> dict:
+    """Transformed training rows, and held-out rows of which a share have NaN features."""
+    features = crop_data.drop(columns=[TARGET_COLUMN])
+    has_nan = features.isna().any(axis=1)
+    assert has_nan.any()
+    train = crop_data[~has_nan & crop_data[TARGET_COLUMN].notna()].sample(n=4000, random_state=0)
+    held_out = features[~has_nan].drop(index=train.index).sample(n=2000, random_state=1)
+    return {
+        "x_train": transform(preprocessing, train.drop(columns=[TARGET_COLUMN])),
+        "y_train": train[TARGET_COLUMN].to_numpy(),
+        "x_test": np.vstack([transform(preprocessing, held_out), transform(preprocessing, features[has_nan])]),
+    }
+
+
+def transform(crop_yield_model, features) -> np.ndarray:
+    x = crop_yield_model.preprocessor.transform(crop_yield_model.encode_area(features))
+    return x.toarray() if sp.issparse(x) else np.asarray(x, dtype=np.float64)
+
+
+@pytest.mark.parametrize("name", ESTIMATORS)
+def test_compiled_ensemble_predicts_like_the_model(rows, name):
+    sparse = name == "xgboost_csr_missing_zero"
+    model = ESTIMATORS[name]()
+    model.fit(sp.csr_matrix(rows["x_train"]) if sparse else rows["x_train"], rows["y_train"])
+    engine = compile_tree_ensemble(model)
+    x_test = rows["x_test"]
+
+    assert np.isnan(x_test).any()
+    np.testing.assert_array_equal(engine.predict(x_test), model.predict(x_test))
+    if sparse:
+        np.testing.assert_array_equal(engine.predict(sp.csr_matrix(x_test)), model.predict(sp.csr_matrix(x_test)))